@@ -0,0 +1,22 @@
+"""Index bet tickets for keyset-paginated history
+
+Revision ID: bet_ticket_history_index
+Revises: round_time_indexes
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'bet_ticket_history_index'
+down_revision = 'round_time_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add (user_id, created_at, ticket_id) index used by /bet/my-tickets"""
+    op.create_index('ix_bet_tickets_user_created_ticket', 'bet_tickets', ['user_id', 'created_at', 'ticket_id'])
+
+def downgrade():
+    """Drop ticket history index"""
+    op.drop_index('ix_bet_tickets_user_created_ticket', table_name='bet_tickets')
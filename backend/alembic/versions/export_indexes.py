@@ -0,0 +1,26 @@
+"""Index transactions, bets and tickets for streaming exports
+
+Revision ID: export_indexes
+Revises: wallet_ledger
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'export_indexes'
+down_revision = 'wallet_ledger'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add (created_at, id) indexes walked by /admin/export"""
+    op.create_index('ix_transactions_created_id', 'transactions', ['created_at', 'id'])
+    op.create_index('ix_bets_created_id', 'bets', ['created_at', 'id'])
+    op.create_index('ix_bet_tickets_created_id', 'bet_tickets', ['created_at', 'id'])
+
+def downgrade():
+    """Drop export indexes"""
+    op.drop_index('ix_bet_tickets_created_id', table_name='bet_tickets')
+    op.drop_index('ix_bets_created_id', table_name='bets')
+    op.drop_index('ix_transactions_created_id', table_name='transactions')
@@ -0,0 +1,22 @@
+"""Index the pending transaction queue
+
+Revision ID: pending_transactions_index
+Revises: export_indexes
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'pending_transactions_index'
+down_revision = 'export_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add (status, created_at, id) index used by /admin/transactions/pending"""
+    op.create_index('ix_transactions_status_created_id', 'transactions', ['status', 'created_at', 'id'])
+
+def downgrade():
+    """Drop pending queue index"""
+    op.drop_index('ix_transactions_status_created_id', table_name='transactions')
@@ -0,0 +1,52 @@
+"""Add rounds.local_date with one round per house, type and local day
+
+Revision ID: round_local_date
+Revises: fix_house_timing
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'round_local_date'
+down_revision = 'fix_house_timing'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add local_date, backfill it from the house timezone and enforce uniqueness"""
+    op.add_column('rounds', sa.Column('local_date', sa.Date(), nullable=True))
+
+    # Draw day in the house timezone (FORECAST rounds are drawn with SR)
+    op.execute("""
+        UPDATE rounds
+        SET local_date = (rounds.scheduled_time AT TIME ZONE COALESCE(NULLIF(houses.timezone, ''), 'Asia/Kolkata'))::date
+        FROM houses
+        WHERE houses.id = rounds.house_id
+    """)
+
+    # Historic duplicates keep the oldest round; the rest stay unconstrained
+    op.execute("""
+        UPDATE rounds
+        SET local_date = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY house_id, round_type, local_date ORDER BY id
+                ) AS rn
+                FROM rounds
+                WHERE local_date IS NOT NULL
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """)
+
+    op.create_unique_constraint(
+        'uq_rounds_house_type_local_date', 'rounds', ['house_id', 'round_type', 'local_date']
+    )
+
+def downgrade():
+    """Drop local_date and its unique constraint"""
+    op.drop_constraint('uq_rounds_house_type_local_date', 'rounds', type_='unique')
+    op.drop_column('rounds', 'local_date')
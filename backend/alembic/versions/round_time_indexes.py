@@ -0,0 +1,24 @@
+"""Index rounds for local-day range scans
+
+Revision ID: round_time_indexes
+Revises: round_local_date
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'round_time_indexes'
+down_revision = 'round_local_date'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add scheduled_time indexes used by today/date-range queries"""
+    op.create_index('ix_rounds_scheduled_time', 'rounds', ['scheduled_time'])
+    op.create_index('ix_rounds_house_id_scheduled_time', 'rounds', ['house_id', 'scheduled_time'])
+
+def downgrade():
+    """Drop scheduled_time indexes"""
+    op.drop_index('ix_rounds_house_id_scheduled_time', table_name='rounds')
+    op.drop_index('ix_rounds_scheduled_time', table_name='rounds')
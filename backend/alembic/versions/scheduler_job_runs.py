@@ -0,0 +1,38 @@
+"""Add background job run history
+
+Revision ID: scheduler_job_runs
+Revises: upload_private
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'scheduler_job_runs'
+down_revision = 'upload_private'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create scheduler_job_runs"""
+    op.create_table(
+        'scheduler_job_runs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_name', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('worker', sa.String(100), nullable=False),
+        sa.Column('scheduled_for', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('duration', sa.Float(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_scheduler_job_runs_job_started', 'scheduler_job_runs', ['job_name', 'started_at'])
+
+def downgrade():
+    """Drop scheduler_job_runs"""
+    op.drop_index('ix_scheduler_job_runs_job_started', table_name='scheduler_job_runs')
+    op.drop_table('scheduler_job_runs')
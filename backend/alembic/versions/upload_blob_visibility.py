@@ -0,0 +1,48 @@
+"""Key stored uploads by content hash and visibility
+
+Revision ID: upload_blob_visibility
+Revises: scheduler_job_runs
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'upload_blob_visibility'
+down_revision = 'scheduler_job_runs'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Public and private uploads of the same bytes become separate blobs"""
+    op.drop_constraint('upload_references_sha256_fkey', 'upload_references', type_='foreignkey')
+    op.drop_constraint('uq_upload_references_blob_owner', 'upload_references', type_='unique')
+    op.drop_constraint('upload_blobs_pkey', 'upload_blobs', type_='primary')
+    op.create_primary_key('upload_blobs_pkey', 'upload_blobs', ['sha256', 'private'])
+
+    op.add_column('upload_references', sa.Column('private', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute(
+        "UPDATE upload_references SET private = upload_blobs.private "
+        "FROM upload_blobs WHERE upload_blobs.sha256 = upload_references.sha256"
+    )
+    op.create_unique_constraint(
+        'uq_upload_references_blob_owner', 'upload_references', ['sha256', 'private', 'owner_type', 'owner_id']
+    )
+    op.create_foreign_key(
+        'fk_upload_references_blob', 'upload_references', 'upload_blobs', ['sha256', 'private'], ['sha256', 'private']
+    )
+
+def downgrade():
+    """Back to one blob per hash (fails while both copies of some content exist)"""
+    op.drop_constraint('fk_upload_references_blob', 'upload_references', type_='foreignkey')
+    op.drop_constraint('uq_upload_references_blob_owner', 'upload_references', type_='unique')
+    op.drop_column('upload_references', 'private')
+    op.drop_constraint('upload_blobs_pkey', 'upload_blobs', type_='primary')
+    op.create_primary_key('upload_blobs_pkey', 'upload_blobs', ['sha256'])
+    op.create_unique_constraint(
+        'uq_upload_references_blob_owner', 'upload_references', ['sha256', 'owner_type', 'owner_id']
+    )
+    op.create_foreign_key(
+        'upload_references_sha256_fkey', 'upload_references', 'upload_blobs', ['sha256'], ['sha256']
+    )
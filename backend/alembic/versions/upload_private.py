@@ -0,0 +1,23 @@
+"""Mark private stored uploads
+
+Revision ID: upload_private
+Revises: upload_variants
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'upload_private'
+down_revision = 'upload_variants'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add upload_blobs.private"""
+    op.add_column('upload_blobs', sa.Column('private', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+def downgrade():
+    """Drop upload_blobs.private"""
+    op.drop_column('upload_blobs', 'private')
@@ -0,0 +1,43 @@
+"""Add content-addressed upload store
+
+Revision ID: upload_store
+Revises: wallet_snapshot_index
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'upload_store'
+down_revision = 'wallet_snapshot_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create stored file and reference tables"""
+    op.create_table(
+        'upload_blobs',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('extension', sa.String(10), nullable=False, server_default=''),
+        sa.Column('content_type', sa.String(100), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('last_uploaded_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'upload_references',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('sha256', sa.String(64), sa.ForeignKey('upload_blobs.sha256'), nullable=False),
+        sa.Column('owner_type', sa.String(30), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('sha256', 'owner_type', 'owner_id', name='uq_upload_references_blob_owner'),
+    )
+    op.create_index('ix_upload_references_owner', 'upload_references', ['owner_type', 'owner_id'])
+
+def downgrade():
+    """Drop upload store tables (stored files stay on disk)"""
+    op.drop_index('ix_upload_references_owner', table_name='upload_references')
+    op.drop_table('upload_references')
+    op.drop_table('upload_blobs')
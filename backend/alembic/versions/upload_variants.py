@@ -0,0 +1,23 @@
+"""Record rendered image variants on stored uploads
+
+Revision ID: upload_variants
+Revises: upload_store
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'upload_variants'
+down_revision = 'upload_store'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add upload_blobs.variants"""
+    op.add_column('upload_blobs', sa.Column('variants', sa.JSON(), nullable=True))
+
+def downgrade():
+    """Drop upload_blobs.variants"""
+    op.drop_column('upload_blobs', 'variants')
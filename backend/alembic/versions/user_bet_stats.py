@@ -0,0 +1,57 @@
+"""Add per-user running bet totals
+
+Revision ID: user_bet_stats
+Revises: bet_ticket_history_index
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'user_bet_stats'
+down_revision = 'bet_ticket_history_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Create user_bet_stats and backfill it from existing bets and tickets"""
+    op.create_table(
+        'user_bet_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('total_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_bets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('pending_bets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('won_bets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lost_bets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_winnings', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("""
+        INSERT INTO user_bet_stats (user_id, total_tickets, total_bets, total_amount,
+                                    pending_bets, won_bets, lost_bets, total_winnings)
+        SELECT u.id,
+               COALESCE(t.total_tickets, 0), COALESCE(b.total_bets, 0), COALESCE(t.total_amount, 0),
+               COALESCE(b.pending_bets, 0), COALESCE(b.won_bets, 0), COALESCE(b.lost_bets, 0),
+               COALESCE(b.total_winnings, 0)
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS total_tickets, SUM(total_amount) AS total_amount
+            FROM bet_tickets GROUP BY user_id
+        ) t ON t.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id,
+                   COUNT(*) AS total_bets,
+                   SUM(CASE WHEN status = 'PENDING' THEN 1 ELSE 0 END) AS pending_bets,
+                   SUM(CASE WHEN status = 'WON' THEN 1 ELSE 0 END) AS won_bets,
+                   SUM(CASE WHEN status = 'LOST' THEN 1 ELSE 0 END) AS lost_bets,
+                   SUM(CASE WHEN status = 'WON' THEN actual_payout ELSE 0 END) AS total_winnings
+            FROM bets GROUP BY user_id
+        ) b ON b.user_id = u.id
+        WHERE t.user_id IS NOT NULL OR b.user_id IS NOT NULL
+    """)
+
+def downgrade():
+    """Drop user_bet_stats"""
+    op.drop_table('user_bet_stats')
@@ -0,0 +1,85 @@
+"""Add append-only wallet ledger
+
+Revision ID: wallet_ledger
+Revises: user_bet_stats
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'wallet_ledger'
+down_revision = 'user_bet_stats'
+branch_labels = None
+depends_on = None
+
+ENTRY_TYPES = ('OPENING_BALANCE', 'DEPOSIT', 'WITHDRAWAL', 'BET_STAKE', 'BET_WIN', 'BET_REFUND', 'ADJUSTMENT')
+
+def upgrade():
+    """Create the ledger tables, open every funded wallet with one entry and make entries immutable"""
+    op.add_column('users', sa.Column('ledger_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'ledger_entries',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('journal_id', sa.String(32), nullable=False),
+        sa.Column('account', sa.String(32), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('seq', sa.Integer(), nullable=True),
+        sa.Column('entry_type', sa.Enum(*ENTRY_TYPES, name='ledgerentrytype'), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('balance_after', sa.Float(), nullable=True),
+        sa.Column('reference', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('user_id', 'seq', name='uq_ledger_entries_user_seq'),
+    )
+    op.create_index('ix_ledger_entries_journal_id', 'ledger_entries', ['journal_id'])
+    op.create_index('ix_ledger_entries_user_created_seq', 'ledger_entries', ['user_id', 'created_at', 'seq'])
+    op.create_index('ix_ledger_entries_account_id', 'ledger_entries', ['account', 'id'])
+    op.create_table(
+        'ledger_snapshots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('account', sa.String(32), nullable=False),
+        sa.Column('last_entry_id', sa.BigInteger(), nullable=False),
+        sa.Column('balance', sa.Float(), nullable=False),
+        sa.Column('entries', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_ledger_snapshots_account_taken', 'ledger_snapshots', ['account', 'taken_at'])
+
+    # Existing balances become opening entries against the adjustments account
+    for account, user_id, seq, amount, balance_after in (
+        ("'wallet'", 'id', '1', 'wallet_balance', 'wallet_balance'),
+        ("'adjustments'", 'NULL', 'NULL', '-wallet_balance', 'NULL'),
+    ):
+        op.execute(f"""
+            INSERT INTO ledger_entries (journal_id, account, user_id, seq, entry_type, amount, balance_after, reference)
+            SELECT 'opening' || id, {account}, {user_id}, {seq}, 'OPENING_BALANCE', {amount}, {balance_after}, 'user:' || id
+            FROM users WHERE COALESCE(wallet_balance, 0) <> 0
+        """)
+    op.execute("UPDATE users SET ledger_seq = 1 WHERE COALESCE(wallet_balance, 0) <> 0")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE FUNCTION ledger_entries_immutable() RETURNS trigger AS $$
+            BEGIN
+                RAISE EXCEPTION 'ledger_entries is append-only';
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER ledger_entries_append_only
+            BEFORE UPDATE OR DELETE ON ledger_entries
+            FOR EACH ROW EXECUTE FUNCTION ledger_entries_immutable()
+        """)
+
+def downgrade():
+    """Drop the ledger tables and users.ledger_seq"""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS ledger_entries_append_only ON ledger_entries")
+        op.execute("DROP FUNCTION IF EXISTS ledger_entries_immutable()")
+    op.drop_table('ledger_snapshots')
+    op.drop_table('ledger_entries')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TYPE IF EXISTS ledgerentrytype")
+    op.drop_column('users', 'ledger_seq')
@@ -0,0 +1,22 @@
+"""Index recent transactions per user
+
+Revision ID: wallet_snapshot_index
+Revises: pending_transactions_index
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'wallet_snapshot_index'
+down_revision = 'pending_transactions_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    """Add (user_id, created_at, id) index used to rebuild wallet snapshots"""
+    op.create_index('ix_transactions_user_created_id', 'transactions', ['user_id', 'created_at', 'id'])
+
+def downgrade():
+    """Drop wallet snapshot index"""
+    op.drop_index('ix_transactions_user_created_id', table_name='transactions')
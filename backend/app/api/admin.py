@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import List, Optional
 from datetime import datetime, date, timezone, timedelta
 
+from app.config import settings
 from app.database import get_db
 from app.schemas.admin import HouseCreate, HouseUpdate, UserManagement, DashboardStats, UserStats, HouseResponse, AdminUserCreate, UserRoleUpdate, TaskAssignment
 from app.schemas.round import RoundCreate, RoundUpdate, RoundResponse
-from app.schemas.wallet import TransactionUpdate, TransactionResponse, DetailedTransactionResponse
+from app.schemas.wallet import TransactionUpdate, TransactionResponse, DetailedTransactionResponse, TransactionBatchRequest
 from app.schemas.auth import UserResponse
 from app.schemas.bet import BetResponse
 from app.schemas.payment import PaymentMethodCreate, PaymentMethodUpdate, PaymentMethodResponse
@@ -15,58 +17,20 @@ from app.schemas.banner import Banner as BannerSchema, BannerCreate, BannerUpdat
 from app.services.round_service import RoundService
 from app.services.wallet_service import WalletService
 from app.services.teer_scheduler import TeerSchedulerService
+from app.services.scheduling_service import SchedulingService
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, as_utc, local_day_bounds, local_today
+from app.services.events import (
+    event_bus, RESULT_PUBLISHED, ROUNDS_CHANGED, HOUSES_CHANGED, BANNERS_CHANGED, PAYMENT_METHODS_CHANGED
+)
+from app.services.bet_stats_service import BetStatsService, accumulate
+from app.services.wallet_cache import wallet_snapshots
+from app.services.upload_store import sign_private_urls, upload_store
 from app.models import User, House, Round, Transaction, Bet
 from app.models.round import RoundStatus, RoundType
-import pytz
 
-async def reschedule_future_rounds(house_id: int, db: Session):
-    """Reschedule all future scheduled rounds for a house when timings change"""
-    try:
-        house = db.query(House).filter(House.id == house_id).first()
-        if not house:
-            return
-        
-        # Get all future scheduled rounds for this house
-        from datetime import datetime
-        now_utc = datetime.now(pytz.UTC)
-        
-        future_rounds = db.query(Round).filter(
-            and_(
-                Round.house_id == house_id,
-                Round.status == RoundStatus.SCHEDULED,
-                Round.scheduled_time > now_utc
-            )
-        ).all()
-        
-        # Update each round with new timing
-        for round_obj in future_rounds:
-            # Get the date part of the original scheduled time
-            original_datetime = round_obj.scheduled_time
-            round_date = original_datetime.date()
-            
-            # Calculate new time based on round type
-            if round_obj.round_type == RoundType.FR:
-                new_datetime = house.get_local_datetime(round_date, house.fr_time)
-            elif round_obj.round_type == RoundType.SR:
-                new_datetime = house.get_local_datetime(round_date, house.sr_time)
-            else:
-                continue  # Skip other round types
-            
-            # Convert to UTC for storage
-            new_datetime_utc = new_datetime.astimezone(pytz.UTC)
-            new_betting_deadline = house.get_betting_deadline(new_datetime_utc)
-            
-            # Update the round
-            round_obj.scheduled_time = new_datetime_utc
-            round_obj.betting_closes_at = new_betting_deadline
-        
-        db.commit()
-        
-    except Exception as e:
-        db.rollback()
-        print(f"Error rescheduling rounds for house {house_id}: {str(e)}")
 from app.models.payment_method import PaymentMethod, PaymentMethodType
 from app.models.banner import Banner
+from app.models.upload import BANNER_OWNER, PAYMENT_METHOD_OWNER
 from app.models.transaction import TransactionType, TransactionStatus
 from app.models.round import RoundStatus, RoundType
 from app.models.bet import BetType, BetStatus
@@ -83,7 +47,7 @@ async def get_dashboard_stats(
     db: Session = Depends(get_db)
 ):
     """Get admin dashboard statistics"""
-    today = date.today()
+    today_start, today_end = local_day_bounds(PLATFORM_TIMEZONE, local_today())
     
     # Basic counts
     total_users = db.query(func.count(User.id)).scalar()
@@ -93,7 +57,8 @@ async def get_dashboard_stats(
     
     # Today's data
     todays_rounds = db.query(func.count(Round.id)).filter(
-        func.date(Round.scheduled_time) == today
+        Round.scheduled_time >= today_start,
+        Round.scheduled_time < today_end
     ).scalar()
     
     pending_deposits = db.query(func.count(Transaction.id)).filter(
@@ -118,7 +83,8 @@ async def get_dashboard_stats(
         func.count(Bet.id),
         func.sum(Bet.bet_amount)
     ).filter(
-        func.date(Bet.created_at) == today
+        Bet.created_at >= today_start,
+        Bet.created_at < today_end
     ).first()
     
     today_bets = todays_bets[0] or 0
@@ -138,13 +104,15 @@ async def get_dashboard_stats(
     today_deposits = db.query(func.sum(Transaction.amount)).filter(
         Transaction.transaction_type == TransactionType.DEPOSIT,
         Transaction.status == TransactionStatus.COMPLETED,
-        func.date(Transaction.created_at) == today
+        Transaction.created_at >= today_start,
+        Transaction.created_at < today_end
     ).scalar()
     
     today_withdrawals = db.query(func.sum(Transaction.amount)).filter(
         Transaction.transaction_type == TransactionType.WITHDRAWAL,
         Transaction.status == TransactionStatus.COMPLETED,
-        func.date(Transaction.created_at) == today
+        Transaction.created_at >= today_start,
+        Transaction.created_at < today_end
     ).scalar()
     
     # Calculate profits (simplified)
@@ -253,15 +221,11 @@ async def get_rounds_ready_for_results(
     db: Session = Depends(get_db)
 ):
     """Get rounds that are ready for result entry (betting closed, no result yet)"""
-    scheduler = TeerSchedulerService(db)
-    
-    # First update round statuses to close any rounds past deadline
-    status_update = scheduler.update_round_statuses()
-    
-    # Get rounds that are active and past betting deadline but don't have results yet
+    # Get rounds that are past betting deadline but don't have results yet; the
+    # lifecycle scheduler flips their status, so the deadline is what counts here
     # Exclude FORECAST rounds since they are automatically processed when FR and SR are published
     ready_rounds = db.query(Round).filter(
-        Round.status == RoundStatus.ACTIVE,
+        Round.status.in_([RoundStatus.SCHEDULED, RoundStatus.ACTIVE]),
         Round.betting_closes_at <= datetime.now(timezone.utc),
         Round.result.is_(None),
         Round.round_type.in_([RoundType.FR, RoundType.SR])
@@ -303,7 +267,7 @@ async def publish_result(
         raise HTTPException(status_code=404, detail="Round not found")
     
     # Check if round is ready for results
-    betting_closed = round_obj.betting_closes_at <= datetime.now(timezone.utc)
+    betting_closed = as_utc(round_obj.betting_closes_at) <= datetime.now(timezone.utc)
     valid_statuses = [RoundStatus.SCHEDULED, RoundStatus.ACTIVE] if betting_closed else [RoundStatus.SCHEDULED]
     
     if round_obj.status not in valid_statuses:
@@ -368,6 +332,10 @@ async def publish_result(
                 forecast_winners = forecast_result.get("winning_bets", 0)
         
         db.commit()
+        event_bus.publish(
+            RESULT_PUBLISHED, round_id=round_id, house_id=round_obj.house_id,
+            round_type=round_obj.round_type.value, result=result
+        )
         
         total_winners = regular_winners + forecast_winners
         message = f"Result published successfully. {regular_winners} regular winners"
@@ -464,6 +432,10 @@ async def update_result(
                 forecast_winners = forecast_result.get("winning_bets", 0)
         
         db.commit()
+        event_bus.publish(
+            RESULT_PUBLISHED, round_id=round_id, house_id=round_obj.house_id,
+            round_type=round_obj.round_type.value, result=result
+        )
         
         total_winners = regular_winners + forecast_winners
         message = f"Result updated successfully. {regular_winners} regular winners"
@@ -616,26 +588,21 @@ async def cancel_round(
             Bet.status == BetStatus.PENDING
         ).all()
         
-        wallet_service = WalletService(db)
-        refunded_amount = 0
-        refunded_bets = 0
-        
-        # Refund all pending bets
+        # Refund all pending bets in one ledger batch
+        stat_deltas = {}
         for bet in bets:
-            # Refund the bet amount to user's wallet
-            try:
-                wallet_service.add_balance(bet.user_id, bet.bet_amount, "Round cancellation refund")
-                bet.status = BetStatus.CANCELLED
-                refunded_amount += bet.bet_amount
-                refunded_bets += 1
-            except Exception as bet_error:
-                pass  # Continue with other bets
-                continue
+            bet.status = BetStatus.CANCELLED
+            accumulate(stat_deltas, bet.user_id, pending_bets=-1)
+        postings = WalletService(db).refund_bets(bets, "Round cancellation refund")
+        refunded_amount = sum(posting.amount for posting in postings)
+        refunded_bets = len(postings)
         
         # Update round status
         round_obj.status = RoundStatus.CANCELLED
+        BetStatsService(db).apply(stat_deltas)
         
         db.commit()
+        wallet_snapshots.committed(db, {posting.user_id for posting in postings})
         
         return {
             "message": f"Round cancelled successfully. Refunded {refunded_bets} bets totaling ₹{refunded_amount}",
@@ -840,6 +807,7 @@ async def create_house(
         
         db.add(db_house)
         db.commit()
+        event_bus.publish(HOUSES_CHANGED)
         db.refresh(db_house)
         
         return HouseResponse(
@@ -988,10 +956,11 @@ async def update_house(
                 setattr(house, field, value)
         
         db.commit()
+        event_bus.publish(HOUSES_CHANGED)
         
         # If timing was changed, reschedule future rounds
         if timing_changed:
-            await reschedule_future_rounds(house_id, db)
+            SchedulingService(db).reschedule_future_rounds(house)
         
         db.refresh(house)
         
@@ -1058,6 +1027,7 @@ async def delete_house(
     try:
         db.delete(house)
         db.commit()
+        event_bus.publish(HOUSES_CHANGED)
         
         return {"message": "House deleted successfully"}
         
@@ -1104,6 +1074,7 @@ async def delete_all_house_rounds(
                 deleted_count += 1
         
         db.commit()
+        event_bus.publish(ROUNDS_CHANGED, house_id=house_id)
         
         message = f"Deleted {deleted_count} rounds"
         if skipped_with_bets > 0:
@@ -1265,9 +1236,9 @@ async def get_all_transactions(
         amount=trans.amount,
         status=trans.status,
         description=trans.description,
-        payment_proof_url=trans.payment_proof_url,
+        payment_proof_url=sign_private_urls(trans.payment_proof_url),
         payment_method_id=trans.payment_method_id,
-        transaction_details=trans.transaction_details,
+        transaction_details=sign_private_urls(trans.transaction_details),
         deposit_method=trans.deposit_method,
         reference_number=trans.reference_number,
         deposit_bank=trans.deposit_bank,
@@ -1282,13 +1253,53 @@ async def get_all_transactions(
 
 @router.get("/transactions/pending", response_model=List[TransactionResponse])
 async def get_pending_transactions(
+    response: Response,
     transaction_type: Optional[TransactionType] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all pending transactions"""
+    """Pending transactions, oldest first, at most `limit` (default 100) per response.
+
+    Callers that want every pending transaction must follow X-Next-Cursor until it is absent.
+    """
     wallet_service = WalletService(db)
-    return wallet_service.get_pending_transactions(transaction_type)
+    try:
+        transactions, next_cursor = wallet_service.get_pending_transactions_page(transaction_type, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    for transaction in transactions:
+        transaction.payment_proof_url = sign_private_urls(transaction.payment_proof_url)
+        transaction.transaction_details = sign_private_urls(transaction.transaction_details)
+    return transactions
+
+@router.get("/transactions/pending/count")
+async def count_pending_transactions(
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Pending transaction counts and amounts by type"""
+    return WalletService(db).count_pending_transactions()
+
+@router.post("/transactions/batch")
+async def process_transactions_batch(
+    batch: TransactionBatchRequest,
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Approve or reject many pending deposits/withdrawals at once"""
+    results, message = WalletService(db).process_transactions_batch(
+        batch.transaction_ids, batch.action == "approve", current_admin.id, batch.admin_notes
+    )
+    if not results:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+    return {"message": message, "results": results}
 
 @router.get("/transactions/detailed", response_model=List[DetailedTransactionResponse])
 async def get_detailed_transactions(
@@ -1334,9 +1345,9 @@ async def get_detailed_transactions(
             "amount": transaction.amount,
             "status": transaction.status,
             "description": transaction.description,
-            "payment_proof_url": transaction.payment_proof_url,
+            "payment_proof_url": sign_private_urls(transaction.payment_proof_url),
             "payment_method_id": transaction.payment_method_id,
-            "transaction_details": transaction.transaction_details,
+            "transaction_details": sign_private_urls(transaction.transaction_details),
             "deposit_method": transaction.deposit_method,
             "reference_number": transaction.reference_number,
             "deposit_bank": transaction.deposit_bank,
@@ -1481,6 +1492,63 @@ async def test_admin_endpoint(
         }
     }
 
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    gzip: bool = Query(False, description="Compress the download on the fly"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    house_id: Optional[int] = Query(None),
+    type: Optional[str] = Query(None, description="Transaction or bet type"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    cursor: Optional[str] = Query(None, description="cursor of the last row received, to resume"),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Stream transactions, bets or tickets as CSV or Parquet with constant memory"""
+    from app.database import SessionLocal
+    from app.services.export_service import DATASETS, ExportService, build_export_query
+    from app.utils.export_writers import csv_chunks, gzip_chunks, parquet_chunks
+
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown export: {dataset}")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export needs pyarrow")
+    try:
+        query = build_export_query(
+            dataset, date_from=date_from, date_to=date_to, house_id=house_id,
+            type_filter=type, status=status_filter, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    columns = DATASETS[dataset].export_columns
+
+    def chunks():
+        # The request session is closed before streaming starts, so use our own
+        db = SessionLocal()
+        try:
+            rows = ExportService(db).iter_rows(query)
+            if format == "parquet":
+                # Parquet compresses internally, so gzip selects its codec instead of wrapping the file
+                yield from parquet_chunks(columns, rows, compression="gzip" if gzip else "snappy")
+            elif gzip:
+                yield from gzip_chunks(csv_chunks(columns, rows))
+            else:
+                yield from csv_chunks(columns, rows)
+        finally:
+            db.close()
+
+    filename = f"{dataset}.{format}" + (".gz" if gzip and format == "csv" else "")
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/gzip" if gzip else "text/csv"
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # Bets Management
 @router.get("/bets", response_model=List[BetResponse])
 async def get_all_bets(
@@ -1524,14 +1592,15 @@ async def get_system_stats(
     """Get detailed system statistics"""
     from datetime import datetime, timedelta
     
-    today = datetime.now().date()
+    today = local_today()
+    today_start, today_end = local_day_bounds(PLATFORM_TIMEZONE, today)
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
     # User stats
     total_users = db.query(func.count(User.id)).scalar()
     active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
-    new_users_week = db.query(func.count(User.id)).filter(func.date(User.created_at) >= week_ago).scalar()
+    new_users_week = db.query(func.count(User.id)).filter(User.created_at >= local_day_bounds(PLATFORM_TIMEZONE, week_ago)[0]).scalar()
     
     # House stats
     total_houses = db.query(func.count(House.id)).scalar()
@@ -1540,7 +1609,10 @@ async def get_system_stats(
     # Round stats
     total_rounds = db.query(func.count(Round.id)).scalar()
     completed_rounds = db.query(func.count(Round.id)).filter(Round.status == RoundStatus.COMPLETED).scalar()
-    todays_rounds = db.query(func.count(Round.id)).filter(func.date(Round.scheduled_time) == today).scalar()
+    todays_rounds = db.query(func.count(Round.id)).filter(
+        Round.scheduled_time >= today_start,
+        Round.scheduled_time < today_end
+    ).scalar()
     
     # Bet stats
     total_bets = db.query(func.count(Bet.id)).scalar()
@@ -1651,81 +1723,8 @@ async def auto_schedule_house_rounds(
         if not house:
             raise HTTPException(status_code=404, detail="House not found")
         
-        scheduler = TeerSchedulerService(db)
-        total_rounds_created = 0
-        
-        # Schedule rounds for each day in the next N days
-        for i in range(1, days_ahead + 1):
-            target_date = date.today() + timedelta(days=i)
-            
-            # Check if house is supposed to run on this day
-            weekday = target_date.weekday()  # 0=Monday, 6=Sunday
-            day_mapping = {
-                0: house.runs_monday,
-                1: house.runs_tuesday, 
-                2: house.runs_wednesday,
-                3: house.runs_thursday,
-                4: house.runs_friday,
-                5: house.runs_saturday,
-                6: house.runs_sunday
-            }
-            
-            if not day_mapping.get(weekday, False):
-                continue  # Skip days when house doesn't run
-            
-            # Check if rounds already exist for this date
-            existing_rounds = db.query(Round).filter(
-                Round.house_id == house_id,
-                func.date(Round.scheduled_time) == target_date
-            ).count()
-            
-            if existing_rounds > 0:
-                continue  # Skip if rounds already exist
-            
-            # Create FR and SR rounds for this house on this date using house timezone
-            try:
-                from zoneinfo import ZoneInfo
-                house_tz = ZoneInfo(house.timezone) if hasattr(house, 'timezone') else ZoneInfo('Asia/Kolkata')
-                
-                # Create times in house timezone first
-                fr_time_local = datetime.combine(target_date, house.fr_time).replace(tzinfo=house_tz)
-                sr_time_local = datetime.combine(target_date, house.sr_time).replace(tzinfo=house_tz)
-                
-                # Convert to UTC for database storage
-                fr_time = fr_time_local.astimezone(timezone.utc)
-                sr_time = sr_time_local.astimezone(timezone.utc)
-            except:
-                # Fallback to UTC if timezone handling fails
-                fr_time = datetime.combine(target_date, house.fr_time).replace(tzinfo=timezone.utc)
-                sr_time = datetime.combine(target_date, house.sr_time).replace(tzinfo=timezone.utc)
-            
-            # Calculate betting close times
-            fr_betting_closes = fr_time - timedelta(minutes=house.betting_window_minutes)
-            sr_betting_closes = sr_time - timedelta(minutes=house.betting_window_minutes)
-            
-            # Create FR Round
-            fr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.FR,
-                scheduled_time=fr_time,
-                betting_closes_at=fr_betting_closes,
-                status=RoundStatus.SCHEDULED
-            )
-            db.add(fr_round)
-            total_rounds_created += 1
-            
-            # Create SR Round  
-            sr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.SR,
-                scheduled_time=sr_time,
-                betting_closes_at=sr_betting_closes,
-                status=RoundStatus.SCHEDULED
-            )
-            db.add(sr_round)
-            total_rounds_created += 1
-        
-        db.commit()
+        # Generate the whole window in one bulk insert
+        total_rounds_created = SchedulingService(db).generate_rounds([house], days_ahead=days_ahead)
         
         return {
             "success": True,
@@ -1834,12 +1833,13 @@ async def update_house_schedule(
         db.commit()
         
         # Reschedule all future rounds
-        await reschedule_future_rounds(house_id, db)
+        rounds_rescheduled = SchedulingService(db).reschedule_future_rounds(house)
         
         return {
             "success": True,
-            "message": f"House schedule updated and future rounds rescheduled",
+            "message": f"House schedule updated and {rounds_rescheduled} future rounds rescheduled",
             "house_id": house_id,
+            "rounds_rescheduled": rounds_rescheduled,
             "new_fr_time": str(house.fr_time),
             "new_sr_time": str(house.sr_time),
             "timezone": house.timezone
@@ -1852,81 +1852,6 @@ async def update_house_schedule(
             detail=f"Error updating house schedule: {str(e)}"
         )
 
-@router.put("/houses/{house_id}/schedule")
-async def update_house_schedule(
-    house_id: int,
-    fr_time: str = Query(..., description="FR time in HH:MM format"),
-    sr_time: str = Query(..., description="SR time in HH:MM format"),
-    betting_window_minutes: int = Query(5, description="Minutes before round time to close betting"),
-    runs_monday: bool = Query(True),
-    runs_tuesday: bool = Query(True),
-    runs_wednesday: bool = Query(True),
-    runs_thursday: bool = Query(True),
-    runs_friday: bool = Query(True),
-    runs_saturday: bool = Query(True),
-    runs_sunday: bool = Query(True),
-    current_admin: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
-):
-    """Update house schedule and weekday settings"""
-    try:
-        from datetime import time
-        
-        house = db.query(House).filter(House.id == house_id).first()
-        if not house:
-            raise HTTPException(status_code=404, detail="House not found")
-        
-        # Parse time strings
-        try:
-            fr_hour, fr_minute = map(int, fr_time.split(':'))
-            sr_hour, sr_minute = map(int, sr_time.split(':'))
-            house.fr_time = time(fr_hour, fr_minute)
-            house.sr_time = time(sr_hour, sr_minute)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid time format. Use HH:MM format."
-            )
-        
-        # Update schedule settings
-        house.betting_window_minutes = betting_window_minutes
-        house.runs_monday = runs_monday
-        house.runs_tuesday = runs_tuesday
-        house.runs_wednesday = runs_wednesday
-        house.runs_thursday = runs_thursday
-        house.runs_friday = runs_friday
-        house.runs_saturday = runs_saturday
-        house.runs_sunday = runs_sunday
-        
-        db.commit()
-        
-        return {
-            "message": "House schedule updated successfully",
-            "house": {
-                "id": house.id,
-                "name": house.name,
-                "fr_time": house.fr_time.strftime('%H:%M'),
-                "sr_time": house.sr_time.strftime('%H:%M'),
-                "betting_window_minutes": house.betting_window_minutes,
-                "weekday_schedule": {
-                    "monday": house.runs_monday,
-                    "tuesday": house.runs_tuesday,
-                    "wednesday": house.runs_wednesday,
-                    "thursday": house.runs_thursday,
-                    "friday": house.runs_friday,
-                    "saturday": house.runs_saturday,
-                    "sunday": house.runs_sunday
-                }
-            }
-        }
-    
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error updating house schedule: {str(e)}"
-        )
-
 # Banner Management
 @router.get("/banners", response_model=List[BannerSchema])
 async def get_all_banners(
@@ -1947,7 +1872,10 @@ async def create_banner(
     try:
         banner = Banner(**banner_data.model_dump())
         db.add(banner)
+        db.flush()
+        upload_store.link(db, BANNER_OWNER, banner.id, banner.image_url)
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(banner)
         return banner
     except Exception as e:
@@ -1970,8 +1898,10 @@ async def update_banner(
         update_data = banner_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(banner, field, value)
+        upload_store.link(db, BANNER_OWNER, banner.id, banner.image_url)
         
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(banner)
         return banner
     except Exception as e:
@@ -1990,8 +1920,10 @@ async def delete_banner(
         raise HTTPException(status_code=404, detail="Banner not found")
     
     try:
+        upload_store.link(db, BANNER_OWNER, banner.id)
         db.delete(banner)
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         return {"message": "Banner deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -2011,6 +1943,7 @@ async def toggle_banner_status(
     try:
         banner.is_active = not banner.is_active
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(banner)
         return banner
     except Exception as e:
@@ -2062,7 +1995,10 @@ async def create_payment_method(
     
     db_payment_method = PaymentMethod(**payment_method.dict())
     db.add(db_payment_method)
+    db.flush()
+    upload_store.link(db, PAYMENT_METHOD_OWNER, db_payment_method.id, db_payment_method.details)
     db.commit()
+    event_bus.publish(PAYMENT_METHODS_CHANGED)
     db.refresh(db_payment_method)
     return db_payment_method
 
@@ -2081,8 +2017,10 @@ async def update_payment_method(
     update_data = payment_method.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_payment_method, field, value)
+    upload_store.link(db, PAYMENT_METHOD_OWNER, db_payment_method.id, db_payment_method.details)
     
     db.commit()
+    event_bus.publish(PAYMENT_METHODS_CHANGED)
     db.refresh(db_payment_method)
     return db_payment_method
 
@@ -2097,8 +2035,10 @@ async def delete_payment_method(
     if not db_payment_method:
         raise HTTPException(status_code=404, detail="Payment method not found")
     
+    upload_store.link(db, PAYMENT_METHOD_OWNER, db_payment_method.id)
     db.delete(db_payment_method)
     db.commit()
+    event_bus.publish(PAYMENT_METHODS_CHANGED)
     return {"message": "Payment method deleted successfully"}
 
 # Results endpoints for admin dashboard
@@ -2178,14 +2118,17 @@ async def get_forecast_info(
 ):
     """Get FR and SR round info for forecast betting configuration"""
     try:
+        house_timezone = db.query(House.timezone).filter(House.id == house_id).scalar()
         if target_date is None:
-            target_date = date.today()
+            target_date = local_today(house_timezone)
+        day_start, day_end = local_day_bounds(house_timezone, target_date)
         
         # Get FR and SR rounds for the house on the target date
         rounds = db.query(Round).filter(
             and_(
                 Round.house_id == house_id,
-                func.date(Round.scheduled_time) == target_date,
+                Round.scheduled_time >= day_start,
+                Round.scheduled_time < day_end,
                 Round.round_type.in_([RoundType.FR, RoundType.SR])
             )
         ).order_by(Round.scheduled_time.asc()).all()
@@ -2193,7 +2136,8 @@ async def get_forecast_info(
         forecast_round = db.query(Round).filter(
             and_(
                 Round.house_id == house_id,
-                func.date(Round.scheduled_time) == target_date,
+                Round.scheduled_time >= day_start,
+                Round.scheduled_time < day_end,
                 Round.round_type == RoundType.FORECAST
             )
         ).first()
@@ -2531,4 +2475,65 @@ async def get_all_tasks(
             "completed_at": task.completed_at
         }
         for task in tasks
-    ]
\ No newline at end of file
+    ]
+
+@router.get("/query-profile")
+async def get_query_profile(
+    limit: int = Query(20, ge=1, le=100),
+    reset: bool = Query(False),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Routes with the most SQL per request (this worker, QUERY_PROFILING only)"""
+    from app.utils.query_profiler import route_query_stats
+
+    routes = route_query_stats.worst(limit)
+    if reset:
+        route_query_stats.reset()
+    return {"enabled": settings.QUERY_PROFILING, "routes": routes}
+
+@router.get("/ledger/reconcile")
+async def reconcile_ledger(
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Wallets that disagree with the ledger, unbalanced journals and platform account balances"""
+    from app.services.ledger_service import LedgerService, PLATFORM_ACCOUNTS
+
+    ledger_service = LedgerService(db)
+    report = ledger_service.reconcile(limit=limit)
+    report["accounts"] = {account: ledger_service.account_balance(account) for account in PLATFORM_ACCOUNTS}
+    return report
+
+@router.get("/scheduler/runs")
+async def get_scheduler_runs(
+    job: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Recent background job runs, newest first, and this worker's view of the scheduler"""
+    from app.models.scheduler import JobRun
+    from app.services.scheduled_jobs import scheduler
+
+    query = db.query(JobRun)
+    if job:
+        query = query.filter(JobRun.job_name == job)
+    runs = query.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit).all()
+    return {
+        "scheduler": scheduler.status(),
+        "runs": [
+            {
+                "id": run.id,
+                "job": run.job_name,
+                "status": run.status,
+                "worker": run.worker,
+                "scheduled_for": run.scheduled_for,
+                "started_at": run.started_at,
+                "duration": run.duration,
+                "result": run.result,
+                "error": run.error
+            }
+            for run in runs
+        ]
+    }
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, func, desc, text
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, text
 from typing import List, Optional
 from datetime import datetime, date, timezone, timedelta
 from pydantic import BaseModel
 
 from app.database import get_db
-from app.schemas.round import RoundResponse
 from app.services.round_service import RoundService
+from app.services.events import event_bus, RESULT_PUBLISHED
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, local_date_of, local_day_bounds, local_today
 from app.models import User, House, Round
 from app.models.round import RoundStatus, RoundType
 from app.dependencies import get_current_admin_user
@@ -39,12 +40,13 @@ async def get_results_overview(
     """Get overview of results for the last N days, grouped by date and house"""
     
     # Get all rounds from the last N days
-    start_date = datetime.now(timezone.utc).date() - timedelta(days=days_back)
+    start_date = local_today() - timedelta(days=days_back)
+    window_start, _ = local_day_bounds(PLATFORM_TIMEZONE, start_date)
     
     rounds = db.query(Round).join(House).filter(
-        func.date(Round.scheduled_time) >= start_date
+        Round.scheduled_time >= window_start
     ).order_by(
-        desc(func.date(Round.scheduled_time)),
+        desc(Round.scheduled_time),
         Round.house_id,
         Round.round_type
     ).all()
@@ -52,7 +54,7 @@ async def get_results_overview(
     # Group by date and house
     overview = {}
     for round_obj in rounds:
-        date_str = round_obj.scheduled_time.date().isoformat()
+        date_str = local_date_of(round_obj.house.timezone, round_obj.scheduled_time).isoformat()
         key = f"{date_str}_{round_obj.house_id}"
         
         if key not in overview:
@@ -90,11 +92,6 @@ async def get_pending_results(
 ):
     """Get ALL rounds that need results - improved logic for admin convenience"""
     
-    # Update round statuses first
-    from app.services.teer_scheduler import TeerSchedulerService
-    scheduler = TeerSchedulerService(db)
-    scheduler.update_round_statuses()
-    
     # Get ALL rounds from recent days that don't have results yet
     # This allows admin to see and update results anytime, even future rounds
     start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
@@ -196,6 +193,11 @@ async def publish_result(
         forecast_winners = 0
         forecast_details = {}
         
+        # FR and SR pair up within the house's local draw day
+        day_start, day_end = local_day_bounds(
+            round_obj.house.timezone, local_date_of(round_obj.house.timezone, round_obj.scheduled_time)
+        )
+        
         if round_obj.round_type == RoundType.SR:
             # If this is an SR round, check for corresponding FR round to process forecasts
             fr_round = db.query(Round).filter(
@@ -204,7 +206,8 @@ async def publish_result(
                     Round.round_type == RoundType.FR,
                     Round.status == RoundStatus.COMPLETED,
                     Round.result.isnot(None),
-                    func.date(Round.scheduled_time) == func.date(round_obj.scheduled_time)
+                    Round.scheduled_time >= day_start,
+                    Round.scheduled_time < day_end
                 )
             ).first()
             
@@ -236,7 +239,8 @@ async def publish_result(
                     Round.round_type == RoundType.SR,
                     Round.status == RoundStatus.COMPLETED,
                     Round.result.isnot(None),
-                    func.date(Round.scheduled_time) == func.date(round_obj.scheduled_time)
+                    Round.scheduled_time >= day_start,
+                    Round.scheduled_time < day_end
                 )
             ).first()
             
@@ -261,6 +265,10 @@ async def publish_result(
                 }
         
         db.commit()
+        event_bus.publish(
+            RESULT_PUBLISHED, round_id=round_id, house_id=round_obj.house_id,
+            round_type=round_obj.round_type.value, result=request.result
+        )
         
         # NEW LOGIC: Auto-create next day rounds if both FR and SR results are now published
         next_day_creation_result = None
@@ -5,6 +5,9 @@ from typing import List
 from app.database import get_db
 from app.schemas.banner import Banner as BannerResponse, BannerCreate, BannerUpdate
 from app.models.banner import Banner
+from app.services.events import event_bus, BANNERS_CHANGED
+from app.services.upload_store import upload_store
+from app.models.upload import BANNER_OWNER
 
 router = APIRouter(tags=["banners"])
 
@@ -34,7 +37,10 @@ async def create_banner(banner_data: BannerCreate, db: Session = Depends(get_db)
     try:
         new_banner = Banner(**banner_data.model_dump())
         db.add(new_banner)
+        db.flush()
+        upload_store.link(db, BANNER_OWNER, new_banner.id, new_banner.image_url)
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(new_banner)
         return new_banner
     except Exception as e:
@@ -52,8 +58,10 @@ async def update_banner(banner_id: int, banner_data: BannerUpdate, db: Session =
         update_data = banner_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(banner, field, value)
+        upload_store.link(db, BANNER_OWNER, banner.id, banner.image_url)
         
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(banner)
         return banner
     except Exception as e:
@@ -68,8 +76,10 @@ async def delete_banner(banner_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Banner not found")
     
     try:
+        upload_store.link(db, BANNER_OWNER, banner.id)
         db.delete(banner)
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         return {"message": "Banner deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -85,6 +95,7 @@ async def toggle_banner_status(banner_id: int, db: Session = Depends(get_db)):
     try:
         banner.is_active = not banner.is_active
         db.commit()
+        event_bus.publish(BANNERS_CHANGED)
         db.refresh(banner)
         return banner
     except Exception as e:
@@ -1,17 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
+import csv
+import io
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.dependencies import get_current_user
 from app.schemas.bet import BetCreate, BetResponse, BetSummaryResponse, TicketCreate, TicketResponse, BetValidationResponse, ForecastBet
 from app.schemas.round import RoundResponse
 from app.schemas.admin import HouseResponse, GameSettingsResponse
 from app.services.bet_service import EnhancedBetService
+from app.services.bet_stats_service import BetStatsService
+from app.services.ledger_service import LedgerService, Posting
+from app.services.wallet_cache import wallet_snapshots
+from app.utils.fast_json import FastJSONResponse
+from app.services.schedule_calculator import as_utc, local_date_of, local_day_bounds, local_today
 from app.models import User, Round
 from app.models.bet import BetStatus, BetType, Bet
 from app.models.round import RoundType, RoundStatus
 from app.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.models.ledger import LedgerEntryType
 
 router = APIRouter()
 
@@ -248,7 +258,9 @@ async def place_new_forecast_bet(
         db.add(bet)
         
         # Update user balance
-        current_user.wallet_balance -= forecast_bet.amount
+        posting, = LedgerService(db).post(
+            Posting(current_user.id, -forecast_bet.amount, LedgerEntryType.BET_STAKE, f"ticket:{bet.ticket_id}")
+        )
         
         # Create transaction record
         transaction = Transaction(
@@ -256,12 +268,16 @@ async def place_new_forecast_bet(
             amount=forecast_bet.amount,
             transaction_type=TransactionType.BET_PLACED,
             status=TransactionStatus.COMPLETED,
+            balance_before=posting.balance_before,
+            balance_after=posting.balance_after,
             description=f"Forecast {forecast_bet.forecast_type} bet: {forecast_bet.fr_number}-{forecast_bet.sr_number} on {house.name}"
         )
         
         db.add(transaction)
+        BetStatsService(db).apply({current_user.id: {"total_bets": 1, "pending_bets": 1}})
         db.commit()
         db.refresh(bet)
+        wallet_snapshots.committed(db, [current_user.id])
         
         return {
             "success": True,
@@ -321,12 +337,67 @@ async def validate_bet_ticket(
 @router.get("/my-tickets", response_model=List[TicketResponse])
 async def get_my_tickets(
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    status_filter: Optional[BetStatus] = Query(None, alias="status"),
+    house_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get current user's recent betting tickets"""
+    """Get current user's betting tickets, newest first; follow X-Next-Cursor for older pages"""
     bet_service = EnhancedBetService(db)
-    return bet_service.get_user_tickets(current_user.id, limit)
+    try:
+        tickets, next_cursor = bet_service.get_user_tickets_page(
+            current_user.id, limit=limit, cursor=cursor, status=status_filter,
+            house_id=house_id, date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(tickets, headers=headers)
+
+@router.get("/my-tickets/export")
+async def export_my_tickets(
+    status_filter: Optional[BetStatus] = Query(None, alias="status"),
+    house_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the current user's full ticket history as CSV, one row per bet"""
+    user_id = current_user.id
+    filters = dict(status=status_filter, house_id=house_id, date_from=date_from, date_to=date_to)
+
+    def rows():
+        # The request session is closed before streaming starts, so use our own
+        db = SessionLocal()
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["ticket_id", "created_at", "house", "ticket_status", "ticket_amount",
+                             "bet_id", "bet_type", "bet_value", "bet_amount", "bet_status", "payout"])
+            for ticket in EnhancedBetService(db).iter_user_tickets(user_id, **filters):
+                for bet in ticket["bets"] or [None]:
+                    writer.writerow([
+                        ticket["ticket_id"], ticket["created_at"].isoformat(), ticket["house_name"],
+                        ticket["status"].value, ticket["total_amount"],
+                        *((bet["id"], bet["bet_type"].value, next(iter(bet["bet_numbers"]), ""),
+                           bet["total_bet_amount"], bet["status"].value, bet["actual_payout"]) if bet else ("",) * 6)
+                    ])
+                if buffer.tell() >= 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="tickets.csv"'}
+    )
 
 @router.get("/summary", response_model=BetSummaryResponse)
 async def get_bet_summary(
@@ -345,22 +416,26 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
     from datetime import datetime, timezone, date, timedelta
     
     now = datetime.now(timezone.utc)
-    today = now.date()
-    tomorrow = today + timedelta(days=1)
     
     # Get all active houses
     houses = db.query(House).filter(House.is_active == True).all()
     
     result = []
     for house in houses:
+        # Today and tomorrow are local to the house timezone
+        today = local_today(house.timezone, now)
+        tomorrow = today + timedelta(days=1)
+        today_start, today_end = local_day_bounds(house.timezone, today)
+        tomorrow_start, tomorrow_end = local_day_bounds(house.timezone, tomorrow)
+        
         # First try to get today's active rounds for this house
         rounds = db.query(Round).filter(
             Round.house_id == house.id,
             Round.status == RoundStatus.SCHEDULED,
             Round.betting_closes_at > now,
             # Filter for today's rounds only
-            Round.scheduled_time >= datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc),
-            Round.scheduled_time < datetime.combine(today + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+            Round.scheduled_time >= today_start,
+            Round.scheduled_time < today_end
         ).all()
         
         # If no rounds available for today, check if we should auto-open tomorrow's rounds
@@ -368,8 +443,8 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
             # Check if today's rounds exist and are completed (both deadline passed and results published)
             today_rounds = db.query(Round).filter(
                 Round.house_id == house.id,
-                Round.scheduled_time >= datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc),
-                Round.scheduled_time < datetime.combine(today + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+                Round.scheduled_time >= today_start,
+                Round.scheduled_time < today_end
             ).all()
             
             # Auto-open tomorrow's rounds only if:
@@ -393,8 +468,8 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
                 rounds = db.query(Round).filter(
                     Round.house_id == house.id,
                     Round.status == RoundStatus.SCHEDULED,
-                    Round.scheduled_time >= datetime.combine(tomorrow, datetime.min.time()).replace(tzinfo=timezone.utc),
-                    Round.scheduled_time < datetime.combine(tomorrow + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+                    Round.scheduled_time >= tomorrow_start,
+                    Round.scheduled_time < tomorrow_end
                 ).all()
                 
                 # If tomorrow's rounds don't exist, try to create them  
@@ -422,8 +497,8 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
                                 rounds = db.query(Round).filter(
                                     Round.house_id == house.id,
                                     Round.status == RoundStatus.SCHEDULED,
-                                    Round.scheduled_time >= datetime.combine(tomorrow, datetime.min.time()).replace(tzinfo=timezone.utc),
-                                    Round.scheduled_time < datetime.combine(tomorrow + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+                                    Round.scheduled_time >= tomorrow_start,
+                                    Round.scheduled_time < tomorrow_end
                                 ).all()
                         except Exception as e:
                             print(f"Error auto-creating rounds for house {house.id}: {e}")
@@ -460,13 +535,16 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
         
         # If we have FR and SR rounds but no FORECAST round, check if there's an existing FORECAST round
         if fr_round and sr_round and "FORECAST" not in house_rounds:
-            # Check for existing FORECAST round for the same date
+            # Check for existing FORECAST round for the same local date
+            forecast_day_start, forecast_day_end = local_day_bounds(
+                house.timezone, local_date_of(house.timezone, fr_round.scheduled_time)
+            )
             forecast_round = db.query(Round).filter(
                 Round.house_id == house.id,
                 Round.round_type == RoundType.FORECAST,
                 Round.status == RoundStatus.SCHEDULED,
-                Round.scheduled_time >= datetime.combine(fr_round.scheduled_time.date(), datetime.min.time()).replace(tzinfo=timezone.utc),
-                Round.scheduled_time < datetime.combine(fr_round.scheduled_time.date() + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+                Round.scheduled_time >= forecast_day_start,
+                Round.scheduled_time < forecast_day_end
             ).first()
             
             if forecast_round and forecast_round.betting_closes_at > now:
@@ -482,7 +560,7 @@ async def get_houses_with_active_rounds(db: Session = Depends(get_db)):
         
         # Create new FORECAST round if needed (when both FR and SR exist, FR is still open, and no existing FORECAST)
         if (fr_round and sr_round and "FORECAST" not in house_rounds and 
-            fr_round.betting_closes_at > now):  # Only create if FR betting is still open
+            as_utc(fr_round.betting_closes_at) > now):  # Only create if FR betting is still open
             # Create forecast round that closes with FR (earliest closing time)
             new_forecast_round = Round(
                 house_id=house.id,
@@ -729,7 +807,7 @@ async def get_all_houses(db: Session = Depends(get_db)):
 async def get_all_active_rounds(db: Session = Depends(get_db)):
     """Get all active rounds across all houses"""
     bet_service = EnhancedBetService(db)
-    return bet_service.get_all_active_rounds()
+    return FastJSONResponse(bet_service.get_all_active_rounds_rows())
 
 @router.get("/my-bets", response_model=List[TicketResponse])
 async def get_my_bets(
@@ -751,21 +829,22 @@ async def get_houses_with_structured_rounds(db: Session = Depends(get_db)):
     from datetime import datetime, timezone, date, timedelta
     
     now = datetime.now(timezone.utc)
-    today = now.date()
     
     # Get all active houses
     houses = db.query(House).filter(House.is_active == True).all()
     
     result = []
     for house in houses:
+        today_start, today_end = local_day_bounds(house.timezone, local_today(house.timezone, now))
+        
         # Get today's active rounds for this house that are still accepting bets
         rounds = db.query(Round).filter(
             Round.house_id == house.id,
             Round.status == RoundStatus.SCHEDULED,
             Round.betting_closes_at > now,
             # Filter for today's rounds only
-            Round.scheduled_time >= datetime.combine(today, datetime.min.time()).replace(tzinfo=timezone.utc),
-            Round.scheduled_time < datetime.combine(today + timedelta(days=1), datetime.min.time()).replace(tzinfo=timezone.utc)
+            Round.scheduled_time >= today_start,
+            Round.scheduled_time < today_end
         ).all()
         
         # Structure rounds by type
@@ -800,15 +879,6 @@ async def get_houses_with_structured_rounds(db: Session = Depends(get_db)):
     
     return result
 
-@router.get("/summary", response_model=BetSummaryResponse)
-async def get_bet_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get betting summary for current user"""
-    bet_service = EnhancedBetService(db)
-    return bet_service.get_user_betting_summary(current_user.id)
-
 @router.get("/validate-bet")
 async def validate_single_bet(
     round_id: int,
@@ -0,0 +1,139 @@
+"""
+Serving of uploaded files
+
+Stored uploads have content-hashed names, so public ones are cached as
+immutable for a year. Private ones (under blobs/private/) need a signed,
+unexpired link and are cached privately until the link expires. Responses
+carry ETag and Last-Modified, answer If-None-Match with 304, and serve single
+byte ranges.
+
+With UPLOADS_ACCEL_REDIRECT_PREFIX set, the app only authorizes the request
+and hands the file to nginx through X-Accel-Redirect. nginx then sends the
+bytes with sendfile and handles ranges and validators itself.
+"""
+
+import asyncio
+import mimetypes
+import os
+import stat
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.middleware.http_cache import etag_matches
+from app.models.upload import PRIVATE_PREFIX
+from app.utils.signed_urls import verify_signature
+
+router = APIRouter()
+
+UPLOAD_DIR = Path("uploads")
+IMMUTABLE = "public, max-age=31536000, immutable"
+LEGACY_CACHE = "public, max-age=86400"
+LEGACY_FOLDERS = {"images", "banners", "documents", "qr_codes"}
+
+
+def ensure_directories():
+    """Create the uploads tree (called once per worker at startup, not at import)"""
+    for folder in (*LEGACY_FOLDERS, "blobs"):
+        (UPLOAD_DIR / folder).mkdir(parents=True, exist_ok=True)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single "bytes=" range; None to send the whole file.
+
+    Raises ValueError for a range that lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, separator, end = header[6:].strip().partition("-")
+    if not separator or not (start + end).isdigit():
+        return None  # Malformed ranges are ignored
+    if not start:
+        # Suffix range: the last N bytes
+        if int(end) == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - int(end), 0), size - 1
+    first, last = int(start), (min(int(end), size - 1) if end else size - 1)
+    if first >= size or first > last:
+        raise ValueError("Range not satisfiable")
+    return first, last
+
+
+def _read_slice(path: Path, start: int, length: int) -> bytes:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        return handle.read(length)
+
+
+async def serve_upload(request: Request, relative: str, cache_control: str) -> Response:
+    """Response for the file at uploads/<relative>"""
+    root = UPLOAD_DIR.resolve()
+    path = (root / relative).resolve()
+    if root not in path.parents:
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {"Cache-Control": cache_control, "X-Content-Type-Options": "nosniff"}
+
+    if settings.UPLOADS_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = f"{settings.UPLOADS_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{path.relative_to(root)}"
+        return Response(media_type=media_type, headers=headers)
+
+    etag = f'"{stat_result.st_size:x}-{int(stat_result.st_mtime):x}"'
+    headers.update({
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    })
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    # A range only applies to the version the client already has part of
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = None if if_range and if_range != etag else parse_range(request.headers.get("range"), stat_result.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat_result.st_size}"})
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+    start, end = byte_range
+    content = await asyncio.to_thread(_read_slice, path, start, end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+    return Response(content, status_code=206, media_type=media_type, headers=headers)
+
+
+@router.api_route("/blobs/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_stored_upload(
+    key: str,
+    request: Request,
+    expires: Optional[int] = Query(None),
+    signature: Optional[str] = Query(None)
+):
+    """Content-addressed upload; private ones need a signed link"""
+    if not key.startswith(PRIVATE_PREFIX):
+        return await serve_upload(request, f"blobs/{key}", IMMUTABLE)
+
+    if expires is None or signature is None or not verify_signature(request.url.path, expires, signature):
+        raise HTTPException(status_code=403, detail="Link is invalid or has expired")
+    return await serve_upload(request, f"blobs/{key}", f"private, max-age={max(expires - int(time.time()), 0)}")
+
+
+@router.api_route("/{folder}/{filename}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_legacy_upload(folder: str, filename: str, request: Request):
+    """Uploads stored before content addressing, under per-type folders"""
+    if folder not in LEGACY_FOLDERS:
+        raise HTTPException(status_code=404, detail="File not found")
+    return await serve_upload(request, f"{folder}/{filename}", LEGACY_CACHE)
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import asyncio
+import json
+import logging
+
+from app.dependencies import get_current_user_id
+from app.services.realtime import realtime_broadcaster, stream_tickets, PUBLIC_CHANNEL, user_channel
+from app.utils.jwt import get_user_id_from_token
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Idle connections get a keep-alive so proxies don't drop them
+HEARTBEAT_SECONDS = 25
+
+# Sec-WebSocket-Protocol: bearer, <jwt>
+AUTH_SUBPROTOCOL = "bearer"
+
+
+def _channels_for(token: Optional[str]) -> List[str]:
+    """Public channel for everyone, plus the private channel for a valid token"""
+    channels = [PUBLIC_CHANNEL]
+    user_id = get_user_id_from_token(token) if token else None
+    if user_id is not None:
+        channels.append(user_channel(user_id))
+    return channels
+
+
+def _subprotocol_token(websocket: WebSocket) -> Optional[str]:
+    protocols = websocket.scope.get("subprotocols") or []
+    if len(protocols) >= 2 and protocols[0] == AUTH_SUBPROTOCOL:
+        return protocols[1]
+    return None
+
+
+def _message_token(text: Optional[str]) -> Optional[str]:
+    try:
+        message = json.loads(text or "")
+    except ValueError:
+        return None
+    token = message.get("token") if isinstance(message, dict) else None
+    return token if isinstance(token, str) else None
+
+
+@router.websocket("/ws")
+async def realtime_websocket(websocket: WebSocket):
+    """Push round, result and (once authenticated) wallet/ticket events over WebSocket.
+
+    The JWT comes in the subprotocols ["bearer", <token>] or a first message {"token": <token>},
+    never in the URL, where proxies and access logs would keep it.
+    """
+    token = _subprotocol_token(websocket)
+    await websocket.accept(subprotocol=AUTH_SUBPROTOCOL if token else None)
+    subscriber = realtime_broadcaster.subscribe(_channels_for(token))
+
+    async def receive():
+        # Takes a late auth message and notices the client leaving while nothing is being sent
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if len(subscriber.channels) == 1:
+                late_token = _message_token(message.get("text"))
+                user_id = get_user_id_from_token(late_token) if late_token else None
+                if user_id is not None:
+                    realtime_broadcaster.join(subscriber, user_channel(user_id))
+
+    async def send():
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                message = '{"event":"ping"}'
+            await websocket.send_text(message)
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Realtime websocket closed: {type(e).__name__}: {e}")
+    finally:
+        realtime_broadcaster.unsubscribe(subscriber)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@router.post("/stream-ticket")
+async def create_stream_ticket(user_id: int = Depends(get_current_user_id)):
+    """Single-use ticket that authenticates one /stream connection in place of the JWT"""
+    return {"ticket": await stream_tickets.issue(user_id), "expires_in": stream_tickets.ttl}
+
+
+@router.get("/stream")
+async def realtime_stream(request: Request, ticket: Optional[str] = Query(None)):
+    """Push round, result and (with a stream ticket) wallet/ticket events as Server-Sent Events"""
+    channels = [PUBLIC_CHANNEL]
+    user_id = await stream_tickets.redeem(ticket) if ticket else None
+    if user_id is not None:
+        channels.append(user_channel(user_id))
+    subscriber = realtime_broadcaster.subscribe(channels)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            realtime_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx response buffering
+        }
+    )
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, desc
 from typing import List, Optional
-from datetime import date
+from datetime import date, timedelta
 from pydantic import BaseModel
 
 from app.database import get_db
@@ -10,6 +10,8 @@ from app.schemas.round import RoundResponse, RoundWithBets
 from app.schemas.admin import HouseResponse
 from app.services.round_service import RoundService
 from app.services.teer_scheduler import TeerSchedulerService
+from app.utils.fast_json import FastJSONResponse
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, local_date_of, local_day_bounds, local_today
 from app.models.round import RoundStatus, RoundType
 from app.models.house import House
 from app.models import Round
@@ -75,7 +77,7 @@ async def get_results(
 ):
     """Get completed rounds with results"""
     round_service = RoundService(db)
-    return round_service.get_results(house_id, limit)
+    return FastJSONResponse(round_service.get_results_rows(house_id, limit))
 
 @router.get("/results/latest", response_model=List[LatestResultsResponse])
 async def get_latest_results(
@@ -89,7 +91,7 @@ async def get_latest_results(
         and_(
             Round.status == RoundStatus.COMPLETED,
             Round.result.isnot(None),
-            func.date(Round.actual_time) >= func.current_date() - days_back
+            Round.actual_time >= local_day_bounds(PLATFORM_TIMEZONE, local_today() - timedelta(days=days_back))[0]
         )
     ).order_by(desc(Round.actual_time)).all()
     
@@ -142,11 +144,9 @@ async def get_results_display(
 ):
     """Get results for display - shows 'XX' for today until published, past results with actual values"""
     try:
-        from datetime import datetime, timezone, date, timedelta
-        
         # Get current date in local timezone
-        now = datetime.now(timezone.utc)
-        today = now.date()
+        today = local_today()
+        today_start, today_end = local_day_bounds(PLATFORM_TIMEZONE, today)
         
         results_display = []
         
@@ -154,7 +154,8 @@ async def get_results_display(
         today_rounds = db.query(Round).join(House).filter(
             and_(
                 House.is_active == True,
-                func.date(Round.scheduled_time) == today,
+                Round.scheduled_time >= today_start,
+                Round.scheduled_time < today_end,
                 Round.round_type.in_([RoundType.FR, RoundType.SR])
             )
         ).order_by(Round.house_id, Round.round_type).all()
@@ -198,7 +199,7 @@ async def get_results_display(
             and_(
                 Round.status == RoundStatus.COMPLETED,
                 Round.result.isnot(None),
-                func.date(Round.scheduled_time) < today,  # Past dates only
+                Round.scheduled_time < today_start,  # Past dates only
                 Round.round_type.in_([RoundType.FR, RoundType.SR])
             )
         ).order_by(desc(Round.scheduled_time)).limit(limit * 6).all()  # Get more to ensure we have enough after grouping
@@ -206,7 +207,7 @@ async def get_results_display(
         # Group past rounds by date and house
         past_by_date_house = {}
         for round_obj in past_rounds:
-            date_key = round_obj.scheduled_time.date().strftime("%d/%m/%Y")
+            date_key = local_date_of(round_obj.house.timezone, round_obj.scheduled_time).strftime("%d/%m/%Y")
             house_key = f"{date_key}_{round_obj.house.id}"
             
             if house_key not in past_by_date_house:
@@ -330,13 +331,13 @@ async def get_recent_results(
 ):
     """Get recent completed rounds with results"""
     round_service = RoundService(db)
-    return round_service.get_results(None, limit)
+    return FastJSONResponse(round_service.get_results_rows(None, limit))
 
 @router.get("/today", response_model=List[RoundResponse])
 async def get_todays_rounds(db: Session = Depends(get_db)):
     """Get today's rounds"""
     round_service = RoundService(db)
-    return round_service.get_todays_rounds()
+    return FastJSONResponse(round_service.get_todays_rounds_rows())
 
 @router.get("/house/{house_id}", response_model=List[RoundResponse])
 async def get_rounds_by_house(
@@ -2,178 +2,96 @@ from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import os
-import uuid
-import shutil
 from pathlib import Path
 from typing import Optional
 
+from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.models.upload import UploadBlob
+from app.services.upload_store import UnsupportedUpload, sign_private_urls, upload_store
+from app.services.image_pipeline import IMAGE_TYPES, image_pipeline
+from app.utils.upload_stream import UploadTooLarge
 
 router = APIRouter()
 security = HTTPBearer()
 
 # Configuration
 UPLOAD_DIR = Path("uploads")
-MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB (reduced for better performance)
-ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-
-# Ensure upload directories exist
-(UPLOAD_DIR / "images").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "banners").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "documents").mkdir(parents=True, exist_ok=True)
-(UPLOAD_DIR / "qr_codes").mkdir(parents=True, exist_ok=True)
-
-
-def validate_image_file(file: UploadFile) -> bool:
-    """Validate uploaded image file"""
-    # Check file extension
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in ALLOWED_EXTENSIONS:
-        return False
-    
-    # Check file content type
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        return False
-    
-    return True
+MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE
 
 
-@router.post("/image")
-async def upload_image(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
-):
-    """Upload an image file"""
-    
-    # Validate file
-    if not validate_image_file(file):
+async def save_upload(db: Session, file: UploadFile, failure: str, image: bool = False, private: bool = False) -> dict:
+    """Stream an upload into the content-addressed store and describe the stored file.
+
+    Private files come back with their plain URL (to store on records) and a signed one (to show now).
+    """
+    try:
+        blob, deduplicated = await upload_store.save(
+            db, file, MAX_FILE_SIZE, accept=IMAGE_TYPES if image else None, private=private,
+            sanitize=image_pipeline.sanitize
+        )
+    except UnsupportedUpload:
         raise HTTPException(
             status_code=400,
             detail="Invalid file type. Only JPEG, PNG, GIF, and WebP images are allowed."
         )
-    
-    # Read file content
-    file_content = await file.read()
-    
-    # Check file size
-    if len(file_content) > MAX_FILE_SIZE:
+    except UploadTooLarge:
         raise HTTPException(
             status_code=413,
             detail=f"File size too large. Maximum allowed size is {MAX_FILE_SIZE // (1024 * 1024)}MB."
         )
-    
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    
-    # Save file
-    file_path = UPLOAD_DIR / "images" / unique_filename
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        # Return the URL path
-        return {
-            "url": f"/uploads/images/{unique_filename}",
-            "filename": unique_filename,
-            "original_filename": file.filename,
-            "size": len(file_content)
-        }
-    
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to save file: {str(e)}"
+            detail=f"{failure}: {str(e)}"
         )
+    
+    image_pipeline.schedule(blob)
+    url = upload_store.url(blob)
+    return {
+        "url": url,
+        "signed_url": sign_private_urls(url) if blob.private else url,
+        "filename": Path(blob.key).name,
+        "original_filename": file.filename,
+        "size": blob.size,
+        "sha256": blob.sha256,
+        "content_type": blob.content_type,
+        "deduplicated": deduplicated,
+        "variants": sign_private_urls(image_pipeline.urls(blob))
+    }
+
+
+@router.post("/image")
+async def upload_image(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload an image file"""
+    return await save_upload(db, file, "Failed to save file", image=True)
 
 
 @router.post("/banner")
 async def upload_banner(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Upload a banner image"""
-    
-    # Validate file
-    if not validate_image_file(file):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Only JPEG, PNG, GIF, and WebP images are allowed."
-        )
-    
-    # Read file content
-    file_content = await file.read()
-    
-    # Check file size
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File size too large. Maximum allowed size is {MAX_FILE_SIZE // (1024 * 1024)}MB."
-        )
-    
-    try:
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix.lower()
-        unique_filename = f"banner_{uuid.uuid4()}{file_extension}"
-        file_path = UPLOAD_DIR / "banners" / unique_filename
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        return {
-            "url": f"/uploads/banners/{unique_filename}",
-            "filename": unique_filename,
-            "original_filename": file.filename,
-            "size": len(file_content)
-        }
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to process banner image: {str(e)}"
-        )
+    return await save_upload(db, file, "Failed to process banner image", image=True)
 
 
 @router.post("/document")
 async def upload_document(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
-    """Upload a document file"""
-    
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File size too large. Maximum allowed size is {MAX_FILE_SIZE // (1024 * 1024)}MB."
-        )
-    
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = UPLOAD_DIR / "documents" / unique_filename
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        return {
-            "url": f"/uploads/documents/{unique_filename}",
-            "filename": unique_filename,
-            "original_filename": file.filename,
-            "size": len(file_content)
-        }
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to save document: {str(e)}"
-        )
+    """Upload a document file (private: served only through signed links)"""
+    return await save_upload(db, file, "Failed to save document", private=True)
 
 
 @router.delete("/file/{filename}")
@@ -182,7 +100,7 @@ async def delete_file(
     file_type: str = "images",  # images, banners, documents
     current_user: User = Depends(get_current_user)
 ):
-    """Delete an uploaded file"""
+    """Delete an uploaded file (stored uploads under /uploads/blobs are collected once unreferenced)"""
     
     # Validate file type
     if file_type not in ["images", "banners", "documents", "qr_codes"]:
@@ -206,48 +124,30 @@ async def delete_file(
 @router.post("/qr-code")
 async def upload_qr_code(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Upload a QR code image for payment methods"""
-    
-    # Validate file
-    if not validate_image_file(file):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Only JPEG, PNG, GIF, and WebP images are allowed."
-        )
-    
-    # Read file content
-    file_content = await file.read()
-    
-    # Check file size
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File size too large. Maximum allowed size is {MAX_FILE_SIZE // (1024 * 1024)}MB."
-        )
-    
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix.lower()
-    unique_filename = f"qr_{uuid.uuid4()}{file_extension}"
-    
-    # Save file
-    file_path = UPLOAD_DIR / "qr_codes" / unique_filename
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
-        
-        # Return the URL path
-        return {
-            "url": f"/uploads/qr_codes/{unique_filename}",
-            "filename": unique_filename,
-            "original_filename": file.filename,
-            "size": len(file_content)
+    return await save_upload(db, file, "Failed to save QR code", image=True)
+
+
+@router.get("/variants/{sha256}")
+async def get_image_variants(
+    sha256: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Resized WebP variants of an uploaded image and whether they are ready"""
+    # The public copy when the same image was also uploaded privately
+    blob = db.query(UploadBlob).filter(UploadBlob.sha256 == sha256).order_by(UploadBlob.private).first()
+    if not blob or blob.content_type not in IMAGE_TYPES:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    urls = sign_private_urls(image_pipeline.urls(blob))
+    return {
+        "sha256": sha256,
+        "ready": bool(blob.variants),
+        "variants": {
+            name: {"url": url, **(blob.variants or {}).get(name, {})} for name, url in urls.items()
         }
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to save QR code: {str(e)}"
-        )
+    }
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 
 from app.database import get_db
 from app.schemas.wallet import (
@@ -9,28 +10,55 @@ from app.schemas.wallet import (
 )
 from app.schemas.payment import DepositRequest, WithdrawalRequest, PaymentMethodPublic
 from app.services.wallet_service import WalletService
+from app.services.wallet_cache import wallet_snapshots
+from app.services.ledger_service import LedgerService
+from app.services.schedule_calculator import as_utc
+from app.services.events import event_bus, PAYMENT_METHODS_CHANGED
 from app.models import User, PaymentMethod, PaymentMethodStatus, PaymentMethodType
 from app.models.transaction import TransactionType
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_current_user_id
+from app.middleware.http_cache import etag_matches
+from app.utils.fast_json import FastJSONResponse
 
 router = APIRouter()
 
+def _wallet_snapshot(db: Session, user_id: int) -> dict:
+    snapshot = wallet_snapshots.get(db, user_id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet not found"
+        )
+    if not snapshot["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return snapshot
+
+def _snapshot_response(request: Request, snapshot: dict, content: dict) -> Response:
+    """Serve content built from a snapshot, or 304 when the client already holds this version"""
+    headers = {"ETag": f'"{snapshot["version"]}"', "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(content, headers=headers)
+
 @router.get("/", response_model=WalletResponse)
 async def get_wallet_info(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get user's wallet information and recent transactions"""
-    wallet_service = WalletService(db)
-    wallet_info = wallet_service.get_wallet_info(current_user.id)
-    
-    if not wallet_info:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    return wallet_info
+    snapshot = _wallet_snapshot(db, user_id)
+    return _snapshot_response(request, snapshot, {
+        "user_id": user_id,
+        "balance": snapshot["balance"],
+        "pending_deposits": snapshot["pending_deposits"],
+        "pending_withdrawals": snapshot["pending_withdrawals"],
+        "recent_transactions": snapshot["recent_transactions"]
+    })
 
 @router.post("/deposit", response_model=TransactionResponse)
 async def request_deposit(
@@ -83,13 +111,37 @@ async def get_transactions(
 
 @router.get("/balance")
 async def get_balance(
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
 ):
     """Get current wallet balance"""
-    return {
-        "user_id": current_user.id,
-        "balance": current_user.wallet_balance
-    }
+    snapshot = _wallet_snapshot(db, user_id)
+    return _snapshot_response(request, snapshot, {
+        "user_id": user_id,
+        "balance": snapshot["balance"],
+        "pending_deposits": snapshot["pending_deposits"],
+        "pending_withdrawals": snapshot["pending_withdrawals"]
+    })
+
+@router.get("/statement")
+async def get_statement(
+    start: Optional[datetime] = Query(None, description="Defaults to 30 days ago"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    after_seq: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Ledger statement with opening and closing balances"""
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    return LedgerService(db).statement(current_user.id, start, end, after_seq, limit)
 
 @router.post("/add")
 async def add_money(
@@ -115,29 +167,25 @@ async def add_money(
 
 @router.get("/summary")
 async def get_wallet_summary(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get wallet summary with balance and recent activity"""
-    wallet_service = WalletService(db)
-    wallet_info = wallet_service.get_wallet_info(current_user.id)
-    
-    if not wallet_info:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Wallet not found"
-        )
-    
-    # Get recent transactions
-    recent_transactions = wallet_service.get_user_transactions(current_user.id, None, 5)
-    
-    return {
-        "balance": current_user.wallet_balance,
-        "user_id": current_user.id,
-        "username": current_user.username,
-        "recent_transactions": recent_transactions,
-        "wallet_info": wallet_info
-    }
+    snapshot = _wallet_snapshot(db, user_id)
+    return _snapshot_response(request, snapshot, {
+        "balance": snapshot["balance"],
+        "user_id": user_id,
+        "username": snapshot["username"],
+        "pending_deposits": snapshot["pending_deposits"],
+        "pending_withdrawals": snapshot["pending_withdrawals"],
+        "recent_transactions": snapshot["recent_transactions"][:5],
+        "wallet_info": {
+            "user_id": user_id,
+            "balance": snapshot["balance"],
+            "recent_transactions": snapshot["recent_transactions"]
+        }
+    })
 
 @router.get("/payment-methods/deposit", response_model=List[PaymentMethodPublic])
 async def get_deposit_payment_methods(db: Session = Depends(get_db)):
@@ -275,6 +323,7 @@ async def create_sample_payment_methods(db: Session = Depends(get_db)):
             db.add(method)
         
         db.commit()
+        event_bus.publish(PAYMENT_METHODS_CHANGED)
         
         return {
             "message": "Sample payment methods created successfully",
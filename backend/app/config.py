@@ -34,6 +34,42 @@ class Settings(BaseSettings):
     # Additional production settings
     FORCE_HTTPS: bool = os.getenv("FORCE_HTTPS", "False").lower() == "true"
     
+    # Redis (optional - cross-worker fan-out and shared caches; in-process fallback when unset)
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+    
+    # SQL query profiler (opt-in): per-request query counts, repeated statements, N+1 loops
+    QUERY_PROFILING: bool = os.getenv("QUERY_PROFILING", "False").lower() == "true"
+    QUERY_PROFILING_SAMPLE_RATE: float = float(os.getenv("QUERY_PROFILING_SAMPLE_RATE", "0.01"))
+    QUERY_PROFILING_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_PROFILING_REPEAT_THRESHOLD", "5"))
+    
+    # Wallet ledger: how often to snapshot platform accounts and reconcile wallets
+    LEDGER_MAINTENANCE_INTERVAL: int = int(os.getenv("LEDGER_MAINTENANCE_INTERVAL", "3600"))
+    
+    # Wallet snapshots served to balance polling (Redis; rebuilt on every wallet change)
+    WALLET_SNAPSHOT_TRANSACTIONS: int = int(os.getenv("WALLET_SNAPSHOT_TRANSACTIONS", "20"))
+    WALLET_SNAPSHOT_TTL: int = int(os.getenv("WALLET_SNAPSHOT_TTL", "3600"))
+    
+    # Largest accepted upload, enforced while the request body streams in
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", str(5 * 1024 * 1024)))
+    
+    # Content-addressed upload store: unreferenced files are collected once this old
+    UPLOAD_GC_INTERVAL: int = int(os.getenv("UPLOAD_GC_INTERVAL", "3600"))
+    UPLOAD_GC_GRACE_HOURS: int = int(os.getenv("UPLOAD_GC_GRACE_HOURS", "24"))
+    
+    # Processes rendering WebP variants of uploaded images
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2"))
+    
+    # Upload serving: lifetime of signed links to private files, and the nginx internal location that
+    # serves upload bytes via X-Accel-Redirect (unset: the app streams files itself)
+    SIGNED_URL_TTL: int = int(os.getenv("SIGNED_URL_TTL", "900"))
+    UPLOADS_ACCEL_REDIRECT_PREFIX: Optional[str] = os.getenv("UPLOADS_ACCEL_REDIRECT_PREFIX")
+    
+    # Background jobs run on one elected worker (Postgres advisory lock); followers retry the lock every
+    # heartbeat, so a failed leader is replaced within about that long. Cron expressions are in UTC.
+    SCHEDULER_HEARTBEAT_SECONDS: int = int(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "15"))
+    SCHEDULER_HISTORY_DAYS: int = int(os.getenv("SCHEDULER_HISTORY_DAYS", "30"))
+    DAILY_SCHEDULING_CRON: str = os.getenv("DAILY_SCHEDULING_CRON", "30 0 * * *")
+    
     @field_validator('ALLOWED_ORIGINS', 'BACKEND_CORS_ORIGINS')
     @classmethod
     def validate_allowed_origins(cls, v):
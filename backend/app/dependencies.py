@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User
-from app.utils.jwt import verify_token
+from app.utils.jwt import verify_token, get_user_id_from_token
 
 # Security
 security = HTTPBearer()
@@ -53,6 +53,17 @@ async def get_current_user(
         print(f"Authentication error: {str(e)}")
         raise credentials_exception
 
+# Dependency for endpoints that only need the caller's ID; skips the user lookup
+async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
+    user_id = get_user_id_from_token(credentials.credentials)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
 # Dependency to get current admin user
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_admin:
@@ -1,16 +1,27 @@
+"""
+Application factory
+
+create_app builds the whole application: middleware, error handlers and
+every router, each route built once. Legacy /api/<section> paths are served
+by the /api/v1 routes through LegacyPrefixMiddleware rather than a second
+copy of each router. Importing this module builds `app`, so gunicorn
+--preload does the imports once in the master and forked workers share that
+memory; per-process work (directories, database pool, background tasks)
+happens in the startup event instead. A router that fails to import stops the
+boot instead of silently leaving its endpoints out.
+"""
+
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+import asyncio
 import time
 import logging
-import os
-from pathlib import Path
 from app.config import settings
+from app.utils.startup_profile import StartupProfile
 
 # API Information
 API_INFO = {
@@ -21,114 +32,92 @@ API_INFO = {
     "endpoints": ["/auth", "/bet", "/wallet", "/admin", "/rounds"]
 }
 
+# Sections also reachable without the version, for older frontends (/api/auth -> /api/v1/auth)
+# Note: Legacy banners routes are left out to avoid conflicts - use /api/v1/admin/banners instead
+LEGACY_SECTIONS = ("auth", "rounds", "wallet", "bet", "admin")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create FastAPI app
-app = FastAPI(
-    title=API_INFO["title"],
-    version=API_INFO["version"],
-    description=API_INFO["description"],
-    openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
-    docs_url=f"{settings.API_V1_STR}/docs" if settings.DEBUG else None,
-    redoc_url=f"{settings.API_V1_STR}/redoc" if settings.DEBUG else None,
-    contact={
-        "name": "Teer Platform Support",
-        "email": "support@teerplatform.com",
-    },
-    license_info={
-        "name": "Private License",
-        "url": "https://teerplatform.com/license",
-    },
-)
-
-# Create uploads directory if it doesn't exist
-uploads_dir = Path("uploads")
-uploads_dir.mkdir(exist_ok=True)
-(uploads_dir / "images").mkdir(exist_ok=True)
-(uploads_dir / "banners").mkdir(exist_ok=True)
-(uploads_dir / "documents").mkdir(exist_ok=True)
-(uploads_dir / "qr_codes").mkdir(exist_ok=True)
-
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
-# Security Middleware
-app.add_middleware(
-    TrustedHostMiddleware,
-    allowed_hosts=["*"] if settings.DEBUG else [
-        settings.VPS_IP, 
-        f"http://{settings.VPS_IP}", 
-        f"https://{settings.VPS_IP}",
-        "178.128.61.118",
-        "localhost", 
-        "127.0.0.1"
-    ] if settings.VPS_IP else ["*"]
-)
-
-# CORS Middleware (Production Optimized)
-cors_origins = []
-if settings.ENVIRONMENT == "production":
-    # Production CORS - Only allow VPS IP
-    cors_origins = [
-        f"http://{settings.VPS_IP}",
-        f"https://{settings.VPS_IP}",
-        f"http://{settings.VPS_IP}:80",
-        f"https://{settings.VPS_IP}:443",
-        "http://178.128.61.118",
-        "https://178.128.61.118",
-        "http://178.128.61.118:80",
-        "https://178.128.61.118:443"
-    ]
-else:
-    # Development CORS
-    cors_origins = settings.allowed_origins_list
-
-# Log the origins for debugging
-logger.info(f"Environment: {settings.ENVIRONMENT}")
-logger.info(f"VPS IP: {settings.VPS_IP}")
-logger.info(f"CORS Origins configured: {cors_origins}")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["X-Request-ID", "X-Response-Time"],
-    max_age=3600  # Cache preflight requests
-)
-
-# Request Timing Middleware
-class TimingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Response-Time"] = str(process_time)
-        return response
-
-app.add_middleware(TimingMiddleware)
-
-# Request ID Middleware
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        import uuid
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
-
-app.add_middleware(RequestIDMiddleware)
+
+def add_middleware(app: FastAPI):
+    """Register middleware, innermost first"""
+    # Per-request SQL profiling and N+1 detection (opt-in)
+    if settings.QUERY_PROFILING:
+        from app.utils.query_profiler import QueryProfilerMiddleware
+        app.add_middleware(QueryProfilerMiddleware)
+
+    # HTTP caching for public read endpoints (innermost, so CORS and request IDs still apply to 304s)
+    from app.middleware.http_cache import HTTPCacheMiddleware
+    app.add_middleware(HTTPCacheMiddleware)
+
+    # Cut off oversized uploads while the body is still arriving
+    from app.middleware.upload_limit import UploadLimitMiddleware
+    app.add_middleware(UploadLimitMiddleware, path_prefixes=[f"{settings.API_V1_STR}/uploads"],
+                       max_file_size=settings.MAX_UPLOAD_SIZE)
+
+    # Security Middleware
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=["*"] if settings.DEBUG else [
+            settings.VPS_IP,
+            f"http://{settings.VPS_IP}",
+            f"https://{settings.VPS_IP}",
+            "178.128.61.118",
+            "localhost",
+            "127.0.0.1"
+        ] if settings.VPS_IP else ["*"]
+    )
+
+    # CORS Middleware (Production Optimized)
+    cors_origins = []
+    if settings.ENVIRONMENT == "production":
+        # Production CORS - Only allow VPS IP
+        cors_origins = [
+            f"http://{settings.VPS_IP}",
+            f"https://{settings.VPS_IP}",
+            f"http://{settings.VPS_IP}:80",
+            f"https://{settings.VPS_IP}:443",
+            "http://178.128.61.118",
+            "https://178.128.61.118",
+            "http://178.128.61.118:80",
+            "https://178.128.61.118:443"
+        ]
+    else:
+        # Development CORS
+        cors_origins = settings.allowed_origins_list
+
+    # Log the origins for debugging
+    logger.info(f"Environment: {settings.ENVIRONMENT}")
+    logger.info(f"VPS IP: {settings.VPS_IP}")
+    logger.info(f"CORS Origins configured: {cors_origins}")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID", "X-Response-Time", "X-DB-Query-Count", "X-DB-Query-Time", "X-DB-N-Plus-One", "X-Next-Cursor"],
+        max_age=3600  # Cache preflight requests
+    )
+
+    # Request ID, response time and per-route latency
+    from app.middleware.request_context import RequestContextMiddleware
+    app.add_middleware(RequestContextMiddleware)
+
+    # Legacy paths become /api/v1 paths before anything else sees them (outermost)
+    from app.middleware.legacy_prefix import LegacyPrefixMiddleware
+    app.add_middleware(LegacyPrefixMiddleware, legacy_prefix="/api", prefix=settings.API_V1_STR,
+                       sections=LEGACY_SECTIONS)
+
 
 # Error Handlers
-@app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
     logger.error(f"HTTP {exc.status_code}: {exc.detail} - Path: {request.url.path}")
-    
+
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -140,11 +129,10 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         }
     )
 
-@app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle request validation errors"""
     logger.error(f"Validation error: {exc.errors()} - Path: {request.url.path}")
-    
+
     return JSONResponse(
         status_code=422,
         content={
@@ -156,15 +144,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
-@app.exception_handler(StarletteHTTPException)
 async def starlette_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle Starlette HTTP exceptions"""
     logger.error(f"Starlette HTTP {exc.status_code}: {exc.detail} - Path: {request.url.path}")
-    
+
     return JSONResponse(
         status_code=exc.status_code,
         content={
-            "status": "error", 
+            "status": "error",
             "message": exc.detail or "Internal server error",
             "error_code": exc.status_code,
             "path": str(request.url.path),
@@ -172,11 +159,10 @@ async def starlette_exception_handler(request: Request, exc: StarletteHTTPExcept
         }
     )
 
-@app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
     logger.error(f"Unexpected error: {str(exc)} - Path: {request.url.path}", exc_info=True)
-    
+
     return JSONResponse(
         status_code=500,
         content={
@@ -188,95 +174,43 @@ async def general_exception_handler(request: Request, exc: Exception):
         }
     )
 
-# Include individual routers
-try:
-    from app.api.auth import router as auth_router
-    app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
-    logger.info("Auth router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import auth router: {e}")
-
-try:
-    from app.api.admin import router as admin_router
-    app.include_router(admin_router, prefix="/api/v1/admin", tags=["Admin"])
-    logger.info("Admin router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import admin router: {e}")
-
-try:
-    from app.api.admin_results import router as admin_results_router
-    app.include_router(admin_results_router, prefix="/api/v1/admin/results", tags=["Admin Results"])
-    logger.info("Admin results router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import admin results router: {e}")
-
-# Enhanced admin router removed - using original admin.py
-
-try:
-    from app.api.bet import router as bet_router
-    app.include_router(bet_router, prefix="/api/v1/bet", tags=["Betting"])
-    logger.info("Bet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import bet router: {e}")
-
-try:
-    from app.api.wallet import router as wallet_router
-    app.include_router(wallet_router, prefix="/api/v1/wallet", tags=["Wallet"])
-    logger.info("Wallet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import wallet router: {e}")
-
-# Enhanced wallet with withdraw/deposit system
-try:
-    from app.api.wallet_enhanced import router as wallet_enhanced_router
-    app.include_router(wallet_enhanced_router, prefix="/api/v1/wallet", tags=["Enhanced Wallet"])
-    logger.info("Enhanced wallet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import enhanced wallet router: {e}")
-
-# Admin wallet management
-try:
-    from app.api.admin_wallet import router as admin_wallet_router
-    app.include_router(admin_wallet_router, prefix="/api/v1/admin/wallet", tags=["Admin Wallet"])
-    logger.info("Admin wallet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import admin wallet router: {e}")
-
-try:
-    from app.api.rounds import router as rounds_router
-    app.include_router(rounds_router, prefix="/api/v1/rounds", tags=["Rounds"])
-    logger.info("Rounds router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import rounds router: {e}")
-
-try:
-    from app.api.referral import router as referral_router
-    app.include_router(referral_router, prefix="/api/v1/referral", tags=["Referral"])
-    logger.info("Referral router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import referral router: {e}")
-
-try:
-    from app.api.admin_referral import router as admin_referral_router
-    app.include_router(admin_referral_router, prefix="/api/v1", tags=["Admin Referral"])
-    logger.info("Admin referral router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import admin referral router: {e}")
-
-# Payment methods public endpoint
-@app.get("/api/v1/payment-methods")
+
+def include_routers(app: FastAPI):
+    """Mount every API router once under /api/v1"""
+    from app.api import (
+        admin, admin_referral, admin_results, auth, banners, bet, files, realtime, referral, rounds, upload, wallet
+    )
+    v1 = settings.API_V1_STR
+
+    # Uploaded files: immutable caching, ranges, signed private links, optional X-Accel-Redirect
+    app.include_router(files.router, prefix="/uploads")
+
+    app.include_router(auth.router, prefix=f"{v1}/auth", tags=["Authentication"])
+    app.include_router(admin.router, prefix=f"{v1}/admin", tags=["Admin"])
+    app.include_router(admin_results.router, prefix=f"{v1}/admin/results", tags=["Admin Results"])
+    app.include_router(bet.router, prefix=f"{v1}/bet", tags=["Betting"])
+    app.include_router(wallet.router, prefix=f"{v1}/wallet", tags=["Wallet"])
+    app.include_router(rounds.router, prefix=f"{v1}/rounds", tags=["Rounds"])
+    app.include_router(referral.router, prefix=f"{v1}/referral", tags=["Referral"])
+    app.include_router(admin_referral.router, prefix=v1, tags=["Admin Referral"])
+    # Payment methods public endpoint
+    app.add_api_route(f"{v1}/payment-methods", get_public_payment_methods, methods=["GET"])
+    app.include_router(banners.router, prefix=f"{v1}/banners", tags=["Banners"])
+    app.include_router(upload.router, prefix=f"{v1}/uploads", tags=["File Upload"])
+    app.include_router(realtime.router, prefix=f"{v1}/realtime", tags=["Realtime"])
+
+
 async def get_public_payment_methods():
     """Get active payment methods for public use"""
     from app.models.payment_method import PaymentMethod, PaymentMethodStatus
-    from sqlalchemy.orm import Session
-    from app.database import get_db, SessionLocal
-    
+    from app.database import SessionLocal
+
     db = SessionLocal()
     try:
         payment_methods = db.query(PaymentMethod).filter(
             PaymentMethod.status == PaymentMethodStatus.ACTIVE
         ).order_by(PaymentMethod.display_order).all()
-        
+
         # Return only public information
         return [
             {
@@ -295,61 +229,8 @@ async def get_public_payment_methods():
     finally:
         db.close()
 
-# Banner routes
-try:
-    from app.api.banners import router as banners_router
-    app.include_router(banners_router, prefix="/api/v1/banners", tags=["Banners"])
-    logger.info("Banners router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import banners router: {e}")
-
-try:
-    from app.api.upload import router as upload_router
-    app.include_router(upload_router, prefix="/api/v1/uploads", tags=["File Upload"])
-    logger.info("Upload router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import upload router: {e}")
-
-# Legacy API routes (without /v1 for frontend compatibility)
-try:
-    from app.api.auth import router as auth_router_legacy
-    app.include_router(auth_router_legacy, prefix="/api/auth", tags=["Authentication (Legacy)"])
-    logger.info("Legacy auth router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import legacy auth router: {e}")
-
-try:
-    from app.api.rounds import router as rounds_router_legacy
-    app.include_router(rounds_router_legacy, prefix="/api/rounds", tags=["Rounds (Legacy)"])
-    logger.info("Legacy rounds router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import legacy rounds router: {e}")
-
-try:
-    from app.api.wallet import router as wallet_router_legacy
-    app.include_router(wallet_router_legacy, prefix="/api/wallet", tags=["Wallet (Legacy)"])
-    logger.info("Legacy wallet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import legacy wallet router: {e}")
-
-try:
-    from app.api.bet import router as bet_router_legacy
-    app.include_router(bet_router_legacy, prefix="/api/bet", tags=["Betting (Legacy)"])
-    logger.info("Legacy bet router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import legacy bet router: {e}")
-
-try:
-    from app.api.admin import router as admin_router_legacy
-    app.include_router(admin_router_legacy, prefix="/api/admin", tags=["Admin (Legacy)"])
-    logger.info("Legacy admin router included successfully")
-except Exception as e:
-    logger.warning(f"Could not import legacy admin router: {e}")
-
-# Note: Legacy banners router removed to avoid conflicts - use /api/v1/admin/banners instead
 
 # Root endpoints
-@app.get("/", response_model=dict, tags=["Root"])
 async def root():
     """Root endpoint - API information"""
     return {
@@ -361,12 +242,11 @@ async def root():
         "endpoints": API_INFO["endpoints"]
     }
 
-@app.get("/health", response_model=dict, tags=["Health"])
 async def health_check():
     """Health check endpoint"""
     from app.database import SessionLocal
     from sqlalchemy import text
-    
+
     # Test database connection
     db_status = "healthy"
     try:
@@ -376,7 +256,7 @@ async def health_check():
     except Exception as e:
         db_status = f"error: {str(e)}"
         logger.error(f"Database health check failed: {e}")
-    
+
     return {
         "status": "healthy" if db_status == "healthy" else "degraded",
         "service": "teer-platform-api",
@@ -385,7 +265,13 @@ async def health_check():
         "timestamp": time.time()
     }
 
-@app.get("/info", response_model=dict, tags=["Info"])
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (all gunicorn workers in multiprocess mode)"""
+    from fastapi.responses import Response
+    from app.utils.metrics import render_latest
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
 async def api_info():
     """API information endpoint"""
     return {
@@ -394,52 +280,122 @@ async def api_info():
         "debug_mode": settings.DEBUG
     }
 
+
 # Startup and Shutdown Events
-@app.on_event("startup")
 async def startup_event():
-    """Application startup event"""
+    """Application startup event (runs in every worker)"""
+    profile = StartupProfile()
     logger.info("🚀 Teer Participation Platform API starting up...")
     logger.info(f"🔧 Debug mode: {settings.DEBUG}")
     logger.info(f"📊 API version: {API_INFO['version']}")
     logger.info(f"🌐 CORS origins: {settings.BACKEND_CORS_ORIGINS}")
-    
-    # Test database connection
-    try:
-        from app.database import SessionLocal
-        from sqlalchemy import text
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
-        logger.info("✅ Database connection successful")
-    except Exception as e:
-        logger.error(f"❌ Database connection failed: {e}")
-    
-    logger.info("🎉 Teer Platform API ready!")
-    
-    # Start daily scheduler
-    from app.services.daily_scheduler import start_daily_scheduler
-    import asyncio
-    asyncio.create_task(start_daily_scheduler())
-    logger.info("📅 Daily scheduler started")
-
-@app.on_event("shutdown")
+
+    with profile.phase("process state"):
+        # Never reuse pooled connections inherited from a preloading master; the pool
+        # connects lazily, and /health reports whether the database is reachable
+        from app.database import engine
+        engine.dispose(close=False)
+
+        from app.api.files import ensure_directories
+        await asyncio.to_thread(ensure_directories)
+
+    with profile.phase("background tasks"):
+        # Start realtime push broadcaster
+        from app.services.realtime import realtime_broadcaster
+        await realtime_broadcaster.start()
+
+        # Follow change events for HTTP cache validators
+        from app.services.cache_versions import resource_versions
+        resource_versions.start()
+
+        # Sample event loop lag for /metrics
+        from app.utils.metrics import event_loop_monitor
+        event_loop_monitor.start()
+
+        # Background jobs (daily scheduling, round transitions, ledger rollups, upload sweeps);
+        # every worker takes part in the election, only the leader runs them
+        from app.services.scheduled_jobs import scheduler
+        scheduler.start()
+        logger.info("📅 Background scheduler started")
+
+    profile.log("🎉 Teer Platform API ready")
+
 async def shutdown_event():
     """Application shutdown event"""
     logger.info("🛑 Teer Participation Platform API shutting down...")
-    
-    # Stop daily scheduler
-    from app.services.daily_scheduler import stop_daily_scheduler
-    stop_daily_scheduler()
-    logger.info("📅 Daily scheduler stopped")
-    
+
+    # Stop background jobs, handing leadership to another worker
+    from app.services.scheduled_jobs import scheduler
+    await scheduler.stop()
+    logger.info("📅 Background scheduler stopped")
+
+    from app.services.image_pipeline import image_pipeline
+    image_pipeline.stop()
+
+    # Stop realtime push broadcaster
+    from app.services.realtime import realtime_broadcaster
+    from app.services.cache_versions import resource_versions
+    from app.utils.redis_client import close_redis
+    await realtime_broadcaster.stop()
+    resource_versions.stop()
+
+    from app.utils.metrics import event_loop_monitor
+    event_loop_monitor.stop()
+    await close_redis()
+
     logger.info("👋 Goodbye!")
 
+
+def create_app() -> FastAPI:
+    """Build the application; timings per phase end up on app.state.startup_profile"""
+    profile = StartupProfile()
+    with profile.phase("app"):
+        app = FastAPI(
+            title=API_INFO["title"],
+            version=API_INFO["version"],
+            description=API_INFO["description"],
+            openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
+            docs_url=f"{settings.API_V1_STR}/docs" if settings.DEBUG else None,
+            redoc_url=f"{settings.API_V1_STR}/redoc" if settings.DEBUG else None,
+            contact={
+                "name": "Teer Platform Support",
+                "email": "support@teerplatform.com",
+            },
+            license_info={
+                "name": "Private License",
+                "url": "https://teerplatform.com/license",
+            },
+        )
+
+    with profile.phase("middleware"):
+        add_middleware(app)
+        app.add_exception_handler(HTTPException, http_exception_handler)
+        app.add_exception_handler(RequestValidationError, validation_exception_handler)
+        app.add_exception_handler(StarletteHTTPException, starlette_exception_handler)
+        app.add_exception_handler(Exception, general_exception_handler)
+
+    with profile.phase("routers"):
+        include_routers(app)
+        app.add_api_route("/", root, methods=["GET"], response_model=dict, tags=["Root"])
+        app.add_api_route("/health", health_check, methods=["GET"], response_model=dict, tags=["Health"])
+        app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+        app.add_api_route("/info", api_info, methods=["GET"], response_model=dict, tags=["Info"])
+
+    app.add_event_handler("startup", startup_event)
+    app.add_event_handler("shutdown", shutdown_event)
+    app.state.startup_profile = profile
+    profile.log(f"Built application with {len(app.routes)} routes")
+    return app
+
+
+app = create_app()
+
 # Development server runner
 if __name__ == "__main__":
     import uvicorn
-    
+
     logger.info("🔥 Starting development server...")
-    
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -448,4 +404,4 @@ if __name__ == "__main__":
         reload_dirs=["app"] if settings.DEBUG else None,
         log_level="info",
         access_log=settings.DEBUG
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,97 @@
+"""
+HTTP caching for public read endpoints
+
+For each configured GET path, the ETag is derived from the path, the query
+string and the version tokens of the resources behind it. The response is a
+fixed function of those inputs, so the tag is strong. A request whose
+If-None-Match already carries the current tag gets a 304 before the route
+(and the database) is reached. Other 200 responses get the ETag and a
+Cache-Control max-age, which also lets nginx micro-cache them.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.metrics import CACHE_REQUESTS
+from app.services.cache_versions import (
+    ResourceVersions, resource_versions, HOUSES, BANNERS, PAYMENT_METHODS, RESULTS, ROUNDS
+)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    resources: Tuple[str, ...]
+    max_age: int = 30
+
+
+PUBLIC_CACHE_POLICIES: Dict[str, CachePolicy] = {
+    f"{settings.API_V1_STR}/rounds/houses": CachePolicy((HOUSES,), max_age=300),
+    f"{settings.API_V1_STR}/bet/houses": CachePolicy((HOUSES,), max_age=300),
+    f"{settings.API_V1_STR}/bet/payout-rates": CachePolicy((HOUSES,), max_age=300),
+    f"{settings.API_V1_STR}/bet/forecast-options": CachePolicy((HOUSES, ROUNDS), max_age=30),
+    f"{settings.API_V1_STR}/banners/active": CachePolicy((BANNERS,), max_age=300),
+    f"{settings.API_V1_STR}/payment-methods": CachePolicy((PAYMENT_METHODS,), max_age=300),
+    f"{settings.API_V1_STR}/rounds/results": CachePolicy((RESULTS, HOUSES), max_age=30),
+}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+class HTTPCacheMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        policies: Dict[str, CachePolicy] = PUBLIC_CACHE_POLICIES,
+        versions: ResourceVersions = resource_versions
+    ):
+        self.app = app
+        self.policies = {path.rstrip("/"): policy for path, policy in policies.items()}
+        self.versions = versions
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        policy = None
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            policy = self.policies.get(scope["path"].rstrip("/"))
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        tokens = await self.versions.tokens(policy.resources)
+        digest = hashlib.blake2b(digest_size=12)
+        for part in (scope["path"].rstrip("/").encode(), scope.get("query_string", b""), *(t.encode() for t in tokens)):
+            digest.update(part)
+            digest.update(b"\0")
+        etag = f'"{digest.hexdigest()}"'
+        cache_control = f"public, max-age={policy.max_age}"
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            CACHE_REQUESTS.labels("http_etag", "hit").inc()
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", cache_control.encode())],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        CACHE_REQUESTS.labels("http_etag", "miss").inc()
+
+        async def send_with_validators(message: Message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["ETag"] = etag
+                headers["Cache-Control"] = cache_control
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
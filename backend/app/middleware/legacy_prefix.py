@@ -0,0 +1,34 @@
+"""
+Legacy /api prefix
+
+Older frontends call /api/auth, /api/bet and so on without the version.
+Registering every router a second time under /api copies each route, and
+rebuilding their dependency and response models dominated app startup. This
+middleware rewrites those paths to /api/v1 instead, so each route is built
+once and serves both prefixes.
+"""
+
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class LegacyPrefixMiddleware:
+    def __init__(self, app: ASGIApp, legacy_prefix: str, prefix: str, sections: Iterable[str]):
+        self.app = app
+        self.legacy_prefix = legacy_prefix.rstrip("/")
+        self.prefix = prefix.rstrip("/")
+        self.sections = tuple(f"{self.legacy_prefix}/{section}" for section in sections)
+
+    def _rewrite(self, path: str) -> str:
+        for section in self.sections:
+            if path == section or path.startswith(section + "/"):
+                return self.prefix + path[len(self.legacy_prefix):]
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] in ("http", "websocket"):
+            path = self._rewrite(scope["path"])
+            if path != scope["path"]:
+                scope = {**scope, "path": path, "raw_path": path.encode()}
+        await self.app(scope, receive, send)
@@ -0,0 +1,57 @@
+"""
+Request context middleware
+
+A raw ASGI middleware that gives every request an ID (request.state.request_id
+and the X-Request-ID header), reports X-Response-Time, and records latency,
+status and database usage per route template once the response body has been
+sent. Unlike BaseHTTPMiddleware it adds no extra task or body stream per
+request, so streaming responses pass through untouched.
+"""
+
+import time
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils import metrics
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route ("/api/v1/bet/{id}"), or a fixed label"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or getattr(route, "path", "<unmatched>")
+    return "<unmatched>"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = str(uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
+        db_stats, token = metrics.begin_request_db_tracking()
+
+        async def send_with_context(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = str(time.perf_counter() - started)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_context)
+        finally:
+            metrics.end_request(
+                scope["method"], route_template(scope), status_code, time.perf_counter() - started, db_stats, token
+            )
@@ -0,0 +1,61 @@
+"""
+Request body limit for upload endpoints
+
+Multipart bodies are parsed before the route runs, so the route's own size
+check comes too late to stop a large upload being received and spooled to
+disk. This middleware rejects an oversized Content-Length with 413 before
+anything is read, and counts bytes as the body streams in so chunked or
+mislabelled requests are cut off at the same limit.
+"""
+
+from typing import Iterable
+
+import orjson
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadLimitMiddleware:
+    def __init__(self, app: ASGIApp, path_prefixes: Iterable[str], max_file_size: int):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.max_body = max_file_size + MULTIPART_OVERHEAD
+        self.message = f"File size too large. Maximum allowed size is {max_file_size // (1024 * 1024)}MB."
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT") \
+                or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body:
+                await self._reject(scope, send)
+                return
+
+        received = 0
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so the app's handler answers
+                    raise HTTPException(status_code=413, detail=self.message)
+            return message
+
+        await self.app(scope, counting_receive, send)
+
+    async def _reject(self, scope: Scope, send: Send):
+        body = orjson.dumps({"status": "error", "message": self.message, "error_code": 413, "path": scope["path"]})
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,11 +1,14 @@
 from .user import User
 from .house import House
 from .round import Round, RoundType, RoundStatus
-from .bet import Bet, BetType, BetStatus, BetTicket
+from .bet import Bet, BetType, BetStatus, BetTicket, UserBetStats
 from .transaction import Transaction, TransactionType, TransactionStatus
+from .ledger import LedgerEntry, LedgerEntryType, LedgerSnapshot
 from .otp import OTP, OTPType, OTPStatus
 from .payment_method import PaymentMethod, PaymentMethodType, PaymentMethodStatus
 from .banner import Banner
+from .upload import UploadBlob, UploadReference
+from .scheduler import JobRun
 from .admin_task import AdminTask, TaskType, TaskPriority, TaskStatus
 from .referral import (
     ReferralSettings, 
@@ -22,11 +25,14 @@ __all__ = [
     "User",
     "House", 
     "Round", "RoundType", "RoundStatus",
-    "Bet", "BetType", "BetStatus", "BetTicket",
+    "Bet", "BetType", "BetStatus", "BetTicket", "UserBetStats",
     "Transaction", "TransactionType", "TransactionStatus",
+    "LedgerEntry", "LedgerEntryType", "LedgerSnapshot",
     "OTP", "OTPType", "OTPStatus",
     "PaymentMethod", "PaymentMethodType", "PaymentMethodStatus",
     "Banner",
+    "UploadBlob", "UploadReference",
+    "JobRun",
     "AdminTask", "TaskType", "TaskPriority", "TaskStatus",
     "ReferralSettings",
     "ReferralLink",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Enum, JSON, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Enum, JSON, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -18,6 +18,10 @@ class BetStatus(enum.Enum):
 
 class Bet(Base):
     __tablename__ = "bets"
+    __table_args__ = (
+        # Streaming admin exports walk (created_at, id)
+        Index("ix_bets_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -54,6 +58,11 @@ class Bet(Base):
 
 class BetTicket(Base):
     __tablename__ = "bet_tickets"
+    __table_args__ = (
+        # Keyset pagination of a user's ticket history
+        Index("ix_bet_tickets_user_created_ticket", "user_id", "created_at", "ticket_id"),
+        Index("ix_bet_tickets_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ticket_id = Column(String, unique=True, nullable=False, index=True)
@@ -72,4 +81,20 @@ class BetTicket(Base):
     
     # Relationships
     user = relationship("User")
-    house = relationship("House")
\ No newline at end of file
+    house = relationship("House")
+
+
+class UserBetStats(Base):
+    """Running betting totals per user, kept current at placement and settlement"""
+    __tablename__ = "user_bet_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_tickets = Column(Integer, nullable=False, default=0)
+    total_bets = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    pending_bets = Column(Integer, nullable=False, default=0)
+    won_bets = Column(Integer, nullable=False, default=0)
+    lost_bets = Column(Integer, nullable=False, default=0)
+    total_winnings = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
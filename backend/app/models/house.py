@@ -2,8 +2,7 @@ from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Time
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
-import pytz
-from datetime import datetime, time as dt_time, timedelta
+from datetime import timedelta
 
 class House(Base):
     __tablename__ = "houses"
@@ -55,17 +54,8 @@ class House(Base):
     
     def get_local_datetime(self, date_part, time_part):
         """Convert date and time to house timezone aware datetime"""
-        try:
-            house_tz = pytz.timezone(self.timezone)
-            # Create naive datetime first
-            naive_dt = datetime.combine(date_part, time_part)
-            # Localize to house timezone
-            local_dt = house_tz.localize(naive_dt)
-            return local_dt
-        except Exception:
-            # Fallback to UTC if timezone conversion fails
-            naive_dt = datetime.combine(date_part, time_part)
-            return pytz.UTC.localize(naive_dt)
+        from app.services.schedule_calculator import draw_instant, get_zone
+        return draw_instant(self.timezone, date_part, time_part).astimezone(get_zone(self.timezone))
     
     def get_betting_deadline(self, round_datetime):
         """Get betting deadline time for a round"""
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Enum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+# SQLite only autoincrements INTEGER PRIMARY KEY
+LedgerId = BigInteger().with_variant(Integer(), "sqlite")
+
+class LedgerEntryType(enum.Enum):
+    OPENING_BALANCE = "OPENING_BALANCE"
+    DEPOSIT = "DEPOSIT"
+    WITHDRAWAL = "WITHDRAWAL"
+    BET_STAKE = "BET_STAKE"
+    BET_WIN = "BET_WIN"
+    BET_REFUND = "BET_REFUND"
+    ADJUSTMENT = "ADJUSTMENT"
+
+# Platform-side accounts that balance user wallet legs
+CASH_ACCOUNT = "cash"                # money entering/leaving through deposits and withdrawals
+HOUSE_ACCOUNT = "house"              # stakes, winnings and refunds
+ADJUSTMENTS_ACCOUNT = "adjustments"  # manual credits and corrections
+WALLET_ACCOUNT = "wallet"
+
+class LedgerEntry(Base):
+    """One leg of a journal; the legs of a journal sum to zero. Rows are never updated or deleted."""
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        # Per-wallet running sequence; statements and balance-at-time walk it in seq order
+        UniqueConstraint("user_id", "seq", name="uq_ledger_entries_user_seq"),
+        # Date-bounded wallet lookups
+        Index("ix_ledger_entries_user_created_seq", "user_id", "created_at", "seq"),
+        Index("ix_ledger_entries_account_id", "account", "id"),
+    )
+
+    id = Column(LedgerId, primary_key=True)
+    journal_id = Column(String(32), nullable=False, index=True)
+    account = Column(String(32), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Set on wallet legs
+    seq = Column(Integer, nullable=True)              # Wallet legs: 1, 2, 3... per user
+    entry_type = Column(Enum(LedgerEntryType), nullable=False)
+    amount = Column(Float, nullable=False)            # Signed: credit positive, debit negative
+    balance_after = Column(Float, nullable=True)      # Wallet legs: balance once this entry applied
+    reference = Column(String(64), nullable=True)     # e.g. "transaction:12", "bet:345", "ticket:T1A2"
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class LedgerSnapshot(Base):
+    """Balance of an account covering every entry up to last_entry_id"""
+    __tablename__ = "ledger_snapshots"
+    __table_args__ = (
+        Index("ix_ledger_snapshots_account_taken", "account", "taken_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account = Column(String(32), nullable=False)
+    last_entry_id = Column(LedgerId, nullable=False)
+    balance = Column(Float, nullable=False)
+    entries = Column(Integer, nullable=False)
+    taken_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
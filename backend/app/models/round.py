@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -17,6 +17,13 @@ class RoundStatus(enum.Enum):
 
 class Round(Base):
     __tablename__ = "rounds"
+    __table_args__ = (
+        # One round of each type per house per local draw day
+        UniqueConstraint("house_id", "round_type", "local_date", name="uq_rounds_house_type_local_date"),
+        # Local-day lookups are UTC range scans on scheduled_time
+        Index("ix_rounds_scheduled_time", "scheduled_time"),
+        Index("ix_rounds_house_id_scheduled_time", "house_id", "scheduled_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     house_id = Column(Integer, ForeignKey("houses.id"), nullable=False)
@@ -27,6 +34,7 @@ class Round(Base):
     scheduled_time = Column(DateTime(timezone=True), nullable=False)
     betting_closes_at = Column(DateTime(timezone=True), nullable=False)
     actual_time = Column(DateTime(timezone=True), nullable=True)
+    local_date = Column(Date, nullable=True)  # Draw day in the house timezone
     
     # Results
     result = Column(Integer, nullable=True)  # 0-99 for the result
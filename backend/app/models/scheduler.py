@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, JSON, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Job run outcomes
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+class JobRun(Base):
+    """One execution of a background job by the elected scheduler leader"""
+    __tablename__ = "scheduler_job_runs"
+    __table_args__ = (
+        Index("ix_scheduler_job_runs_job_started", "job_name", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_name = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)
+    worker = Column(String(100), nullable=False)  # host:pid of the leader that ran it
+    scheduled_for = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration = Column(Float, nullable=False)  # Seconds
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Enum, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -19,6 +19,14 @@ class TransactionStatus(enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Streaming admin exports walk (created_at, id)
+        Index("ix_transactions_created_id", "created_at", "id"),
+        # Pending queue pages and counts
+        Index("ix_transactions_status_created_id", "status", "created_at", "id"),
+        # Latest transactions per user for wallet snapshots
+        Index("ix_transactions_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKeyConstraint, Index, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Owners that can hold references to stored uploads
+TRANSACTION_OWNER = "transaction"
+BANNER_OWNER = "banner"
+PAYMENT_METHOD_OWNER = "payment_method"
+
+# Keys under this prefix are only served through signed URLs
+PRIVATE_PREFIX = "private/"
+
+def blob_key(sha256: str, extension: str, private: bool = False) -> str:
+    """Storage key: two-character fan-out directory, then the hash"""
+    return f"{PRIVATE_PREFIX if private else ''}{sha256[:2]}/{sha256}{extension}"
+
+def variant_key(sha256: str, name: str, private: bool = False) -> str:
+    """Storage key of a resized WebP rendition of an image"""
+    return f"{PRIVATE_PREFIX if private else ''}variants/{sha256[:2]}/{sha256}-{name}.webp"
+
+class UploadBlob(Base):
+    """One stored file, named by the SHA-256 of its content.
+
+    The same bytes uploaded publicly and privately are two blobs with separate keys, so one
+    visibility never changes what the other's URLs serve.
+    """
+    __tablename__ = "upload_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    private = Column(Boolean, primary_key=True, default=False)  # Deposit proofs and other documents
+    extension = Column(String(10), nullable=False, default="")  # From the first upload of this content
+    content_type = Column(String(100), nullable=True)
+    size = Column(Integer, nullable=False)
+    variants = Column(JSON, nullable=True)  # Images: {name: {"width", "height"}} once rendered
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_uploaded_at = Column(DateTime(timezone=True), server_default=func.now())  # Garbage collection grace starts here
+
+    @property
+    def key(self) -> str:
+        return blob_key(self.sha256, self.extension, self.private)
+
+class UploadReference(Base):
+    """Links a stored file to the record that uses it; unreferenced files are garbage collected"""
+    __tablename__ = "upload_references"
+    __table_args__ = (
+        ForeignKeyConstraint(["sha256", "private"], ["upload_blobs.sha256", "upload_blobs.private"],
+                             name="fk_upload_references_blob"),
+        UniqueConstraint("sha256", "private", "owner_type", "owner_id", name="uq_upload_references_blob_owner"),
+        Index("ix_upload_references_owner", "owner_type", "owner_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
+    private = Column(Boolean, nullable=False, default=False)
+    owner_type = Column(String(30), nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -13,7 +13,8 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
-    wallet_balance = Column(Float, default=0.0)
+    wallet_balance = Column(Float, default=0.0)  # Derived from ledger_entries; change only through LedgerService
+    ledger_seq = Column(Integer, nullable=False, default=0, server_default="0")  # Last wallet ledger entry
     
     # Referral and Agent System
     role = Column(Enum(UserRole), nullable=False, default=UserRole.PLAYER)
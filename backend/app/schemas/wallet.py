@@ -1,5 +1,5 @@
-from pydantic import BaseModel, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from app.models.transaction import TransactionType, TransactionStatus
 
@@ -103,8 +103,15 @@ class DetailedTransactionResponse(BaseModel):
 class WalletResponse(BaseModel):
     user_id: int
     balance: float
+    pending_deposits: float = 0
+    pending_withdrawals: float = 0
     recent_transactions: List[TransactionResponse]
 
 class TransactionUpdate(BaseModel):
     status: TransactionStatus
-    admin_notes: Optional[str] = None
\ No newline at end of file
+    admin_notes: Optional[str] = None
+
+class TransactionBatchRequest(BaseModel):
+    transaction_ids: List[int] = Field(..., min_length=1, max_length=500)
+    action: Literal["approve", "reject"]
+    admin_notes: Optional[str] = None
@@ -4,6 +4,9 @@ from typing import Optional
 from datetime import timedelta
 
 from app.models import User
+from app.models.ledger import LedgerEntryType
+from app.services.ledger_service import LedgerService, Posting
+from app.services.wallet_cache import wallet_snapshots
 from app.schemas.auth import UserRegister, UserLogin, Token, UserResponse
 from app.utils.password import hash_password, verify_password
 from app.utils.jwt import create_access_token
@@ -89,6 +92,10 @@ class AuthService:
         if not user:
             return False
         
-        user.wallet_balance = new_balance
+        # Post the difference so the ledger still explains the balance
+        delta = new_balance - (user.wallet_balance or 0)
+        if delta:
+            LedgerService(self.db).post(Posting(user_id, delta, LedgerEntryType.ADJUSTMENT))
         self.db.commit()
+        wallet_snapshots.committed(self.db, [user_id])
         return True
\ No newline at end of file
@@ -1,21 +1,71 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
-from typing import List, Optional, Dict, Tuple
+from sqlalchemy import and_, func, desc, select, tuple_
+from typing import Callable, Iterator, List, Optional, Dict, Set, Tuple
 from datetime import datetime, date
+import time
 import uuid
 
 from app.models import Bet, Round, House, User, Transaction, BetTicket
 from app.models.bet import BetType, BetStatus
 from app.models.round import RoundStatus, RoundType
 from app.models.transaction import TransactionType, TransactionStatus
+from app.models.ledger import LedgerEntryType
 from app.schemas.bet import BetCreate, BetResponse, BetSummaryResponse, TicketCreate, TicketResponse, BetValidationResponse
 from app.schemas.round import RoundResponse
 from app.schemas.admin import HouseResponse
 from app.services.referral_service import ReferralService
+from app.services.events import event_bus, TICKET_SETTLED
+from app.services.wallet_cache import wallet_snapshots
+from app.services.bet_stats_service import BetStatsService, StatDeltas, accumulate
+from app.services.ledger_service import LedgerService, Posting
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, local_day_bounds, local_today
+from app.services.round_service import ROUND_RESPONSE_COLUMNS
+from app.utils.fast_json import rows_to_dicts
+from app.utils.keyset_cursor import decode_keyset_cursor, encode_keyset_cursor
+from app.utils.metrics import TICKETS_PLACED, BETS_SETTLED, SETTLEMENT_DURATION
+
+# TicketResponse / BetResponse fields, selected as columns for the ticket history
+TICKET_RESPONSE_COLUMNS = (
+    BetTicket.ticket_id, BetTicket.user_id, BetTicket.house_id, House.name.label("house_name"),
+    BetTicket.total_amount, BetTicket.total_potential_payout, BetTicket.status, BetTicket.bets_summary,
+    BetTicket.created_at,
+)
+BET_RESPONSE_COLUMNS = (
+    Bet.id, Bet.user_id, Bet.round_id, Bet.bet_type, Bet.bet_value, Bet.bet_amount, Bet.status,
+    Bet.potential_payout, Bet.actual_payout, Bet.ticket_id, Bet.fr_round_id, Bet.sr_round_id, Bet.created_at,
+)
+
+
+def _bet_row(bet) -> dict:
+    """BetResponse-shaped dict for a BET_RESPONSE_COLUMNS row"""
+    return {
+        "id": bet.id,
+        "user_id": bet.user_id,
+        "round_id": bet.round_id,
+        "bet_type": bet.bet_type,
+        "bet_value": None,
+        "bet_numbers": {bet.bet_value: bet.bet_amount} if bet.bet_value else {},
+        "forecast_pairs": None,
+        "forecast_combinations": None,
+        "total_bet_amount": bet.bet_amount,
+        "status": bet.status,
+        "potential_payout": bet.potential_payout,
+        "actual_payout": bet.actual_payout,
+        "ticket_id": bet.ticket_id,
+        "fr_round_id": bet.fr_round_id,
+        "sr_round_id": bet.sr_round_id,
+        "house_name": None,
+        "created_at": bet.created_at,
+    }
+
 
 class EnhancedBetService:
     def __init__(self, db: Session):
         self.db = db
+        # Settlement side effects, published once the transaction commits
+        self._settled_tickets: List[dict] = []
+        self._wallet_updates: Set[int] = set()
+        self._stat_deltas: StatDeltas = {}
     
     def validate_bet_ticket(self, user_id: int, ticket_data: TicketCreate) -> Tuple[bool, str, float]:
         """Validate complete betting ticket before placement"""
@@ -284,7 +334,9 @@ class EnhancedBetService:
             )
             
             # Deduct from wallet
-            user.wallet_balance -= total_amount
+            posting, = LedgerService(self.db).post(
+                Posting(user_id, -total_amount, LedgerEntryType.BET_STAKE, f"ticket:{ticket_id}")
+            )
             
             # Create transaction record
             transaction = Transaction(
@@ -292,8 +344,8 @@ class EnhancedBetService:
                 transaction_type=TransactionType.BET_PLACED,
                 amount=total_amount,
                 status=TransactionStatus.COMPLETED,
-                balance_before=user.wallet_balance + total_amount,
-                balance_after=user.wallet_balance,
+                balance_before=posting.balance_before,
+                balance_after=posting.balance_after,
                 description=f"Bet ticket placed: {ticket_id}"
             )
             
@@ -302,6 +354,10 @@ class EnhancedBetService:
             self.db.add(transaction)
             for bet in bets:
                 self.db.add(bet)
+            BetStatsService(self.db).apply({user_id: {
+                "total_tickets": 1, "total_bets": len(bets),
+                "total_amount": total_amount, "pending_bets": len(bets)
+            }})
             
             self.db.commit()
             
@@ -311,6 +367,13 @@ class EnhancedBetService:
                 referral_service.calculate_commission_on_bet(bet)
             
             self.db.commit()
+            wallet_snapshots.committed(self.db, [user_id])
+            round_types = {
+                "FORECAST" if bet.bet_type == BetType.FORECAST else ("FR" if fr_round and bet.round_id == fr_round.id else "SR")
+                for bet in bets
+            }
+            for round_type in round_types:
+                TICKETS_PLACED.labels(house.name, round_type).inc()
             
             # Refresh and return
             self.db.refresh(ticket)
@@ -394,49 +457,64 @@ class EnhancedBetService:
         return bet, potential_payout
     
     def get_user_tickets(self, user_id: int, limit: int = 50) -> List[TicketResponse]:
-        """Get user's recent betting tickets - return all tickets with non-zero amounts"""
-        # Get tickets that have non-zero amounts (regardless of individual bet records)
-        tickets_with_bets = self.db.query(BetTicket).filter(
-            and_(
-                BetTicket.user_id == user_id,
-                BetTicket.total_amount > 0
-            )
-        ).order_by(desc(BetTicket.created_at)).limit(limit).all()
-        
-        # Return all tickets with non-zero amounts since bets_summary contains the bet info
-        result = []
-        for ticket in tickets_with_bets:
-            house = self.db.query(House).filter(House.id == ticket.house_id).first()
-            bets = self.db.query(Bet).filter(Bet.ticket_id == ticket.ticket_id).all()
-            
-            result.append(TicketResponse(
-                ticket_id=ticket.ticket_id,
-                user_id=ticket.user_id,
-                house_id=ticket.house_id,
-                house_name=house.name if house else "Unknown",
-                total_amount=ticket.total_amount,
-                total_potential_payout=ticket.total_potential_payout,
-                status=ticket.status,
-                bets_summary=ticket.bets_summary,
-                bets=[BetResponse(
-                    id=bet.id,
-                    user_id=bet.user_id,
-                    round_id=bet.round_id,
-                    bet_type=bet.bet_type,
-                    bet_numbers={bet.bet_value: bet.bet_amount} if bet.bet_value else {},
-                    total_bet_amount=bet.bet_amount,
-                    status=bet.status,
-                    potential_payout=bet.potential_payout,
-                    actual_payout=bet.actual_payout,
-                    ticket_id=bet.ticket_id,
-                    fr_round_id=bet.fr_round_id,
-                    sr_round_id=bet.sr_round_id,
-                    created_at=bet.created_at
-                ) for bet in bets],
-                created_at=ticket.created_at
-            ))
-        
-        return result
+        """Get user's most recent betting tickets"""
+        tickets, _ = self.get_user_tickets_page(user_id, limit=limit)
+        return [TicketResponse(**ticket) for ticket in tickets]
+
+    def get_user_tickets_page(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[BetStatus] = None,
+        house_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of a user's tickets as TicketResponse-shaped rows, newest first, plus the next cursor"""
+        query = select(*TICKET_RESPONSE_COLUMNS).outerjoin(House, House.id == BetTicket.house_id).where(
+            BetTicket.user_id == user_id,
+            BetTicket.total_amount > 0
+        )
+        if status is not None:
+            query = query.where(BetTicket.status == status)
+        if house_id is not None:
+            query = query.where(BetTicket.house_id == house_id)
+        # Date range is in platform-local days, inclusive on both ends
+        if date_from is not None:
+            query = query.where(BetTicket.created_at >= local_day_bounds(PLATFORM_TIMEZONE, date_from)[0])
+        if date_to is not None:
+            query = query.where(BetTicket.created_at < local_day_bounds(PLATFORM_TIMEZONE, date_to)[1])
+        if cursor:
+            created_at, ticket_id = decode_keyset_cursor(cursor, str)
+            query = query.where(tuple_(BetTicket.created_at, BetTicket.ticket_id) < tuple_(created_at, ticket_id))
+
+        # Fetch one extra row to learn whether another page follows
+        query = query.order_by(desc(BetTicket.created_at), desc(BetTicket.ticket_id)).limit(limit + 1)
+        tickets = rows_to_dicts(self.db.execute(query))
+        has_more = len(tickets) > limit
+        tickets = tickets[:limit]
+
+        bets_by_ticket: Dict[str, List[dict]] = {}
+        for ticket in tickets:
+            ticket["house_name"] = ticket["house_name"] or "Unknown"
+            ticket["bets"] = bets_by_ticket.setdefault(ticket["ticket_id"], [])
+        if tickets:
+            bets = select(*BET_RESPONSE_COLUMNS).where(Bet.ticket_id.in_(list(bets_by_ticket))).order_by(Bet.id)
+            for bet in self.db.execute(bets):
+                bets_by_ticket[bet.ticket_id].append(_bet_row(bet))
+
+        next_cursor = encode_keyset_cursor(tickets[-1]["created_at"], tickets[-1]["ticket_id"]) if has_more else None
+        return tickets, next_cursor
+
+    def iter_user_tickets(self, user_id: int, batch_size: int = 500, **filters) -> Iterator[dict]:
+        """Walk every matching ticket page by page (for exports)"""
+        cursor = None
+        while True:
+            tickets, cursor = self.get_user_tickets_page(user_id, limit=batch_size, cursor=cursor, **filters)
+            yield from tickets
+            if cursor is None:
+                return
     
     def get_active_rounds_by_house(self, house_id: int) -> Dict[str, RoundResponse]:
         """Get active rounds for a specific house (open for betting)"""
@@ -505,43 +583,30 @@ class EnhancedBetService:
     
     def get_all_active_rounds(self) -> List[RoundResponse]:
         """Get all active rounds across all houses"""
+        return [RoundResponse(**row) for row in self.get_all_active_rounds_rows()]
+    
+    def get_all_active_rounds_rows(self) -> List[dict]:
+        """Rounds open for betting across all houses as plain RoundResponse-shaped rows"""
         now = datetime.utcnow()
         
-        rounds = self.db.query(Round).join(House).filter(
-            and_(
-                Round.status == RoundStatus.SCHEDULED,
-                Round.betting_closes_at > now,
-                House.is_active == True
-            )
-        ).order_by(Round.scheduled_time).all()
-        
-        result = []
-        for round_obj in rounds:
-            round_response = RoundResponse(
-                id=round_obj.id,
-                house_id=round_obj.house_id,
-                house_name=round_obj.house.name,
-                round_type=round_obj.round_type,
-                status=round_obj.status,
-                scheduled_time=round_obj.scheduled_time,
-                betting_closes_at=round_obj.betting_closes_at,
-                actual_time=round_obj.actual_time,
-                result=round_obj.result,
-                created_at=round_obj.created_at
-            )
-            result.append(round_response)
-        
-        return result
+        query = select(*ROUND_RESPONSE_COLUMNS).join(House, House.id == Round.house_id).where(
+            Round.status == RoundStatus.SCHEDULED,
+            Round.betting_closes_at > now,
+            House.is_active == True
+        ).order_by(Round.scheduled_time)
+        return rows_to_dicts(self.db.execute(query))
     
     def get_daily_bet_amount(self, user_id: int, house_id: int) -> float:
         """Get user's total bet amount for today for a specific house"""
-        today = date.today()
+        house_timezone = self.db.query(House.timezone).filter(House.id == house_id).scalar()
+        day_start, day_end = local_day_bounds(house_timezone, local_today(house_timezone))
         
         total = self.db.query(func.sum(BetTicket.total_amount)).filter(
             and_(
                 BetTicket.user_id == user_id,
                 BetTicket.house_id == house_id,
-                func.date(BetTicket.created_at) == today
+                BetTicket.created_at >= day_start,
+                BetTicket.created_at < day_end
             )
         ).scalar()
         
@@ -549,30 +614,13 @@ class EnhancedBetService:
 
     def get_bet_summary(self, user_id: int) -> BetSummaryResponse:
         """Get user's betting summary"""
-        tickets = self.db.query(BetTicket).filter(BetTicket.user_id == user_id).all()
-        bets = self.db.query(Bet).filter(Bet.user_id == user_id).all()
-        
-        total_tickets = len(tickets)
-        total_bets = len(bets)
-        total_amount = sum(ticket.total_amount for ticket in tickets)
-        pending_bets = len([bet for bet in bets if bet.status == BetStatus.PENDING])
-        won_bets = len([bet for bet in bets if bet.status == BetStatus.WON])
-        lost_bets = len([bet for bet in bets if bet.status == BetStatus.LOST])
-        total_winnings = sum(bet.actual_payout for bet in bets if bet.status == BetStatus.WON)
-        
-        return BetSummaryResponse(
-            total_tickets=total_tickets,
-            total_bets=total_bets,
-            total_amount=total_amount,
-            pending_bets=pending_bets,
-            won_bets=won_bets,
-            lost_bets=lost_bets,
-            total_winnings=total_winnings
-        )
+        return BetStatsService(self.db).get_summary(user_id)
     
     def process_round_results(self, round_id: int, result: int) -> int:
         """Process regular bets for a round result and return number of winners"""
+        started = time.perf_counter()
         winners = 0
+        winning_bets = []
         referral_service = ReferralService(self.db)
         
         # Get all pending bets for this round
@@ -591,43 +639,54 @@ class EnhancedBetService:
                 bet.status = BetStatus.WON
                 bet.actual_payout = bet.potential_payout
                 winners += 1
+                accumulate(self._stat_deltas, bet.user_id, pending_bets=-1, won_bets=1, total_winnings=bet.actual_payout)
                 
                 # Process referral commissions for winning bets
                 referral_service.process_bet_win_commission(bet)
                 
-                # Add winnings to user's wallet
-                user = self.db.query(User).filter(User.id == bet.user_id).first()
-                if user:
-                    balance_before = user.wallet_balance
-                    user.wallet_balance += bet.actual_payout
-                    balance_after = user.wallet_balance
-                    
-                    # Create transaction record
-                    transaction = Transaction(
-                        user_id=user.id,
-                        amount=bet.actual_payout,
-                        transaction_type=TransactionType.BET_WON,
-                        status=TransactionStatus.COMPLETED,
-                        description=f"Winnings from {bet.bet_type.value} bet - Round {round_id}",
-                        balance_before=balance_before,
-                        balance_after=balance_after
-                    )
-                    self.db.add(transaction)
+                winning_bets.append(bet)
             else:
                 bet.status = BetStatus.LOST
+                accumulate(self._stat_deltas, bet.user_id, pending_bets=-1, lost_bets=1)
                 # Reject referral commissions for losing bets
                 referral_service.process_bet_loss_commission(bet)
         
+        # Add winnings to users' wallets
+        self._credit_winnings(
+            winning_bets, lambda bet: f"Winnings from {bet.bet_type.value} bet - Round {round_id}"
+        )
+        
         # Update ticket statuses based on their bets
         self._update_ticket_statuses_for_round(round_id)
         
+        BetStatsService(self.db).apply(self._stat_deltas)
+        self._stat_deltas = {}
         self.db.commit()
+        self._publish_settlement_events()
+        self._record_settlement("round", started, winners, len(bets))
         return winners
     
+    def _credit_winnings(self, bets: List[Bet], describe: Callable[[Bet], str]):
+        """Post winning payouts to the ledger in one batch and record their transactions"""
+        postings = LedgerService(self.db).post(*(
+            Posting(bet.user_id, bet.actual_payout, LedgerEntryType.BET_WIN, f"bet:{bet.id}") for bet in bets
+        ))
+        for bet, posting in zip(bets, postings):
+            self._wallet_updates.add(posting.user_id)
+            self.db.add(Transaction(
+                user_id=posting.user_id,
+                amount=posting.amount,
+                transaction_type=TransactionType.BET_WON,
+                status=TransactionStatus.COMPLETED,
+                description=describe(bet),
+                balance_before=posting.balance_before,
+                balance_after=posting.balance_after
+            ))
+    
     def _update_ticket_statuses_for_round(self, round_id: int):
         """Update ticket statuses based on the status of their constituent bets"""
         # Get all tickets that have bets for this round
-        tickets_with_bets = self.db.query(BetTicket.ticket_id).join(Bet).filter(
+        tickets_with_bets = self.db.query(BetTicket.ticket_id).join(Bet, Bet.ticket_id == BetTicket.ticket_id).filter(
             Bet.round_id == round_id
         ).distinct().all()
         
@@ -647,6 +706,7 @@ class EnhancedBetService:
             
         # Check bet statuses
         bet_statuses = [bet.status for bet in bets]
+        previous_status = ticket.status
         
         # If any bet is still pending, ticket remains pending
         if BetStatus.PENDING in bet_statuses:
@@ -660,6 +720,27 @@ class EnhancedBetService:
         elif all(status == BetStatus.LOST for status in bet_statuses):
             ticket.status = BetStatus.LOST
             ticket.actual_payout = 0
+        
+        if previous_status == BetStatus.PENDING and ticket.status in (BetStatus.WON, BetStatus.LOST):
+            self._settled_tickets.append({
+                "user_id": ticket.user_id,
+                "ticket_id": ticket.ticket_id,
+                "status": ticket.status.value,
+                "actual_payout": float(ticket.actual_payout or 0)
+            })
+    
+    def _publish_settlement_events(self):
+        """Notify users of settled tickets and credited winnings (after commit)"""
+        for settled in self._settled_tickets:
+            event_bus.publish(TICKET_SETTLED, **settled)
+        wallet_snapshots.committed(self.db, self._wallet_updates)
+        self._settled_tickets = []
+        self._wallet_updates = set()
+    
+    def _record_settlement(self, kind: str, started: float, winners: int, settled: int):
+        SETTLEMENT_DURATION.labels(kind).observe(time.perf_counter() - started)
+        BETS_SETTLED.labels(kind, "won").inc(winners)
+        BETS_SETTLED.labels(kind, "lost").inc(settled - winners)
     
     def fix_pending_ticket_statuses(self):
         """Fix any tickets that are stuck in pending status when their bets are completed"""
@@ -676,11 +757,13 @@ class EnhancedBetService:
         
         if updated_count > 0:
             self.db.commit()
+            self._publish_settlement_events()
             
         return updated_count
     
     def process_forecast_bets(self, house_id: int, fr_result: str, sr_result: str) -> dict:
         """Process forecast bets when both FR and SR results are available"""
+        started = time.perf_counter()
         referral_service = ReferralService(self.db)
         
         # Get all pending forecast bets for this house
@@ -702,6 +785,7 @@ class EnhancedBetService:
         
         winners = 0
         total_payout = 0
+        winning_bets = []
         
         for bet in house_forecast_bets:
             is_winner = False
@@ -760,38 +844,30 @@ class EnhancedBetService:
                 bet.status = BetStatus.WON
                 bet.actual_payout = bet.potential_payout
                 winners += 1
+                accumulate(self._stat_deltas, bet.user_id, pending_bets=-1, won_bets=1, total_winnings=bet.actual_payout)
                 total_payout += bet.actual_payout
                 
                 # Process referral commissions for winning bets
                 referral_service.process_bet_win_commission(bet)
                 
-                # Add winnings to user's wallet
-                user = self.db.query(User).filter(User.id == bet.user_id).first()
-                if user:
-                    balance_before = user.wallet_balance
-                    user.wallet_balance += bet.actual_payout
-                    balance_after = user.wallet_balance
-                    
-                    # Create transaction record
-                    transaction = Transaction(
-                        user_id=user.id,
-                        amount=bet.actual_payout,
-                        transaction_type=TransactionType.BET_WON,
-                        status=TransactionStatus.COMPLETED,
-                        balance_before=balance_before,
-                        balance_after=balance_after,
-                        description=f"Forecast win: FR={fr_result}, SR={sr_result}"
-                    )
-                    self.db.add(transaction)
+                winning_bets.append(bet)
             else:
                 bet.status = BetStatus.LOST
+                accumulate(self._stat_deltas, bet.user_id, pending_bets=-1, lost_bets=1)
                 # Reject referral commissions for losing bets
                 referral_service.process_bet_loss_commission(bet)
         
+        # Add winnings to users' wallets
+        self._credit_winnings(winning_bets, lambda bet: f"Forecast win: FR={fr_result}, SR={sr_result}")
+        
         # Update ticket statuses for forecast bets
         self._update_ticket_statuses_for_forecast_bets(house_id)
         
+        BetStatsService(self.db).apply(self._stat_deltas)
+        self._stat_deltas = {}
         self.db.commit()
+        self._publish_settlement_events()
+        self._record_settlement("forecast", started, winners, len(house_forecast_bets))
         
         return {
             "house_id": house_id,
@@ -804,7 +880,7 @@ class EnhancedBetService:
     def _update_ticket_statuses_for_forecast_bets(self, house_id: int):
         """Update ticket statuses for forecast bets in a specific house"""
         # Get all tickets that have forecast bets for this house
-        forecast_tickets = self.db.query(BetTicket.ticket_id).join(Bet).filter(
+        forecast_tickets = self.db.query(BetTicket.ticket_id).join(Bet, Bet.ticket_id == BetTicket.ticket_id).filter(
             and_(
                 Bet.bet_type == BetType.FORECAST,
                 Bet.fr_round_id.isnot(None),
@@ -935,7 +1011,8 @@ class EnhancedBetService:
         )
         
         if date_filter:
-            query = query.filter(func.date(Bet.created_at) == date_filter)
+            day_start, day_end = local_day_bounds(PLATFORM_TIMEZONE, date_filter)
+            query = query.filter(Bet.created_at >= day_start, Bet.created_at < day_end)
         
         forecast_bets = query.all()
         
@@ -0,0 +1,132 @@
+"""
+Per-user betting totals
+
+/bet/summary reads one UserBetStats row instead of scanning a user's whole
+history. Placement, settlement and cancellation fold their changes into a
+deltas map and apply it with a single batched UPDATE before committing.
+Users without a row yet are backfilled from one aggregate query over their
+history, which already includes the changes being applied.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import bindparam, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Bet, BetTicket, UserBetStats
+from app.models.bet import BetStatus
+from app.schemas.bet import BetSummaryResponse
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = (
+    "total_tickets", "total_bets", "total_amount",
+    "pending_bets", "won_bets", "lost_bets", "total_winnings",
+)
+
+# user_id -> {column: change}
+StatDeltas = Dict[int, Dict[str, float]]
+
+
+def accumulate(deltas: StatDeltas, user_id: int, **changes: float):
+    """Fold changes for one user into a pending deltas map"""
+    user_deltas = deltas.setdefault(user_id, {})
+    for column, value in changes.items():
+        user_deltas[column] = user_deltas.get(column, 0) + value
+
+
+class BetStatsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_summary(self, user_id: int) -> BetSummaryResponse:
+        """Betting summary from the running totals (history aggregate if no row yet)"""
+        stats = self.db.get(UserBetStats, user_id)
+        if stats is not None:
+            totals = {column: getattr(stats, column) for column in STAT_COLUMNS}
+        else:
+            totals = self.history_totals([user_id]).get(user_id) or dict.fromkeys(STAT_COLUMNS, 0)
+        return BetSummaryResponse(**totals)
+
+    def history_totals(self, user_ids: Iterable[int]) -> Dict[int, dict]:
+        """Totals recomputed from bets and tickets in one aggregate query"""
+        user_ids = list(user_ids)
+        bets = select(
+            Bet.user_id.label("user_id"),
+            func.count().label("total_bets"),
+            func.count().filter(Bet.status == BetStatus.PENDING).label("pending_bets"),
+            func.count().filter(Bet.status == BetStatus.WON).label("won_bets"),
+            func.count().filter(Bet.status == BetStatus.LOST).label("lost_bets"),
+            func.coalesce(func.sum(Bet.actual_payout).filter(Bet.status == BetStatus.WON), 0.0).label("total_winnings"),
+        ).where(Bet.user_id.in_(user_ids)).group_by(Bet.user_id).subquery()
+        tickets = select(
+            BetTicket.user_id.label("user_id"),
+            func.count().label("total_tickets"),
+            func.sum(BetTicket.total_amount).label("total_amount"),
+        ).where(BetTicket.user_id.in_(user_ids)).group_by(BetTicket.user_id).subquery()
+
+        user_id = func.coalesce(bets.c.user_id, tickets.c.user_id)
+        query = select(
+            user_id.label("user_id"),
+            *(func.coalesce(getattr(bets.c, column), 0).label(column) for column in
+              ("total_bets", "pending_bets", "won_bets", "lost_bets", "total_winnings")),
+            func.coalesce(tickets.c.total_tickets, 0).label("total_tickets"),
+            func.coalesce(tickets.c.total_amount, 0.0).label("total_amount"),
+        ).select_from(bets.join(tickets, bets.c.user_id == tickets.c.user_id, full=True))
+
+        return {row.user_id: {column: row._mapping[column] for column in STAT_COLUMNS}
+                for row in self.db.execute(query)}
+
+    def apply(self, deltas: StatDeltas):
+        """Add pending deltas to the running totals (call before committing)"""
+        deltas = {user_id: changes for user_id, changes in deltas.items() if any(changes.values())}
+        if not deltas:
+            return
+        # Backfilled rows must see the changes being applied
+        self.db.flush()
+
+        user_ids = list(deltas)
+        to_update = set(self.db.scalars(select(UserBetStats.user_id).where(UserBetStats.user_id.in_(user_ids))))
+        missing = [user_id for user_id in user_ids if user_id not in to_update]
+        if missing:
+            history = self.history_totals(missing)
+            rows = [{"user_id": user_id, **history.get(user_id, dict.fromkeys(STAT_COLUMNS, 0))} for user_id in missing]
+            inserted = self._insert_ignore_conflicts(rows)
+            # Rows created concurrently by another transaction still need our deltas
+            to_update.update(user_id for user_id in missing if user_id not in inserted)
+
+        if to_update:
+            table = UserBetStats.__table__
+            statement = table.update().where(table.c.user_id == bindparam("b_user_id")).values(
+                {column: table.c[column] + bindparam(f"d_{column}") for column in STAT_COLUMNS}
+            )
+            self.db.execute(statement, [
+                {"b_user_id": user_id, **{f"d_{column}": deltas[user_id].get(column, 0) for column in STAT_COLUMNS}}
+                for user_id in to_update
+            ])
+
+    def _insert_ignore_conflicts(self, rows: List[dict]) -> Set[int]:
+        """INSERT ... ON CONFLICT DO NOTHING for the current dialect; returns the inserted user ids"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return self._insert_one_by_one(rows)
+        statement = dialect_insert(UserBetStats).values(rows).on_conflict_do_nothing(index_elements=["user_id"])
+        return set(self.db.scalars(statement.returning(UserBetStats.user_id)))
+
+    def _insert_one_by_one(self, rows: List[dict]) -> Set[int]:
+        """Row-at-a-time fallback for dialects without ON CONFLICT DO NOTHING"""
+        inserted = set()
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(UserBetStats).values(row))
+                inserted.add(row["user_id"])
+            except IntegrityError:
+                pass  # Row already exists; apply() updates it instead
+        return inserted
@@ -0,0 +1,123 @@
+"""
+Version counters for cacheable public resources
+
+Each resource (houses, banners, results, ...) has a counter that is bumped
+whenever an event says it changed. HTTP caching derives ETags from these
+counters, so a conditional request can be answered without running the
+query. With REDIS_URL set, the counters are shared by every worker.
+
+Bumps run in event handlers, on the request that made the change, so they
+use a client with a short timeout. A bump that fails is retried before this
+worker next reads the counters; until it lands, other workers may still
+answer 304 for the old content.
+
+Without Redis, each process keeps its own counters and cannot see another
+worker's bumps: a worker that did not handle the change keeps answering 304
+until its token rolls over, every LOCAL_TOKEN_SECONDS. Deployments running
+more than one worker should set REDIS_URL.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Set, Tuple
+
+from app.services.events import (
+    event_bus, HOUSES_CHANGED, LOBBY_CHANGED, BANNERS_CHANGED, PAYMENT_METHODS_CHANGED,
+    RESULT_PUBLISHED, ROUNDS_CHANGED, ROUND_BETTING_CLOSED
+)
+from app.utils.redis_client import get_async_redis, get_request_redis
+
+logger = logging.getLogger(__name__)
+
+# Resources
+HOUSES = "houses"
+BANNERS = "banners"
+PAYMENT_METHODS = "payment_methods"
+RESULTS = "results"
+ROUNDS = "rounds"
+
+# Which resources each event invalidates
+EVENT_RESOURCES = {
+    HOUSES_CHANGED: (HOUSES,),
+    LOBBY_CHANGED: (HOUSES,),
+    BANNERS_CHANGED: (BANNERS,),
+    PAYMENT_METHODS_CHANGED: (PAYMENT_METHODS,),
+    RESULT_PUBLISHED: (RESULTS, ROUNDS),
+    ROUNDS_CHANGED: (ROUNDS,),
+    ROUND_BETTING_CLOSED: (ROUNDS,),
+}
+
+# No longer than the shortest max-age in app.middleware.http_cache, which clients may cache for anyway
+LOCAL_TOKEN_SECONDS = 30
+
+
+class ResourceVersions:
+    KEY_PREFIX = "teer:cache-version:"
+
+    def __init__(self):
+        self._local: Dict[str, int] = defaultdict(int)
+        # Distinguishes this process's counters from a previous run's
+        self._epoch = format(time.time_ns(), "x")
+        # Resources whose shared bump failed, retried on the next read
+        self._unsynced: Set[str] = set()
+
+    def bump(self, *resources: str):
+        """Mark resources as changed"""
+        for resource in resources:
+            self._local[resource] += 1
+        client = get_request_redis()
+        if client is None:
+            return
+        if self._unsynced:
+            # Redis was failing a moment ago; leave it to the next read rather than wait again
+            self._unsynced.update(resources)
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for resource in resources:
+                pipe.incr(self.KEY_PREFIX + resource)
+            pipe.execute()
+        except Exception as e:
+            self._unsynced.update(resources)
+            logger.error(f"Could not bump cache versions {resources}, will retry: {e}")
+
+    async def tokens(self, resources: Iterable[str]) -> Tuple[str, ...]:
+        """Current version token of each resource"""
+        resources = tuple(resources)
+        client = get_async_redis()
+        if client is not None:
+            try:
+                if self._unsynced:
+                    unsynced, self._unsynced = self._unsynced, set()
+                    try:
+                        pipe = client.pipeline(transaction=False)
+                        for resource in unsynced:
+                            pipe.incr(self.KEY_PREFIX + resource)
+                        await pipe.execute()
+                    except Exception:
+                        self._unsynced |= unsynced
+                        raise
+                values = await client.mget([self.KEY_PREFIX + resource for resource in resources])
+                return tuple(value.decode() if value else "0" for value in values)
+            except Exception as e:
+                logger.warning(f"Cache versions unavailable from Redis, using local counters: {e}")
+        bucket = int(time.time() // LOCAL_TOKEN_SECONDS)
+        return tuple(f"{self._epoch}.{self._local[resource]}.{bucket}" for resource in resources)
+
+    def _on_event(self, event_type: str, payload: dict):
+        self.bump(*EVENT_RESOURCES[event_type])
+
+    def start(self):
+        """Follow change events"""
+        for event_type in EVENT_RESOURCES:
+            event_bus.subscribe(event_type, self._on_event)
+
+    def stop(self):
+        """Stop following change events"""
+        for event_type in EVENT_RESOURCES:
+            event_bus.unsubscribe(event_type, self._on_event)
+
+
+# Global version counters
+resource_versions = ResourceVersions()
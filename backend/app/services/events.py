@@ -0,0 +1,74 @@
+"""
+In-process event bus
+
+Services publish domain events (round closed, schedule changed, result
+published, ...) and interested components subscribe to them - caches drop
+stale entries, the lifecycle scheduler reloads its timers, and so on.
+Handlers run synchronously in the publishing thread, so they must be cheap
+and thread-safe; failures are logged and never propagate to the publisher.
+
+Events never leave the process that published them. Some are published in
+one worker only: round lifecycle transitions fire on the scheduler leader,
+and a change is published by the worker whose request made it. A subscriber
+whose effect must reach every worker has to go through shared state itself,
+as cache_versions (Redis counters) and the realtime broadcaster (Redis
+pub/sub) do. Relaying events between workers would repeat those effects once
+per worker.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Event names
+ROUND_BETTING_CLOSED = "round.betting_closed"
+ROUND_DRAW_DUE = "round.draw_due"
+ROUNDS_CHANGED = "rounds.changed"
+LOBBY_CHANGED = "lobby.changed"
+HOUSES_CHANGED = "houses.changed"
+BANNERS_CHANGED = "banners.changed"
+PAYMENT_METHODS_CHANGED = "payment_methods.changed"
+RESULT_PUBLISHED = "round.result_published"
+WALLET_CHANGED = "wallet.changed"
+TICKET_SETTLED = "ticket.settled"
+
+# Subscribing to this receives every event
+ALL_EVENTS = "*"
+
+EventHandler = Callable[[str, dict], None]
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers: Dict[str, List[EventHandler]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: str, handler: EventHandler) -> None:
+        """Register a handler for an event type (or ALL_EVENTS)"""
+        with self._lock:
+            if handler not in self._handlers[event_type]:
+                self._handlers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: str, handler: EventHandler) -> None:
+        """Remove a previously registered handler"""
+        with self._lock:
+            if handler in self._handlers.get(event_type, []):
+                self._handlers[event_type].remove(handler)
+
+    def publish(self, event_type: str, **payload) -> None:
+        """Deliver an event to every subscribed handler"""
+        with self._lock:
+            handlers = list(self._handlers.get(event_type, [])) + list(self._handlers.get(ALL_EVENTS, []))
+
+        for handler in handlers:
+            try:
+                handler(event_type, payload)
+            except Exception as e:
+                logger.error(f"Event handler failed for '{event_type}': {e}")
+
+
+# Global event bus instance
+event_bus = EventBus()
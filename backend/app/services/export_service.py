@@ -0,0 +1,138 @@
+"""
+Streaming admin exports of transactions, bets and tickets
+
+Rows come off a server-side cursor (yield_per) in (created_at, id) order, so
+memory stays flat however large the range. Every row ends with an opaque
+cursor; passing the last one received resumes an interrupted export.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import Bet, BetTicket, House, Round, Transaction, User
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, local_day_bounds
+from app.utils.export_writers import ExportColumn
+from app.utils.keyset_cursor import decode_keyset_cursor, encode_keyset_cursor
+
+YIELD_PER = 2_000
+
+
+@dataclass
+class ExportDataset:
+    model: type
+    columns: List[Tuple[str, str, object]]  # (name, kind, column expression)
+    joins: List[tuple]
+    type_column: Optional[object] = None
+    house_column: Optional[object] = None
+
+    @property
+    def export_columns(self) -> List[ExportColumn]:
+        return [(name, kind) for name, kind, _ in self.columns] + [("cursor", "str")]
+
+
+DATASETS = {
+    "transactions": ExportDataset(
+        model=Transaction,
+        columns=[
+            ("id", "int", Transaction.id), ("created_at", "datetime", Transaction.created_at),
+            ("user_id", "int", Transaction.user_id), ("username", "str", User.username), ("phone", "str", User.phone),
+            ("transaction_type", "str", Transaction.transaction_type), ("status", "str", Transaction.status),
+            ("amount", "float", Transaction.amount), ("balance_before", "float", Transaction.balance_before),
+            ("balance_after", "float", Transaction.balance_after), ("deposit_method", "str", Transaction.deposit_method),
+            ("reference_number", "str", Transaction.reference_number), ("processed_by", "int", Transaction.processed_by),
+            ("processed_at", "datetime", Transaction.processed_at), ("description", "str", Transaction.description),
+        ],
+        joins=[(User, User.id == Transaction.user_id)],
+        type_column=Transaction.transaction_type,
+    ),
+    "bets": ExportDataset(
+        model=Bet,
+        columns=[
+            ("id", "int", Bet.id), ("created_at", "datetime", Bet.created_at), ("ticket_id", "str", Bet.ticket_id),
+            ("user_id", "int", Bet.user_id), ("username", "str", User.username),
+            ("house", "str", func.coalesce(House.name, Bet.house_name)), ("round_id", "int", Bet.round_id),
+            ("bet_type", "str", Bet.bet_type), ("bet_value", "str", Bet.bet_value), ("bet_amount", "float", Bet.bet_amount),
+            ("potential_payout", "float", Bet.potential_payout), ("actual_payout", "float", Bet.actual_payout),
+            ("status", "str", Bet.status),
+        ],
+        joins=[(User, User.id == Bet.user_id), (Round, Round.id == Bet.round_id), (House, House.id == Round.house_id)],
+        type_column=Bet.bet_type,
+        house_column=Round.house_id,
+    ),
+    "tickets": ExportDataset(
+        model=BetTicket,
+        columns=[
+            ("id", "int", BetTicket.id), ("created_at", "datetime", BetTicket.created_at),
+            ("ticket_id", "str", BetTicket.ticket_id), ("user_id", "int", BetTicket.user_id),
+            ("username", "str", User.username), ("house_id", "int", BetTicket.house_id), ("house", "str", House.name),
+            ("total_amount", "float", BetTicket.total_amount),
+            ("total_potential_payout", "float", BetTicket.total_potential_payout), ("status", "str", BetTicket.status),
+        ],
+        joins=[(User, User.id == BetTicket.user_id), (House, House.id == BetTicket.house_id)],
+        house_column=BetTicket.house_id,
+    ),
+}
+
+
+def _enum_member(column, value: str):
+    """Enum member for a query parameter, matching by value case-insensitively"""
+    enum_class = column.type.enum_class
+    for member in enum_class:
+        if member.value.lower() == value.lower():
+            return member
+    raise ValueError(f"Unknown {enum_class.__name__}: {value}")
+
+
+def build_export_query(
+    dataset: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    house_id: Optional[int] = None,
+    type_filter: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
+    """Export query for a dataset; raises ValueError for filters the dataset doesn't support"""
+    spec = DATASETS[dataset]
+    model = spec.model
+    query = select(*(column for _, _, column in spec.columns)).select_from(model)
+    for target, on in spec.joins:
+        query = query.outerjoin(target, on)
+
+    # Date range is in platform-local days, inclusive on both ends
+    if date_from is not None:
+        query = query.where(model.created_at >= local_day_bounds(PLATFORM_TIMEZONE, date_from)[0])
+    if date_to is not None:
+        query = query.where(model.created_at < local_day_bounds(PLATFORM_TIMEZONE, date_to)[1])
+    if house_id is not None:
+        if spec.house_column is None:
+            raise ValueError(f"{dataset} cannot be filtered by house")
+        query = query.where(spec.house_column == house_id)
+    if type_filter is not None:
+        if spec.type_column is None:
+            raise ValueError(f"{dataset} cannot be filtered by type")
+        query = query.where(spec.type_column == _enum_member(spec.type_column, type_filter))
+    if status is not None:
+        query = query.where(model.status == _enum_member(model.status, status))
+    if cursor:
+        created_at, row_id = decode_keyset_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) > tuple_(created_at, row_id))
+
+    return query.order_by(model.created_at, model.id)
+
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def iter_rows(self, query) -> Iterator[tuple]:
+        """Stream query rows from a server-side cursor, each followed by its resume cursor"""
+        result = self.db.execute(query.execution_options(yield_per=YIELD_PER))
+        for row in result:
+            # Every dataset selects id then created_at first
+            yield (*row, encode_keyset_cursor(row[1], row[0]))
+
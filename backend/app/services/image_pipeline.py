@@ -0,0 +1,182 @@
+"""
+WebP variants of uploaded images
+
+Banner, QR code and payment-proof images are stored as uploaded, often as
+multi-megabyte phone photos. After an image upload the pipeline renders WebP
+variants at fixed widths, plus a full-size re-encode, and records them on the
+blob. Rendering runs in a process pool, off the event loop and outside the
+GIL. Re-encoding drops EXIF, so location and device metadata never reach a
+variant. Variant keys derive from the content hash, so a duplicate upload
+reuses the variants already rendered.
+
+The original is public and cached as immutable too, so before it is hashed
+and stored, sanitize() rewrites a JPEG, PNG or WebP that carries EXIF, XMP or
+text metadata without it (upright per its EXIF orientation). Images without
+metadata are stored byte for byte.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import UploadBlob
+from app.models.upload import variant_key
+from app.services.upload_store import UploadStore, upload_store
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+
+# Formats that carry EXIF (GIF has no EXIF and its comments are left alone)
+METADATA_TYPES = frozenset({"image/jpeg", "image/png", "image/webp"})
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop")
+
+# Variant name -> maximum width; None keeps the original size
+VARIANT_WIDTHS = {"thumb": 320, "medium": 1024, "full": None}
+WEBP_QUALITY = 80
+
+# Refuse to decode anything larger (a small PNG can declare enormous dimensions)
+MAX_PIXELS = 40_000_000
+
+
+def strip_metadata(path: str) -> bool:
+    """Rewrite an image in place without EXIF, XMP or text metadata; False when it had none (runs in a worker process)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError(f"Image too large to process: {image.width}x{image.height}")
+        exif = image.getexif()
+        if not exif and not any(key in image.info for key in METADATA_KEYS) and not getattr(image, "text", None):
+            return False
+        image_format = image.format
+        options = {"icc_profile": image.info.get("icc_profile")}
+        if "transparency" in image.info:
+            options["transparency"] = image.info["transparency"]
+        if getattr(image, "is_animated", False):
+            cleaned, options["save_all"] = image, True
+            if image_format == "WEBP":
+                options["lossless"] = True
+        elif image_format == "JPEG" and exif.get(0x0112, 1) == 1:
+            # Already upright: reuse the quantization tables rather than recompress
+            cleaned, options["quality"], options["subsampling"] = image, "keep", "keep"
+        else:
+            # Apply the EXIF orientation before EXIF is dropped
+            cleaned = ImageOps.exif_transpose(image)
+            if image_format == "JPEG":
+                options["quality"] = 95
+            elif image_format == "WEBP":
+                options["lossless"] = True
+        temp_path = f"{path}.clean"
+        cleaned.save(temp_path, image_format, **{key: value for key, value in options.items() if value is not None})
+    os.replace(temp_path, path)
+    return True
+
+
+def render_variants(source: str, out_dir: str, sha256: str) -> Dict[str, dict]:
+    """Write WebP variants of an image to out_dir (runs in a worker process)"""
+    # Imported here so API workers never load Pillow (and numpy with it)
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(source) as image:
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError(f"Image too large to process: {image.width}x{image.height}")
+        # Apply the EXIF orientation before EXIF is dropped
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        for name, width in VARIANT_WIDTHS.items():
+            variant = image.copy()
+            if width and variant.width > width:
+                variant.thumbnail((width, variant.height), Image.LANCZOS)
+            variant.save(Path(out_dir) / f"{sha256}-{name}.webp", "WEBP", quality=WEBP_QUALITY, method=4)
+            variants[name] = {"width": variant.width, "height": variant.height}
+    return variants
+
+
+class ImagePipeline:
+    def __init__(self, store: UploadStore, workers: int):
+        self.store = store
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Tuple[str, bool], asyncio.Task] = {}
+
+    def urls(self, blob: UploadBlob) -> Dict[str, str]:
+        """Variant URLs of an image blob; they resolve once rendering finishes"""
+        if blob.content_type not in IMAGE_TYPES:
+            return {}
+        return {name: self.store.backend.url(variant_key(blob.sha256, name, blob.private)) for name in VARIANT_WIDTHS}
+
+    async def sanitize(self, path: Path, content_type: str) -> bool:
+        """Strip metadata from a staged upload before it is stored; True when the file changed"""
+        if content_type not in METADATA_TYPES:
+            return False
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), strip_metadata, str(path))
+
+    def schedule(self, blob: UploadBlob) -> None:
+        """Render variants in the background unless they exist or are already on their way"""
+        pending = (blob.sha256, blob.private)
+        if blob.content_type not in IMAGE_TYPES or blob.variants or pending in self._pending:
+            return
+        task = asyncio.get_running_loop().create_task(self._render(blob.sha256, blob.key, blob.private))
+        self._pending[pending] = task
+        task.add_done_callback(lambda _: self._pending.pop(pending, None))
+
+    async def _render(self, sha256: str, key: str, private: bool):
+        work_dir = self.store.staging_dir / f"variants-{uuid4().hex}"
+        try:
+            await asyncio.to_thread(work_dir.mkdir, parents=True)
+            source = work_dir / "source"
+            await asyncio.to_thread(self.store.backend.fetch, key, source)
+            variants = await asyncio.get_running_loop().run_in_executor(
+                self._pool(), render_variants, str(source), str(work_dir), sha256
+            )
+            for name in variants:
+                await asyncio.to_thread(
+                    self.store.backend.put, variant_key(sha256, name, private), work_dir / f"{sha256}-{name}.webp"
+                )
+            await asyncio.to_thread(self._record, sha256, private, variants)
+        except Exception as e:
+            logger.error(f"Could not render variants of upload {sha256}: {e}")
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+    def _record(self, sha256: str, private: bool, variants: Dict[str, dict]):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(UploadBlob).where(UploadBlob.sha256 == sha256, UploadBlob.private == private)
+                .values(variants=variants)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs an event loop and database pool threads is unsafe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def stop(self):
+        """Cancel pending renders and shut the worker processes down"""
+        for task in self._pending.values():
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global image pipeline
+image_pipeline = ImagePipeline(upload_store, settings.IMAGE_WORKERS)
@@ -0,0 +1,347 @@
+"""
+Append-only double-entry wallet ledger
+
+Every wallet change is a journal of two legs that sum to zero: one on the
+user's wallet and one on a platform account (cash, house or adjustments).
+Wallet legs get a per-user sequence number and the balance after the entry,
+both taken from one atomic UPDATE of users.wallet_balance/ledger_seq. That
+makes balance-at-time and statements index lookups.
+
+Platform accounts are too hot to keep running balances. Instead, periodic
+snapshots bound each balance query to the entries since the last snapshot.
+reconcile() checks every wallet against its ledger in one grouped query.
+
+Entry ids are allocated at insert but become visible at commit, so a lower id
+can appear after a higher one. Snapshots therefore only advance over entries
+older than SNAPSHOT_SETTLE: an entry still uncommitted below the watermark
+would need a transaction open for longer than that.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, column, func, insert, or_, select, text, update, values
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.database import SessionLocal
+from app.models import User
+from app.models.ledger import (
+    LedgerEntry, LedgerEntryType, LedgerSnapshot,
+    ADJUSTMENTS_ACCOUNT, CASH_ACCOUNT, HOUSE_ACCOUNT, WALLET_ACCOUNT
+)
+
+logger = logging.getLogger(__name__)
+
+COUNTER_ACCOUNTS = {
+    LedgerEntryType.OPENING_BALANCE: ADJUSTMENTS_ACCOUNT,
+    LedgerEntryType.DEPOSIT: CASH_ACCOUNT,
+    LedgerEntryType.WITHDRAWAL: CASH_ACCOUNT,
+    LedgerEntryType.BET_STAKE: HOUSE_ACCOUNT,
+    LedgerEntryType.BET_WIN: HOUSE_ACCOUNT,
+    LedgerEntryType.BET_REFUND: HOUSE_ACCOUNT,
+    LedgerEntryType.ADJUSTMENT: ADJUSTMENTS_ACCOUNT,
+}
+PLATFORM_ACCOUNTS = (CASH_ACCOUNT, HOUSE_ACCOUNT, ADJUSTMENTS_ACCOUNT)
+
+# Balances are floats; anything closer than this counts as equal
+TOLERANCE = 0.005
+
+# Entries are snapshotted once their transaction started this long ago (far beyond any posting transaction)
+SNAPSHOT_SETTLE = timedelta(minutes=10)
+
+# Advisory lock so only one worker snapshots and reconciles at a time
+LEDGER_MAINTENANCE_LOCK_KEY = 7_316_002
+
+
+@dataclass
+class Posting:
+    """A signed change to one wallet (credit positive); seq and balance_after are filled in by post()"""
+    user_id: int
+    amount: float
+    entry_type: LedgerEntryType
+    reference: Optional[str] = None
+    seq: Optional[int] = None
+    balance_after: Optional[float] = None
+
+    @property
+    def balance_before(self) -> float:
+        return self.balance_after - self.amount
+
+
+class LedgerService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Writing
+    def post(self, *postings: Posting) -> List[Posting]:
+        """Apply postings to their wallets and append their journals (the caller commits)"""
+        by_user: Dict[int, List[Posting]] = {}
+        for posting in postings:
+            by_user.setdefault(posting.user_id, []).append(posting)
+
+        totals = {
+            user_id: (sum(posting.amount for posting in user_postings), len(user_postings))
+            for user_id, user_postings in by_user.items()
+        }
+        applied = self.apply_totals(totals)
+
+        rows = []
+        for user_id in sorted(by_user):
+            user_postings = by_user[user_id]
+            total = totals[user_id][0]
+            balance, seq = applied[user_id]
+
+            # Walk forward from the pre-update values so each posting gets its own seq and balance
+            running, next_seq = balance - total, seq - len(user_postings)
+            for posting in user_postings:
+                running += posting.amount
+                next_seq += 1
+                posting.seq, posting.balance_after = next_seq, running
+                journal_id = uuid.uuid4().hex
+                rows.append({
+                    "journal_id": journal_id, "account": WALLET_ACCOUNT, "user_id": user_id,
+                    "seq": next_seq, "entry_type": posting.entry_type, "amount": posting.amount,
+                    "balance_after": running, "reference": posting.reference,
+                })
+                rows.append({
+                    "journal_id": journal_id, "account": COUNTER_ACCOUNTS[posting.entry_type], "user_id": None,
+                    "seq": None, "entry_type": posting.entry_type, "amount": -posting.amount,
+                    "balance_after": None, "reference": posting.reference,
+                })
+
+        if rows:
+            self.db.execute(insert(LedgerEntry), rows)
+        return list(postings)
+
+    def apply_totals(self, totals: Dict[int, Tuple[float, int]]) -> Dict[int, Tuple[float, int]]:
+        """Add (amount, entries) to each wallet; returns the new (balance, ledger_seq) per user"""
+        if not totals:
+            return {}
+        if len(totals) > 1 and self.db.get_bind().dialect.name == "postgresql":
+            applied = self._apply_totals_batch(totals)
+        else:
+            # Lock wallets in id order so concurrent multi-user postings cannot deadlock
+            applied = {}
+            for user_id in sorted(totals):
+                amount, entries = totals[user_id]
+                applied[user_id] = tuple(self.db.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(
+                        wallet_balance=func.coalesce(User.wallet_balance, 0) + amount,
+                        ledger_seq=User.ledger_seq + entries,
+                    )
+                    .returning(User.wallet_balance, User.ledger_seq)
+                    .execution_options(synchronize_session=False)
+                ).one())
+        if len(applied) != len(totals):
+            raise ValueError(f"Users not found: {sorted(set(totals) - set(applied))}")
+        for user_id, (balance, seq) in applied.items():
+            self._sync_loaded_user(user_id, balance, seq)
+        return applied
+
+    def _apply_totals_batch(self, totals: Dict[int, Tuple[float, int]]) -> Dict[int, Tuple[float, int]]:
+        """One UPDATE ... FROM (VALUES ...) after locking the wallets in id order (PostgreSQL)"""
+        user_ids = sorted(totals)
+        self.db.execute(select(User.id).where(User.id.in_(user_ids)).order_by(User.id).with_for_update())
+        deltas = values(
+            column("user_id", Integer), column("amount", Float), column("entries", Integer), name="deltas"
+        ).data([(user_id, *totals[user_id]) for user_id in user_ids])
+        result = self.db.execute(
+            update(User)
+            .where(User.id == deltas.c.user_id)
+            .values(
+                wallet_balance=func.coalesce(User.wallet_balance, 0) + deltas.c.amount,
+                ledger_seq=User.ledger_seq + deltas.c.entries,
+            )
+            .returning(User.id, User.wallet_balance, User.ledger_seq)
+            .execution_options(synchronize_session=False)
+        )
+        return {user_id: (balance, seq) for user_id, balance, seq in result}
+
+    def _sync_loaded_user(self, user_id: int, balance: float, seq: int):
+        """Keep an already-loaded User in step with the UPDATE without marking it dirty"""
+        user = self.db.identity_map.get(identity_key(User, user_id))
+        if user is not None:
+            set_committed_value(user, "wallet_balance", balance)
+            set_committed_value(user, "ledger_seq", seq)
+
+    # Reading
+    def balance_at(self, user_id: int, at: datetime) -> float:
+        """Wallet balance as of an instant"""
+        balance = self.db.execute(
+            select(LedgerEntry.balance_after)
+            .where(LedgerEntry.user_id == user_id, LedgerEntry.created_at <= at)
+            .order_by(LedgerEntry.seq.desc())
+            .limit(1)
+        ).scalar()
+        return float(balance or 0)
+
+    def statement(self, user_id: int, start: datetime, end: datetime,
+                  after_seq: Optional[int] = None, limit: int = 100) -> dict:
+        """Wallet entries in [start, end), in sequence order and keyset-paginated by sequence number.
+
+        created_at is the posting transaction's start time, so it can disagree with seq under
+        concurrency; it only bounds the range, never orders it.
+        """
+        filters = [LedgerEntry.user_id == user_id, LedgerEntry.created_at >= start, LedgerEntry.created_at < end]
+        if after_seq is not None:
+            filters.append(LedgerEntry.seq > after_seq)
+        entries = self.db.execute(
+            select(
+                LedgerEntry.seq, LedgerEntry.entry_type, LedgerEntry.amount,
+                LedgerEntry.balance_after, LedgerEntry.reference, LedgerEntry.created_at
+            ).where(*filters).order_by(LedgerEntry.seq).limit(limit + 1)
+        ).mappings().all()
+
+        has_more = len(entries) > limit
+        entries = [dict(entry) for entry in entries[:limit]]
+        if entries:
+            opening = entries[0]["balance_after"] - entries[0]["amount"]
+            closing = entries[-1]["balance_after"]
+        else:
+            opening = closing = self.balance_at(user_id, start)
+        return {
+            "user_id": user_id,
+            "opening_balance": opening,
+            "closing_balance": closing,
+            "entries": entries,
+            "next_cursor": entries[-1]["seq"] if has_more else None,
+        }
+
+    def account_balance(self, account: str, at: Optional[datetime] = None) -> float:
+        """Platform account balance: latest snapshot plus the entries since it"""
+        snapshot_query = select(LedgerSnapshot).where(LedgerSnapshot.account == account)
+        if at is not None:
+            snapshot_query = snapshot_query.where(LedgerSnapshot.taken_at <= at)
+        snapshot = self.db.execute(snapshot_query.order_by(LedgerSnapshot.taken_at.desc(), LedgerSnapshot.id.desc()).limit(1)).scalar()
+
+        filters = [LedgerEntry.account == account, LedgerEntry.id > (snapshot.last_entry_id if snapshot else 0)]
+        if at is not None:
+            filters.append(LedgerEntry.created_at <= at)
+        since = self.db.execute(select(func.coalesce(func.sum(LedgerEntry.amount), 0)).where(*filters)).scalar()
+        return float((snapshot.balance if snapshot else 0) + since)
+
+    # Maintenance
+    def take_snapshots(self, now: Optional[datetime] = None) -> List[LedgerSnapshot]:
+        """Snapshot every platform account that has new settled entries"""
+        settled_before = (now or datetime.now(timezone.utc)) - SNAPSHOT_SETTLE
+        snapshots = []
+        for account in PLATFORM_ACCOUNTS:
+            previous = self.db.execute(
+                select(LedgerSnapshot).where(LedgerSnapshot.account == account)
+                .order_by(LedgerSnapshot.taken_at.desc(), LedgerSnapshot.id.desc()).limit(1)
+            ).scalar()
+            last_id = previous.last_entry_id if previous else 0
+            # Newer entries may still have lower-id neighbours in flight; leave them to a later snapshot
+            max_id = self.db.execute(
+                select(func.max(LedgerEntry.id))
+                .where(LedgerEntry.account == account, LedgerEntry.id > last_id, LedgerEntry.created_at < settled_before)
+            ).scalar()
+            if max_id is None:
+                continue
+            total, count = self.db.execute(
+                select(func.coalesce(func.sum(LedgerEntry.amount), 0), func.count())
+                .where(LedgerEntry.account == account, LedgerEntry.id > last_id, LedgerEntry.id <= max_id)
+            ).one()
+            snapshot = LedgerSnapshot(
+                account=account, last_entry_id=max_id,
+                balance=(previous.balance if previous else 0) + total,
+                entries=(previous.entries if previous else 0) + count,
+            )
+            self.db.add(snapshot)
+            snapshots.append(snapshot)
+        return snapshots
+
+    def reconcile(self, journals_since: Optional[datetime] = None, limit: int = 100) -> dict:
+        """Wallets whose balance or sequence disagrees with their ledger, and journals that don't balance.
+
+        journals_since limits the journal check to journals with an entry created since then; every
+        leg of those journals is summed, so one split across the boundary is never half-checked.
+        """
+        ledger = select(
+            LedgerEntry.user_id.label("user_id"),
+            func.sum(LedgerEntry.amount).label("ledger_balance"),
+            func.count().label("entries"),
+        ).where(LedgerEntry.user_id.isnot(None)).group_by(LedgerEntry.user_id).subquery()
+        ledger_balance = func.coalesce(ledger.c.ledger_balance, 0)
+        entries = func.coalesce(ledger.c.entries, 0)
+        wallet_balance = func.coalesce(User.wallet_balance, 0)
+
+        mismatch = or_(func.abs(wallet_balance - ledger_balance) > TOLERANCE, User.ledger_seq != entries)
+        rows = self.db.execute(
+            select(
+                User.id.label("user_id"), wallet_balance.label("wallet_balance"),
+                ledger_balance.label("ledger_balance"), User.ledger_seq.label("ledger_seq"), entries.label("entries"),
+                func.count().over().label("total_mismatches"),
+            )
+            .select_from(User).outerjoin(ledger, ledger.c.user_id == User.id)
+            .where(mismatch).order_by(User.id).limit(limit)
+        ).mappings().all()
+
+        journals = select(LedgerEntry.journal_id)
+        if journals_since is not None:
+            journals = journals.where(LedgerEntry.created_at >= journals_since)
+        unbalanced = self.db.execute(
+            select(LedgerEntry.journal_id, func.sum(LedgerEntry.amount).label("imbalance"))
+            .where(LedgerEntry.journal_id.in_(journals))
+            .group_by(LedgerEntry.journal_id)
+            .having(func.abs(func.sum(LedgerEntry.amount)) > TOLERANCE)
+            .limit(limit)
+        ).mappings().all()
+
+        return {
+            "mismatched_wallets": rows[0]["total_mismatches"] if rows else 0,
+            "wallets": [{key: row[key] for key in row.keys() if key != "total_mismatches"} for row in rows],
+            "unbalanced_journals": [dict(row) for row in unbalanced],
+        }
+
+    def _try_lock(self) -> bool:
+        """Take the transaction-scoped advisory lock (PostgreSQL only)"""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": LEDGER_MAINTENANCE_LOCK_KEY}
+        ).scalar())
+
+
+class LedgerMaintenance:
+    """Platform-account snapshots and wallet reconciliation (a scheduled job, see app.services.scheduled_jobs)"""
+
+    def __init__(self):
+        self._journals_checked_since: Optional[datetime] = None
+
+    def run_once(self) -> Optional[dict]:
+        """Snapshot and reconcile once (runs in a worker thread); None if another worker holds the lock"""
+        db = SessionLocal()
+        try:
+            service = LedgerService(db)
+            if not service._try_lock():
+                return None
+            now = datetime.now(timezone.utc)
+            service.take_snapshots(now)
+            report = service.reconcile(journals_since=self._journals_checked_since)
+            # Journals committed late carry their transaction's start time, so recheck the settle window
+            self._journals_checked_since = now - SNAPSHOT_SETTLE
+            db.commit()  # Also releases the advisory lock
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if report["mismatched_wallets"] or report["unbalanced_journals"]:
+            logger.warning(
+                f"Ledger reconciliation: {report['mismatched_wallets']} wallets disagree with the ledger, "
+                f"{len(report['unbalanced_journals'])} unbalanced journals"
+            )
+        return report
+
+
+# Global maintenance job
+ledger_maintenance = LedgerMaintenance()
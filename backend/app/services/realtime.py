@@ -0,0 +1,217 @@
+"""
+Real-time push broadcaster
+
+Fans round/result/wallet events out to WebSocket and SSE subscribers.
+Every message is serialized once and the same string is shared by all
+subscriber queues. Each queue is bounded: a slow client loses its oldest
+messages instead of growing memory. With REDIS_URL set, messages travel
+through Redis pub/sub so subscribers on every gunicorn worker receive events
+raised on any worker. Without Redis, delivery stays within the process.
+
+EventSource cannot send headers, so SSE clients authenticate with a stream
+ticket: a random, single-use value that lives for a few seconds and is
+fetched with a normal authenticated POST. The JWT never appears in a URL.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+from app.services.events import (
+    event_bus, ROUND_BETTING_CLOSED, RESULT_PUBLISHED, ROUNDS_CHANGED,
+    WALLET_CHANGED, TICKET_SETTLED
+)
+from app.utils.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Channels
+PUBLIC_CHANNEL = "public"
+
+def user_channel(user_id: int) -> str:
+    """Private channel for one user's wallet and ticket events"""
+    return f"user:{user_id}"
+
+# Client-facing event names for bus events
+PUBLIC_EVENTS = {
+    ROUND_BETTING_CLOSED: "round.closed",
+    RESULT_PUBLISHED: "result.published",
+    ROUNDS_CHANGED: "rounds.changed",
+}
+USER_EVENTS = {
+    WALLET_CHANGED: "wallet.updated",
+    TICKET_SETTLED: "ticket.settled",
+}
+
+
+class Subscriber:
+    __slots__ = ("channels", "queue", "dropped")
+
+    def __init__(self, channels: Iterable[str], max_queue: int):
+        self.channels = tuple(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, message: str):
+        """Queue a message, discarding the oldest one when the queue is full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class RealtimeBroadcaster:
+    REDIS_CHANNEL = "teer:realtime"
+
+    def __init__(self, max_queue: int = 32):
+        self.max_queue = max_queue
+        self._channels: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._redis = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({sub for subs in self._channels.values() for sub in subs})
+
+    # Subscriptions (event loop only)
+    def subscribe(self, channels: Iterable[str]) -> Subscriber:
+        """Register a subscriber on one or more channels"""
+        subscriber = Subscriber(channels, self.max_queue)
+        for channel in subscriber.channels:
+            self._channels[channel].add(subscriber)
+        return subscriber
+
+    def join(self, subscriber: Subscriber, channel: str):
+        """Add a channel to an existing subscriber"""
+        if channel not in subscriber.channels:
+            subscriber.channels += (channel,)
+            self._channels[channel].add(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber from all of its channels"""
+        for channel in subscriber.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def deliver(self, message: str):
+        """Hand an encoded message to every local subscriber of its channel"""
+        channel = json.loads(message)["channel"]
+        for subscriber in tuple(self._channels.get(channel, ())):
+            subscriber.offer(message)
+
+    # Publishing (any thread)
+    def publish(self, channel: str, event: str, data: dict):
+        """Broadcast an event to a channel on every worker"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        message = json.dumps({"channel": channel, "event": event, "data": data}, default=str)
+        self._loop.call_soon_threadsafe(self._publish_in_loop, message)
+
+    def _publish_in_loop(self, message: str):
+        if self._redis is None:
+            self.deliver(message)
+        else:
+            asyncio.ensure_future(self._publish_to_redis(message))
+
+    async def _publish_to_redis(self, message: str):
+        try:
+            await self._redis.publish(self.REDIS_CHANNEL, message)
+        except Exception as e:
+            # Keep local subscribers informed even if Redis is unavailable
+            logger.error(f"Redis publish failed, delivering locally: {e}")
+            self.deliver(message)
+
+    async def _listen(self):
+        """Relay messages published by any worker to local subscribers"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.REDIS_CHANNEL)
+                async for item in pubsub.listen():
+                    data = item.get("data")
+                    if isinstance(data, bytes):
+                        self.deliver(data.decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime Redis listener error: {e}")
+                await asyncio.sleep(2)
+
+    # Event bus bridge
+    def _on_event(self, event_type: str, payload: dict):
+        if event_type in PUBLIC_EVENTS:
+            self.publish(PUBLIC_CHANNEL, PUBLIC_EVENTS[event_type], payload)
+        elif event_type in USER_EVENTS and payload.get("user_id") is not None:
+            self.publish(user_channel(payload["user_id"]), USER_EVENTS[event_type], payload)
+
+    # Lifecycle
+    async def start(self):
+        """Bind to the running loop and start the Redis relay when configured"""
+        self._loop = asyncio.get_running_loop()
+        self._redis = get_async_redis()
+        if self._redis is not None:
+            self._listener = asyncio.create_task(self._listen())
+        for event_type in (*PUBLIC_EVENTS, *USER_EVENTS):
+            event_bus.subscribe(event_type, self._on_event)
+        logger.info(f"Realtime broadcaster started ({'redis' if self._redis is not None else 'local'} fan-out)")
+
+    async def stop(self):
+        """Stop relaying events"""
+        for event_type in (*PUBLIC_EVENTS, *USER_EVENTS):
+            event_bus.unsubscribe(event_type, self._on_event)
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._loop = None
+
+
+# Global broadcaster instance
+realtime_broadcaster = RealtimeBroadcaster()
+
+
+class StreamTickets:
+    """Single-use, short-lived tickets that stand in for the JWT on SSE URLs"""
+
+    KEY_PREFIX = "realtime:ticket:"
+
+    def __init__(self, ttl: int = 30):
+        self.ttl = ttl
+        # In-process tickets when Redis is not configured: ticket -> (user_id, expires_at)
+        self._local: Dict[str, tuple] = {}
+
+    async def issue(self, user_id: int) -> str:
+        """New ticket for a user; valid once, within ttl seconds"""
+        ticket = secrets.token_urlsafe(32)
+        client = get_async_redis()
+        if client is not None:
+            await client.set(self.KEY_PREFIX + ticket, user_id, ex=self.ttl)
+            return ticket
+        now = time.monotonic()
+        self._local = {key: value for key, value in self._local.items() if value[1] > now}
+        self._local[ticket] = (user_id, now + self.ttl)
+        return ticket
+
+    async def redeem(self, ticket: str) -> Optional[int]:
+        """User id for a ticket, consuming it; None if unknown, used or expired"""
+        client = get_async_redis()
+        if client is not None:
+            try:
+                user_id = await client.getdel(self.KEY_PREFIX + ticket)
+            except Exception as e:
+                logger.warning(f"Could not redeem stream ticket: {e}")
+                return None
+            return int(user_id) if user_id is not None else None
+        user_id, expires_at = self._local.pop(ticket, (None, 0))
+        return user_id if expires_at > time.monotonic() else None
+
+
+# Global stream ticket store
+stream_tickets = StreamTickets()
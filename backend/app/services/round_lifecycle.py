@@ -0,0 +1,226 @@
+"""
+Round Lifecycle Scheduler
+Fires round status transitions at the exact betting deadline and draw instants
+instead of waiting for a read endpoint (or an admin) to notice them. Runs as a
+leader service of the background scheduler (app.services.scheduled_jobs).
+
+ROUND_BETTING_CLOSED and ROUND_DRAW_DUE are therefore published in the
+leader's process only. Their subscribers must not depend on running in the
+worker that serves a given client (see app.services.events).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.round import Round, RoundStatus
+from app.services.events import (
+    event_bus, ROUND_BETTING_CLOSED, ROUND_DRAW_DUE, ROUNDS_CHANGED
+)
+from app.services.round_service import RoundService
+from app.services.schedule_calculator import as_utc
+from app.utils.metrics import SCHEDULER_LAG
+
+logger = logging.getLogger(__name__)
+
+# Transition kinds
+BETTING_CLOSES = "betting_closes"
+DRAW_DUE = "draw_due"
+
+# Advisory lock so only one worker applies a given batch of transitions (and
+# publishes its events), even while leadership is changing hands
+ROUND_LIFECYCLE_LOCK_KEY = 7_316_001
+
+TimerEntry = Tuple[datetime, int, int, str]  # (fire_at, seq, round_id, kind)
+
+
+class RoundLifecycleScheduler:
+    def __init__(self, horizon_hours: int = 36, resync_seconds: int = 60):
+        self.horizon = timedelta(hours=horizon_hours)
+        self.resync_interval = resync_seconds
+        self.is_running = False
+        self._heap: List[TimerEntry] = []
+        self._pending: Set[Tuple[int, str, datetime]] = set()
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._resync_requested = True
+
+    # Timer heap
+    def push(self, fire_at: datetime, round_id: int, kind: str) -> bool:
+        """Add a timer; duplicates of the same (round, kind, instant) are ignored"""
+        key = (round_id, kind, fire_at)
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        heapq.heappush(self._heap, (fire_at, next(self._seq), round_id, kind))
+        return True
+
+    def clear(self):
+        """Drop every pending timer"""
+        self._heap.clear()
+        self._pending.clear()
+
+    def next_fire_at(self) -> Optional[datetime]:
+        """Instant of the earliest pending timer"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[TimerEntry]:
+        """Remove and return every timer due at or before `now`, earliest first"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._pending.discard((entry[2], entry[3], entry[0]))
+            due.append(entry)
+        return due
+
+    def load_upcoming(self, db: Session, now: datetime) -> int:
+        """Rebuild the timer heap from every open round inside the horizon"""
+        horizon_end = now + self.horizon
+        rounds = db.query(
+            Round.id, Round.status, Round.betting_closes_at, Round.scheduled_time
+        ).filter(
+            Round.status.in_([RoundStatus.SCHEDULED, RoundStatus.ACTIVE]),
+            Round.result.is_(None),
+            or_(
+                Round.betting_closes_at <= horizon_end,
+                Round.scheduled_time <= horizon_end
+            )
+        ).all()
+
+        self.clear()
+        for row in rounds:
+            if row.status == RoundStatus.SCHEDULED and row.betting_closes_at <= horizon_end:
+                # Overdue deadlines fire immediately
+                self.push(as_utc(row.betting_closes_at), row.id, BETTING_CLOSES)
+            scheduled_time = as_utc(row.scheduled_time)
+            if now < scheduled_time <= horizon_end:
+                self.push(scheduled_time, row.id, DRAW_DUE)
+
+        return len(self._heap)
+
+    # Transitions
+    def fire_transitions(self, due: List[TimerEntry]) -> dict:
+        """Apply the transitions for a batch of due timers (runs in a worker thread)"""
+        results = {"closed_rounds": [], "draw_due": [], "skipped": False}
+        now = datetime.now(timezone.utc)
+        if due:
+            SCHEDULER_LAG.labels("round_lifecycle").observe(max(0.0, (now - min(entry[0] for entry in due)).total_seconds()))
+
+        db = SessionLocal()
+        try:
+            if not self._acquire_lock(db):
+                # Another worker holds the lock and is applying the same batch
+                results["skipped"] = True
+                db.rollback()
+                return results
+
+            if any(kind == BETTING_CLOSES for _, _, _, kind in due):
+                # Sweep every overdue round, not just the popped ids, so a batch
+                # skipped by another worker is still covered
+                results["closed_rounds"] = RoundService(db).close_betting_for_due_rounds(now)
+
+            results["draw_due"] = [round_id for _, _, round_id, kind in due if kind == DRAW_DUE]
+            db.commit()  # Also releases the advisory lock
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error applying round transitions: {e}")
+            return results
+        finally:
+            db.close()
+
+        for closed in results["closed_rounds"]:
+            event_bus.publish(ROUND_BETTING_CLOSED, **closed)
+        for round_id in results["draw_due"]:
+            event_bus.publish(ROUND_DRAW_DUE, round_id=round_id)
+
+        if results["closed_rounds"]:
+            logger.info(f"Closed betting for {len(results['closed_rounds'])} rounds")
+        return results
+
+    def _acquire_lock(self, db: Session) -> bool:
+        """Take the transaction-scoped advisory lock (PostgreSQL only)"""
+        if db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": ROUND_LIFECYCLE_LOCK_KEY}
+        ).scalar())
+
+    def _resync(self) -> int:
+        """Reload timers from the database (runs in a worker thread)"""
+        db = SessionLocal()
+        try:
+            return self.load_upcoming(db, datetime.now(timezone.utc))
+        finally:
+            db.close()
+
+    # Run loop
+    def request_resync(self, event_type: str = None, payload: dict = None):
+        """Ask the loop to reload timers; safe to call from any thread"""
+        self._resync_requested = True
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start_scheduler(self):
+        """Start the round lifecycle loop"""
+        if self.is_running:
+            logger.warning("Round lifecycle scheduler is already running")
+            return
+
+        self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        event_bus.subscribe(ROUNDS_CHANGED, self.request_resync)
+        logger.info("Starting round lifecycle scheduler...")
+
+        last_resync = self._loop.time()
+        while self.is_running:
+            try:
+                if self._resync_requested or self._loop.time() - last_resync >= self.resync_interval:
+                    self._resync_requested = False
+                    timer_count = await asyncio.to_thread(self._resync)
+                    last_resync = self._loop.time()
+                    logger.debug(f"Round lifecycle timers loaded: {timer_count}")
+
+                due = self.pop_due(datetime.now(timezone.utc))
+                if due:
+                    await asyncio.to_thread(self.fire_transitions, due)
+                    continue
+
+                # Sleep until the next timer or the next periodic resync
+                timeout = self.resync_interval - (self._loop.time() - last_resync)
+                next_fire = self.next_fire_at()
+                if next_fire is not None:
+                    timeout = min(timeout, (next_fire - datetime.now(timezone.utc)).total_seconds())
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in round lifecycle scheduler: {e}")
+                await asyncio.sleep(5)
+
+    def stop_scheduler(self):
+        """Stop the round lifecycle loop"""
+        self.is_running = False
+        event_bus.unsubscribe(ROUNDS_CHANGED, self.request_resync)
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        logger.info("Round lifecycle scheduler stopped")
+
+
+
+# Global scheduler instance
+round_lifecycle_scheduler = RoundLifecycleScheduler()
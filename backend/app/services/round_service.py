@@ -1,13 +1,26 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Tuple
-from datetime import datetime, timedelta, date, time
+from datetime import datetime, timedelta, date, timezone
 
-from app.models import Round, House, Bet, User
-from app.models.round import RoundType, RoundStatus
+from app.models import Round, House, Bet
+from app.models.round import RoundStatus
 from app.models.bet import BetStatus
 from app.schemas.round import RoundCreate, RoundUpdate, RoundResponse, RoundWithBets
 from app.services.teer_scheduler import TeerSchedulerService
+from app.services.events import event_bus, ROUNDS_CHANGED, RESULT_PUBLISHED
+from app.services.wallet_cache import wallet_snapshots
+from app.services.bet_stats_service import BetStatsService, accumulate
+from app.services.wallet_service import WalletService
+from app.utils.fast_json import rows_to_dicts
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, local_date_of, local_day_bounds, local_today, round_slots
+
+# RoundResponse fields, selected as columns so list endpoints skip ORM loading
+ROUND_RESPONSE_COLUMNS = (
+    Round.id, Round.house_id, House.name.label("house_name"), Round.round_type, Round.status,
+    Round.scheduled_time, Round.betting_closes_at, Round.actual_time, Round.result, Round.created_at,
+)
 
 class RoundService:
     def __init__(self, db: Session):
@@ -51,17 +64,25 @@ class RoundService:
             if active_rounds_count >= 2:
                 return None, "Maximum 2 active rounds per house allowed"
             
+            # The slot the scheduler checks, so it won't generate this round again
+            local_date = local_date_of(house.timezone, round_data.scheduled_time)
             db_round = Round(
                 house_id=round_data.house_id,
                 round_type=round_data.round_type,
                 scheduled_time=round_data.scheduled_time,
                 betting_closes_at=round_data.betting_closes_at,
-                status=RoundStatus.SCHEDULED
+                status=RoundStatus.SCHEDULED,
+                local_date=local_date
             )
             
             self.db.add(db_round)
-            self.db.commit()
+            try:
+                self.db.commit()
+            except IntegrityError:
+                self.db.rollback()
+                return None, f"A {round_data.round_type.value} round already exists for this house on {local_date}"
             self.db.refresh(db_round)
+            event_bus.publish(ROUNDS_CHANGED, house_id=db_round.house_id)
             
             # Create response with house name
             response = self._create_round_response(db_round)
@@ -99,6 +120,7 @@ class RoundService:
             
             self.db.commit()
             self.db.refresh(db_round)
+            event_bus.publish(ROUNDS_CHANGED, house_id=db_round.house_id)
             
             # Create response with house name
             house = self.db.query(House).filter(House.id == db_round.house_id).first()
@@ -254,6 +276,10 @@ class RoundService:
             winners_count = bet_service.process_round_results(round_id, result)
             
             self.db.commit()
+            event_bus.publish(
+                RESULT_PUBLISHED, round_id=round_id, house_id=db_round.house_id,
+                round_type=db_round.round_type.value, result=result
+            )
             
             return True, f"Result published successfully. {winners_count} winners found."
             
@@ -282,16 +308,18 @@ class RoundService:
             # Refund all bets
             for bet in bets:
                 bet.status = BetStatus.CANCELLED
-                
-                # Refund to user wallet
-                user = self.db.query(User).filter(User.id == bet.user_id).first()
-                if user:
-                    user.wallet_balance += bet.bet_amount
+            postings = WalletService(self.db).refund_bets(bets, f"Refund for cancelled round {round_id}")
             
             # Update round status
             db_round.status = RoundStatus.CANCELLED
             
+            stat_deltas = {}
+            for bet in bets:
+                accumulate(stat_deltas, bet.user_id, pending_bets=-1)
+            BetStatsService(self.db).apply(stat_deltas)
+            
             self.db.commit()
+            wallet_snapshots.committed(self.db, {posting.user_id for posting in postings})
             
             return True, f"Round cancelled successfully. {len(bets)} bets refunded."
             
@@ -301,40 +329,24 @@ class RoundService:
     
     def get_results(self, house_id: Optional[int] = None, limit: int = 20) -> List[RoundResponse]:
         """Get completed rounds with results"""
-        query = self.db.query(Round).join(House).filter(
+        return [RoundResponse(**row) for row in self.get_results_rows(house_id, limit)]
+    
+    def get_results_rows(self, house_id: Optional[int] = None, limit: int = 20) -> List[dict]:
+        """Completed rounds with results as plain RoundResponse-shaped rows"""
+        query = select(*ROUND_RESPONSE_COLUMNS).join(House, House.id == Round.house_id).where(
             Round.status == RoundStatus.COMPLETED,
             Round.result.isnot(None)
         )
         
         if house_id:
-            query = query.filter(Round.house_id == house_id)
+            query = query.where(Round.house_id == house_id)
         
-        rounds = query.order_by(Round.actual_time.desc()).limit(limit).all()
-        
-        result = []
-        for round_obj in rounds:
-            round_data = {
-                'id': round_obj.id,
-                'house_id': round_obj.house_id,
-                'house_name': round_obj.house.name,
-                'round_type': round_obj.round_type,
-                'status': round_obj.status,
-                'scheduled_time': round_obj.scheduled_time,
-                'betting_closes_at': round_obj.betting_closes_at,
-                'actual_time': round_obj.actual_time,
-                'result': round_obj.result,
-                'created_at': round_obj.created_at
-            }
-            response = RoundResponse(**round_data)
-            result.append(response)
-        
-        return result
+        return rows_to_dicts(self.db.execute(query.order_by(Round.actual_time.desc()).limit(limit)))
     
     def get_active_rounds(self) -> List[RoundResponse]:
         """Get active rounds (scheduled and in progress)"""
-        # First update round statuses based on current time
-        self._update_round_statuses()
-        
+        # Status transitions are driven by the round lifecycle scheduler,
+        # so this read path never writes
         active_statuses = [RoundStatus.SCHEDULED, RoundStatus.ACTIVE]
         rounds = self.db.query(Round).join(House).filter(
             Round.status.in_(active_statuses)
@@ -342,43 +354,32 @@ class RoundService:
         
         return [self._create_round_response(round) for round in rounds]
     
-    def _update_round_statuses(self):
-        """Update round statuses based on current time"""
-        try:
-            current_time = datetime.utcnow()
-            
-            # Update SCHEDULED rounds to ACTIVE if betting has opened but not closed
-            scheduled_rounds = self.db.query(Round).filter(
-                and_(
-                    Round.status == RoundStatus.SCHEDULED,
-                    Round.scheduled_time <= current_time,
-                    Round.betting_closes_at > current_time
-                )
-            ).all()
-            
-            for round in scheduled_rounds:
-                round.status = RoundStatus.ACTIVE
-                
-            # Automatically close rounds where betting time has passed 
-            # (move to COMPLETED only if no result has been published)
-            expired_rounds = self.db.query(Round).filter(
-                and_(
-                    Round.status.in_([RoundStatus.SCHEDULED, RoundStatus.ACTIVE]),
-                    Round.betting_closes_at <= current_time,
-                    Round.result.is_(None)  # Only if no result published yet
-                )
-            ).all()
-            
-            for round in expired_rounds:
-                # Just mark as ACTIVE if it was SCHEDULED, don't auto-complete without result
-                if round.status == RoundStatus.SCHEDULED:
-                    round.status = RoundStatus.ACTIVE
-                    
-            self.db.commit()
-            
-        except Exception as e:
-            self.db.rollback()
-            print(f"Error updating round statuses: {str(e)}")
+    def close_betting_for_due_rounds(self, now: Optional[datetime] = None) -> List[dict]:
+        """Move every SCHEDULED round whose betting deadline has passed to ACTIVE in one UPDATE"""
+        if now is None:
+            now = datetime.now(timezone.utc)
+        
+        closed = self.db.execute(
+            update(Round)
+            .where(
+                Round.status == RoundStatus.SCHEDULED,
+                Round.betting_closes_at <= now,
+                Round.result.is_(None)  # Only if no result published yet
+            )
+            .values(status=RoundStatus.ACTIVE)
+            .returning(Round.id, Round.house_id, Round.round_type, Round.betting_closes_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        return [
+            {
+                "round_id": row.id,
+                "house_id": row.house_id,
+                "round_type": row.round_type.value,
+                "betting_closes_at": row.betting_closes_at.isoformat()
+            }
+            for row in closed
+        ]
     
     def get_active_rounds_old(self) -> List[RoundResponse]:
         """Get active rounds (scheduled and in progress)"""
@@ -409,31 +410,17 @@ class RoundService:
     
     def get_todays_rounds(self) -> List[RoundResponse]:
         """Get today's rounds"""
-        from datetime import date
-        today = date.today()
-        
-        rounds = self.db.query(Round).join(House).filter(
-            func.date(Round.scheduled_time) == today
-        ).order_by(Round.scheduled_time.asc()).all()
-        
-        result = []
-        for round_obj in rounds:
-            round_data = {
-                'id': round_obj.id,
-                'house_id': round_obj.house_id,
-                'house_name': round_obj.house.name,
-                'round_type': round_obj.round_type,
-                'status': round_obj.status,
-                'scheduled_time': round_obj.scheduled_time,
-                'betting_closes_at': round_obj.betting_closes_at,
-                'actual_time': round_obj.actual_time,
-                'result': round_obj.result,
-                'created_at': round_obj.created_at
-            }
-            response = RoundResponse(**round_data)
-            result.append(response)
+        return [RoundResponse(**row) for row in self.get_todays_rounds_rows()]
+    
+    def get_todays_rounds_rows(self) -> List[dict]:
+        """Today's rounds as plain RoundResponse-shaped rows"""
+        day_start, day_end = local_day_bounds(PLATFORM_TIMEZONE, local_today())
         
-        return result
+        query = select(*ROUND_RESPONSE_COLUMNS).join(House, House.id == Round.house_id).where(
+            Round.scheduled_time >= day_start,
+            Round.scheduled_time < day_end
+        ).order_by(Round.scheduled_time.asc())
+        return rows_to_dicts(self.db.execute(query))
     
     def schedule_daily_rounds(self, target_date: date = None) -> dict:
         """Schedule rounds for a specific date using the scheduler service"""
@@ -453,9 +440,6 @@ class RoundService:
     def create_daily_rounds_for_house(self, house_id: int, target_date: date = None) -> Tuple[bool, str]:
         """Create FR, SR, and Forecast rounds for a house on a specific date"""
         try:
-            if target_date is None:
-                target_date = date.today()
-            
             # Check if house exists and is active
             house = self.db.query(House).filter(House.id == house_id).first()
             if not house:
@@ -464,55 +448,38 @@ class RoundService:
             if not house.is_active:
                 return False, "House is not active"
             
-            # Check if rounds already exist for this date
+            if target_date is None:
+                target_date = local_today(house.timezone)
+            
+            # Check if rounds already exist for this local date
+            day_start, day_end = local_day_bounds(house.timezone, target_date)
             existing_rounds = self.db.query(Round).filter(
                 and_(
                     Round.house_id == house_id,
-                    func.date(Round.scheduled_time) == target_date
+                    Round.scheduled_time >= day_start,
+                    Round.scheduled_time < day_end
                 )
             ).count()
             
             if existing_rounds > 0:
                 return False, f"Rounds already exist for {target_date}"
             
-            # Use house's actual configured times instead of hardcoded times
-            from datetime import timezone as tz
-            
-            # Create FR round using house's FR time
-            fr_time = datetime.combine(target_date, house.fr_time).replace(tzinfo=tz.utc)
-            fr_betting_closes = fr_time - timedelta(minutes=house.betting_window_minutes)
-            
-            fr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.FR,
-                scheduled_time=fr_time,
-                betting_closes_at=fr_betting_closes,
-                status=RoundStatus.SCHEDULED
-            )
-            
-            # Create SR round using house's SR time
-            sr_time = datetime.combine(target_date, house.sr_time).replace(tzinfo=tz.utc)
-            sr_betting_closes = sr_time - timedelta(minutes=house.betting_window_minutes)
-            
-            sr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.SR,
-                scheduled_time=sr_time,
-                betting_closes_at=sr_betting_closes,
-                status=RoundStatus.SCHEDULED
-            )
-            
-            # Create Forecast round (closes same time as FR)
-            forecast_round = Round(
-                house_id=house_id,
-                round_type=RoundType.FORECAST,
-                scheduled_time=sr_time,  # Results announced with SR
-                betting_closes_at=fr_betting_closes,  # Closes with FR
-                status=RoundStatus.SCHEDULED
-            )
+            # House timings are local to the house timezone
+            rounds = [
+                Round(
+                    house_id=house_id,
+                    round_type=slot.round_type,
+                    scheduled_time=slot.scheduled_time,
+                    betting_closes_at=slot.betting_closes_at,
+                    local_date=target_date,
+                    status=RoundStatus.SCHEDULED
+                )
+                for slot in round_slots(house, target_date)
+            ]
             
-            self.db.add_all([fr_round, sr_round, forecast_round])
+            self.db.add_all(rounds)
             self.db.commit()
+            event_bus.publish(ROUNDS_CHANGED, house_id=house_id)
             
             return True, f"Daily rounds created for house {house.name} on {target_date}"
             
@@ -524,7 +491,7 @@ class RoundService:
         """Create daily rounds for all active houses"""
         try:
             if target_date is None:
-                target_date = date.today()
+                target_date = local_today()
             
             results = {
                 "success": [],
@@ -587,7 +554,7 @@ class RoundService:
                 self.db.commit()
                 
                 # Check if all rounds for today are completed, then create tomorrow's
-                tomorrow = date.today() + timedelta(days=1)
+                tomorrow = local_today() + timedelta(days=1)
                 self.create_daily_rounds_for_all_houses(tomorrow)
                 results["next_day_created"] = True
             
@@ -0,0 +1,77 @@
+"""
+Schedule Calculator
+Single source of truth for turning house-local draw days and times into UTC
+instants. Local-day boundaries and draw instants are memoized per
+(timezone, date), so range queries and round generation share the same math.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.models.round import RoundType
+
+# Houses default to this timezone; platform-wide "today" uses it too
+PLATFORM_TIMEZONE = "Asia/Kolkata"
+
+
+@dataclass(frozen=True)
+class RoundSlot:
+    round_type: RoundType
+    scheduled_time: datetime
+    betting_closes_at: datetime
+
+
+@lru_cache(maxsize=None)
+def get_zone(tz_name: Optional[str]) -> ZoneInfo:
+    """ZoneInfo for a timezone name, falling back to UTC when it is invalid"""
+    try:
+        return ZoneInfo(tz_name or PLATFORM_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=4096)
+def draw_instant(tz_name: Optional[str], local_date: date, local_time: time) -> datetime:
+    """UTC instant of a local wall-clock time on a local date"""
+    return datetime.combine(local_date, local_time, tzinfo=get_zone(tz_name)).astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def local_day_bounds(tz_name: Optional[str], local_date: date) -> Tuple[datetime, datetime]:
+    """Half-open UTC range [start, end) covering one local day"""
+    return draw_instant(tz_name, local_date, time.min), draw_instant(tz_name, local_date + timedelta(days=1), time.min)
+
+
+def local_today(tz_name: Optional[str] = PLATFORM_TIMEZONE, now: Optional[datetime] = None) -> date:
+    """Current local date in a timezone"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(get_zone(tz_name)).date()
+
+
+def as_utc(instant: datetime) -> datetime:
+    """A stored instant as aware UTC (naive values, e.g. from SQLite, are treated as UTC)"""
+    if instant.tzinfo is None:
+        return instant.replace(tzinfo=timezone.utc)
+    return instant.astimezone(timezone.utc)
+
+
+def local_date_of(tz_name: Optional[str], instant: datetime) -> date:
+    """Local date of a stored instant (naive values are treated as UTC)"""
+    return as_utc(instant).astimezone(get_zone(tz_name)).date()
+
+
+def round_slots(house, local_date: date) -> List[RoundSlot]:
+    """FR, SR and Forecast instants for a house on one local day"""
+    window = timedelta(minutes=house.betting_window_minutes or 0)
+    fr_time = draw_instant(house.timezone, local_date, house.fr_time)
+    sr_time = draw_instant(house.timezone, local_date, house.sr_time)
+
+    return [
+        RoundSlot(RoundType.FR, fr_time, fr_time - window),
+        RoundSlot(RoundType.SR, sr_time, sr_time - window),
+        # Forecast closes with FR and is drawn with SR
+        RoundSlot(RoundType.FORECAST, sr_time, fr_time - window),
+    ]
@@ -0,0 +1,55 @@
+"""
+Background jobs and when they run
+
+Everything here runs only on the elected scheduler leader (see
+app.services.scheduler), so adding workers never multiplies the work.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.scheduler import JobRun
+from app.services.daily_scheduler import run_daily_scheduling
+from app.services.ledger_service import ledger_maintenance
+from app.services.round_lifecycle import round_lifecycle_scheduler
+from app.services.scheduler import Cron, Every, scheduler
+from app.services.upload_store import upload_gc
+
+
+def reconcile_ledger() -> dict:
+    """Snapshot platform accounts and reconcile wallets"""
+    report = ledger_maintenance.run_once()
+    if report is None:
+        return {"skipped": True}
+    return {
+        "mismatched_wallets": report["mismatched_wallets"],
+        "unbalanced_journals": len(report["unbalanced_journals"]),
+    }
+
+
+def prune_job_history() -> int:
+    """Delete job runs older than SCHEDULER_HISTORY_DAYS"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SCHEDULER_HISTORY_DAYS)
+    db = SessionLocal()
+    try:
+        deleted = db.execute(delete(JobRun).where(JobRun.started_at < cutoff)).rowcount
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+# Create upcoming rounds; also on takeover, so a fresh deployment has rounds at once
+scheduler.register("daily_scheduling", run_daily_scheduling, Cron(settings.DAILY_SCHEDULING_CRON), run_at_start=True)
+# Betting-close and draw transitions at their exact instants
+scheduler.register_service(
+    "round_lifecycle", round_lifecycle_scheduler.start_scheduler, round_lifecycle_scheduler.stop_scheduler
+)
+# Ledger snapshot rollup and wallet reconciliation
+scheduler.register("ledger_maintenance", reconcile_ledger, Every(settings.LEDGER_MAINTENANCE_INTERVAL))
+# Sweep stored uploads nothing references
+scheduler.register("upload_gc", upload_gc.run_once, Every(settings.UPLOAD_GC_INTERVAL))
+scheduler.register("job_history_prune", prune_job_history, Cron("15 3 * * *"))
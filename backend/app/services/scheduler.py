@@ -0,0 +1,336 @@
+"""
+Background job scheduler with leader election
+
+Every gunicorn worker runs a SchedulerRuntime, but only the elected leader
+runs jobs. Leadership is a session-level Postgres advisory lock held on a
+dedicated connection. The leader checks that connection every heartbeat;
+followers try the lock on the same beat. When a leader dies or loses its
+connection, Postgres releases the lock and a follower takes over on its next
+beat. A clean shutdown releases the lock straight away.
+
+Jobs are blocking functions registered with a Cron or Every schedule. They
+run in a worker thread, never overlap themselves, and each run is recorded in
+scheduler_job_runs. Leader services are long-running loops, such as the round
+lifecycle timers, that start when this worker is elected and stop when it
+steps down.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.scheduler import JOB_FAILED, JOB_SUCCEEDED, JobRun
+from app.utils.metrics import SCHEDULER_LAG
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock whose holder is the scheduler leader
+SCHEDULER_LEADER_LOCK_KEY = 7_316_003
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(bound) for bound in spec.split("-", 1))
+        else:
+            start = end = int(spec)
+            if step:
+                end = high  # "5/15" means every 15 starting at 5
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field out of range: {part}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+class Cron:
+    """Five-field cron expression (minute hour day-of-month month day-of-week), in UTC"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs five fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = frozenset(day % 7 for day in _parse_cron_field(fields[4], 0, 7))
+        self.any_day, self.any_weekday = fields[2] == "*", fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday  # Both restricted: either one matches, as in cron
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment"""
+        candidate = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def __repr__(self):
+        return f"Cron({self.expression!r})"
+
+
+class Every:
+    """Fixed interval between runs"""
+
+    def __init__(self, seconds: int):
+        self.interval = timedelta(seconds=seconds)
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + self.interval
+
+    def __repr__(self):
+        return f"Every({int(self.interval.total_seconds())}s)"
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], object]  # Blocking; runs in a worker thread
+    schedule: object  # Cron or Every
+    run_at_start: bool = False  # Also run as soon as a worker becomes leader
+
+
+class LeaderLock:
+    """Session-level advisory lock on a dedicated connection (PostgreSQL; other databases always lead)"""
+
+    def __init__(self, bind: Engine, key: int):
+        self.bind = bind
+        self.key = key
+        self.held = False
+        self._connection: Optional[Connection] = None
+
+    @property
+    def local(self) -> bool:
+        # SQLite development databases and tests run in a single process
+        return self.bind.dialect.name != "postgresql"
+
+    def try_acquire(self) -> bool:
+        if self.local:
+            self.held = True
+            return True
+        connection = self.bind.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.invalidate()
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection, self.held = connection, True
+        return True
+
+    def heartbeat(self) -> bool:
+        """Whether the lock is still held; a session that is gone has already released it"""
+        if self.local:
+            return self.held
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"Scheduler leader connection lost: {e}")
+            self._drop(invalidate=True)
+            return False
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                self._connection.commit()
+                unlocked = True
+            except Exception:
+                unlocked = False
+            # Otherwise discarding the connection ends the session, which releases the lock
+            self._drop(invalidate=not unlocked)
+        self.held = False
+
+    def _drop(self, invalidate: bool):
+        if invalidate:
+            # Never hand a session that may still hold the lock back to the pool
+            self._connection.invalidate()
+        self._connection.close()
+        self._connection = None
+        self.held = False
+
+
+class SchedulerRuntime:
+    def __init__(self, lock: LeaderLock, heartbeat_seconds: int = 15, session_factory=SessionLocal):
+        self.lock = lock
+        self.heartbeat = heartbeat_seconds
+        self.session_factory = session_factory
+        self.jobs: Dict[str, Job] = {}
+        self.services: Dict[str, Tuple[Callable[[], Awaitable], Callable[[], None]]] = {}
+        self.worker = ""
+        self._task: Optional[asyncio.Task] = None
+        self._leading = False
+        self._next_run: Dict[str, datetime] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._service_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leading
+
+    def register(self, name: str, func: Callable[[], object], schedule, run_at_start: bool = False):
+        """Add a job run by the leader on schedule"""
+        self.jobs[name] = Job(name, func, schedule, run_at_start)
+
+    def register_service(self, name: str, start: Callable[[], Awaitable], stop: Callable[[], None]):
+        """Add a long-running loop that only the leader runs"""
+        self.services[name] = (start, stop)
+
+    def status(self) -> dict:
+        """This worker's view: whether it leads and when each job runs next"""
+        return {
+            "worker": self.worker,
+            "leader": self._leading,
+            "jobs": {
+                name: {
+                    "schedule": repr(job.schedule),
+                    "next_run": self._next_run.get(name),
+                    "running": name in self._running,
+                }
+                for name, job in self.jobs.items()
+            },
+        }
+
+    # Leadership
+    def _take_over(self, now: datetime):
+        self._leading = True
+        logger.info(f"Worker {self.worker} is now the scheduler leader")
+        for job in self.jobs.values():
+            self._next_run[job.name] = now if job.run_at_start else job.schedule.next_after(now)
+        loop = asyncio.get_running_loop()
+        for name, (start, _) in self.services.items():
+            self._service_tasks[name] = loop.create_task(start())
+
+    def _step_down(self):
+        if not self._leading:
+            return
+        self._leading = False
+        self._next_run.clear()
+        for name, task in self._service_tasks.items():
+            self.services[name][1]()
+            task.cancel()
+        self._service_tasks.clear()
+        # Jobs already running finish in their threads and are still recorded
+        logger.info(f"Worker {self.worker} stepped down as scheduler leader")
+
+    # Jobs
+    def _start_due_jobs(self, now: datetime):
+        loop = asyncio.get_running_loop()
+        for name, due in list(self._next_run.items()):
+            if due > now or name in self._running:
+                continue
+            job = self.jobs[name]
+            # Missed runs are not caught up one by one; the next run follows from now
+            self._next_run[name] = job.schedule.next_after(max(due, now))
+            task = loop.create_task(self._execute(job, due))
+            self._running[name] = task
+            task.add_done_callback(lambda _, name=name: self._running.pop(name, None))
+
+    async def _execute(self, job: Job, due: datetime):
+        started_at = datetime.now(timezone.utc)
+        SCHEDULER_LAG.labels(job.name).observe(max(0.0, (started_at - due).total_seconds()))
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = await asyncio.to_thread(job.func)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"Scheduled job {job.name} failed: {error}")
+        run = JobRun(
+            job_name=job.name, status=JOB_FAILED if error else JOB_SUCCEEDED, worker=self.worker,
+            scheduled_for=due, started_at=started_at, finished_at=datetime.now(timezone.utc),
+            duration=time.perf_counter() - started, error=error,
+            result=result if isinstance(result, dict) or result is None else {"value": result},
+        )
+        await asyncio.to_thread(self._record, run)
+
+    def _record(self, run: JobRun):
+        db = self.session_factory()
+        try:
+            db.add(run)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not record run of job {run.job_name}: {e}")
+        finally:
+            db.close()
+
+    # Run loop
+    async def _run(self):
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                if self._leading:
+                    if not await asyncio.to_thread(self.lock.heartbeat):
+                        self._step_down()
+                elif await asyncio.to_thread(self.lock.try_acquire):
+                    self._take_over(now)
+            except Exception as e:
+                logger.error(f"Scheduler leader election failed: {e}")
+
+            if self._leading:
+                self._start_due_jobs(now)
+
+            # Wake for the next heartbeat or the next due job, whichever comes first
+            # (a job still running from its last turn is picked up on a later beat)
+            timeout = self.heartbeat
+            waiting = [due for name, due in self._next_run.items() if name not in self._running]
+            if self._leading and waiting:
+                until_next = (min(waiting) - datetime.now(timezone.utc)).total_seconds()
+                timeout = min(timeout, max(until_next, 0.0))
+            await asyncio.sleep(timeout)
+
+    def start(self):
+        """Start electing and, once leader, running jobs on the running loop"""
+        if self._task is None:
+            self.worker = f"{socket.gethostname()}:{os.getpid()}"
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop, and hand leadership over at once rather than after a failed heartbeat"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._step_down()
+        await asyncio.to_thread(self.lock.release)
+
+
+# Global scheduler runtime (jobs are registered in app.services.scheduled_jobs)
+scheduler = SchedulerRuntime(LeaderLock(engine, SCHEDULER_LEADER_LOCK_KEY), settings.SCHEDULER_HEARTBEAT_SECONDS)
@@ -1,13 +1,19 @@
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, time
+from sqlalchemy import and_, or_, func, insert, literal, update, DateTime, Time
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, date, timedelta, timezone
 from typing import List, Optional
-import calendar
 
 from app.models.house import House
 from app.models.round import Round, RoundType, RoundStatus
 from app.models.bet import Bet, BetType
+from app.services.events import event_bus, ROUNDS_CHANGED, LOBBY_CHANGED
+from app.services.schedule_calculator import as_utc, get_zone, local_today, round_slots
 
 class SchedulingService:
+    # Rows per bulk INSERT statement
+    INSERT_BATCH_SIZE = 1000
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -35,58 +41,105 @@ class SchedulingService:
         if not house:
             raise ValueError("House not found")
         
-        created_rounds = 0
-        today = datetime.now().date()
+        return self.generate_rounds([house], days_ahead=days_ahead)
+    
+    def generate_rounds(self, houses: Optional[List[House]] = None, days_ahead: int = 30) -> int:
+        """Bulk-create missing FR, SR and Forecast rounds for houses over the next N local days.
+
+        The window starts on each house's local today; slots of today whose betting has already
+        closed are skipped rather than created in the past.
+        """
+        if houses is None:
+            houses = self.db.query(House).filter(House.is_active == True).all()
+        if not houses:
+            return 0
+        
+        now = datetime.now(timezone.utc)
         
-        for day_offset in range(days_ahead):
-            target_date = today + timedelta(days=day_offset)
-            weekday = target_date.weekday()  # 0=Monday, 6=Sunday
+        # Build the whole calendar window in memory
+        candidates = []
+        for house in houses:
+            house_today = local_today(house.timezone, now)
             
-            # Check if house operates on this day
-            if not self._house_operates_on_day(house, weekday):
-                continue
-                
-            # Check if rounds already exist for this date
-            existing_rounds = self.db.query(Round).filter(
-                Round.house_id == house_id,
-                Round.scheduled_time >= datetime.combine(target_date, time.min),
-                Round.scheduled_time < datetime.combine(target_date + timedelta(days=1), time.min)
-            ).count()
-            
-            if existing_rounds > 0:
-                continue  # Skip if rounds already exist for this date
-            
-            # Create FR round
-            fr_datetime = datetime.combine(target_date, house.fr_time)
-            fr_betting_closes = fr_datetime - timedelta(minutes=house.betting_window_minutes)
-            
-            fr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.FR,
-                status=RoundStatus.SCHEDULED,
-                scheduled_time=fr_datetime,
-                betting_closes_at=fr_betting_closes
-            )
-            self.db.add(fr_round)
-            created_rounds += 1
-            
-            # Create SR round
-            sr_datetime = datetime.combine(target_date, house.sr_time)
-            sr_betting_closes = sr_datetime - timedelta(minutes=house.betting_window_minutes)
-            
-            sr_round = Round(
-                house_id=house_id,
-                round_type=RoundType.SR,
-                status=RoundStatus.SCHEDULED,
-                scheduled_time=sr_datetime,
-                betting_closes_at=sr_betting_closes
-            )
-            self.db.add(sr_round)
-            created_rounds += 1
+            for day_offset in range(days_ahead):
+                target_date = house_today + timedelta(days=day_offset)
+                if not self._house_operates_on_day(house, target_date.weekday()):
+                    continue
+                candidates.extend(self._round_rows_for_day(house, target_date, now))
+        
+        if not candidates:
+            return 0
+        
+        # One query for every slot that already exists in the window
+        window_start = min(row["local_date"] for row in candidates)
+        existing = set(
+            self.db.query(Round.house_id, Round.round_type, Round.local_date).filter(
+                Round.house_id.in_([house.id for house in houses]),
+                Round.local_date >= window_start
+            ).all()
+        )
+        missing = [
+            row for row in candidates
+            if (row["house_id"], row["round_type"], row["local_date"]) not in existing
+        ]
+        if not missing:
+            return 0
+        
+        # Pending ORM changes (e.g. deleted rounds) must reach the database first
+        self.db.flush()
+        
+        created_rounds = 0
+        for start in range(0, len(missing), self.INSERT_BATCH_SIZE):
+            created_rounds += self._insert_ignore_conflicts(missing[start:start + self.INSERT_BATCH_SIZE])
         
         self.db.commit()
+        
+        if created_rounds:
+            event_bus.publish(ROUNDS_CHANGED, house_ids=[house.id for house in houses])
         return created_rounds
     
+    def _insert_ignore_conflicts(self, rows: List[dict]) -> int:
+        """Insert rounds, skipping slots another run created meanwhile; returns how many were inserted"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return self._insert_one_by_one(rows)
+        
+        statement = dialect_insert(Round).values(rows).on_conflict_do_nothing(
+            index_elements=["house_id", "round_type", "local_date"]
+        )
+        return len(self.db.execute(statement.returning(Round.house_id)).all())
+    
+    def _insert_one_by_one(self, rows: List[dict]) -> int:
+        """Row-at-a-time fallback for dialects without ON CONFLICT DO NOTHING"""
+        inserted = 0
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(Round).values(row))
+                inserted += 1
+            except IntegrityError:
+                pass  # Slot already exists
+        return inserted
+    
+    def _round_rows_for_day(self, house: House, target_date: date, now: datetime) -> List[dict]:
+        """FR, SR and Forecast rows for one local day, skipping slots already closed"""
+        return [
+            {
+                "house_id": house.id,
+                "round_type": slot.round_type,
+                "status": RoundStatus.SCHEDULED,
+                "scheduled_time": slot.scheduled_time,
+                "betting_closes_at": slot.betting_closes_at,
+                "local_date": target_date,
+            }
+            for slot in round_slots(house, target_date)
+            if slot.betting_closes_at > now
+        ]
+    
     def _house_operates_on_day(self, house: House, weekday: int) -> bool:
         """Check if house operates on the given weekday (0=Monday, 6=Sunday)"""
         day_flags = [
@@ -100,6 +153,91 @@ class SchedulingService:
         ]
         return day_flags[weekday]
     
+    def reschedule_future_rounds(self, house: House) -> int:
+        """Move future scheduled rounds of a house onto its current timings, one UPDATE per round type"""
+        now = datetime.now(timezone.utc)
+        
+        if self.db.get_bind().dialect.name == "postgresql":
+            moved_rounds = self._reschedule_in_sql(house, now)
+        else:
+            moved_rounds = self._reschedule_in_python(house, now)
+        
+        self.db.commit()
+        
+        if moved_rounds:
+            event_bus.publish(ROUNDS_CHANGED, house_id=house.id)
+            event_bus.publish(LOBBY_CHANGED, house_id=house.id)
+        return moved_rounds
+    
+    def _future_rounds_filter(self, house_id: int, round_type: RoundType, now: datetime):
+        """Future, still scheduled rounds of one type generated for a local day"""
+        return and_(
+            Round.house_id == house_id,
+            Round.round_type == round_type,
+            Round.status == RoundStatus.SCHEDULED,
+            Round.scheduled_time > now,
+            Round.local_date.isnot(None)
+        )
+    
+    def _reschedule_in_sql(self, house: House, now: datetime) -> int:
+        """Timezone arithmetic done by PostgreSQL: timezone(tz, local_date + time)"""
+        moved_rounds = 0
+        tz_name = get_zone(house.timezone).key
+        window = timedelta(minutes=house.betting_window_minutes or 0)
+        
+        # (round type, draw time, betting close time) - Forecast closes with FR and is drawn with SR
+        slots = [
+            (RoundType.FR, house.fr_time, house.fr_time),
+            (RoundType.SR, house.sr_time, house.sr_time),
+            (RoundType.FORECAST, house.sr_time, house.fr_time),
+        ]
+        
+        for round_type, draw_time, close_time in slots:
+            new_scheduled = func.timezone(
+                tz_name, Round.local_date + literal(draw_time, Time), type_=DateTime(timezone=True)
+            )
+            new_closes = func.timezone(
+                tz_name, Round.local_date + literal(close_time, Time), type_=DateTime(timezone=True)
+            ) - window
+            
+            result = self.db.execute(
+                update(Round)
+                .where(
+                    self._future_rounds_filter(house.id, round_type, now),
+                    or_(Round.scheduled_time != new_scheduled, Round.betting_closes_at != new_closes)
+                )
+                .values(scheduled_time=new_scheduled, betting_closes_at=new_closes)
+                .execution_options(synchronize_session=False)
+            )
+            moved_rounds += result.rowcount
+        
+        return moved_rounds
+    
+    def _reschedule_in_python(self, house: House, now: datetime) -> int:
+        """Compute new instants once per local date, then apply them as one executemany UPDATE per type"""
+        moved_rounds = 0
+        
+        for round_type in (RoundType.FR, RoundType.SR, RoundType.FORECAST):
+            rows = self.db.query(
+                Round.id, Round.local_date, Round.scheduled_time, Round.betting_closes_at
+            ).filter(self._future_rounds_filter(house.id, round_type, now)).all()
+            
+            instants = {}
+            for local_date in {row.local_date for row in rows}:
+                slot = next(slot for slot in round_slots(house, local_date) if slot.round_type == round_type)
+                instants[local_date] = (slot.scheduled_time, slot.betting_closes_at)
+            
+            params = [
+                {"id": row.id, "scheduled_time": instants[row.local_date][0], "betting_closes_at": instants[row.local_date][1]}
+                for row in rows
+                if (as_utc(row.scheduled_time), as_utc(row.betting_closes_at)) != instants[row.local_date]
+            ]
+            if params:
+                self.db.execute(update(Round), params)
+                moved_rounds += len(params)
+        
+        return moved_rounds
+    
     def update_house_schedule(self, house_id: int, schedule_data: dict) -> bool:
         """Update house schedule and regenerate future rounds"""
         try:
@@ -160,6 +298,7 @@ class SchedulingService:
                 )
             
             self.db.commit()
+            event_bus.publish(ROUNDS_CHANGED, house_id=round_obj.house_id)
             return True
             
         except Exception as e:
@@ -252,3 +391,4 @@ class SchedulingService:
             "sr_time": house.sr_time.isoformat() if house.sr_time else None,
             "betting_window_minutes": house.betting_window_minutes
         }
+
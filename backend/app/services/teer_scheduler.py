@@ -3,15 +3,15 @@ Teer Round Auto-Scheduler Service
 Handles automatic daily round creation and management with proper timezone support
 """
 
-from datetime import datetime, date, time, timedelta, timezone
-from typing import List, Optional
+from datetime import datetime, date, timedelta, timezone
+from typing import List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-import pytz
 
 from app.models.house import House
 from app.models.round import Round, RoundType, RoundStatus
 from app.database import SessionLocal
+from app.services.events import event_bus, ROUNDS_CHANGED
+from app.services.schedule_calculator import local_day_bounds, local_today, round_slots
 
 class TeerSchedulerService:
     """Service for managing automatic Teer round scheduling"""
@@ -48,13 +48,12 @@ class TeerSchedulerService:
         houses = self.db.query(House).filter(House.is_active == True).all()
         return [house for house in houses if self.should_house_run_today(house, target_date)]
     
-    def rounds_exist_for_date(self, house_id: int, target_date: date) -> bool:
-        """Check if rounds already exist for a house on a specific date"""
-        start_datetime = datetime.combine(target_date, time.min).replace(tzinfo=timezone.utc)
-        end_datetime = datetime.combine(target_date + timedelta(days=1), time.min).replace(tzinfo=timezone.utc)
+    def rounds_exist_for_date(self, house: House, target_date: date) -> bool:
+        """Check if rounds already exist for a house on a specific local date"""
+        start_datetime, end_datetime = local_day_bounds(house.timezone, target_date)
         
         existing_count = self.db.query(Round).filter(
-            Round.house_id == house_id,
+            Round.house_id == house.id,
             Round.scheduled_time >= start_datetime,
             Round.scheduled_time < end_datetime
         ).count()
@@ -66,37 +65,17 @@ class TeerSchedulerService:
         rounds = []
         
         try:
-            # Create FR Round with timezone-aware datetime
-            fr_datetime = house.get_local_datetime(target_date, house.fr_time)
-            # Convert to UTC for storage
-            fr_datetime_utc = fr_datetime.astimezone(pytz.UTC)
-            betting_closes_fr = house.get_betting_deadline(fr_datetime_utc)
-            
-            fr_round = Round(
-                house_id=house.id,
-                round_type=RoundType.FR,
-                scheduled_time=fr_datetime_utc,
-                betting_closes_at=betting_closes_fr,
-                status=RoundStatus.SCHEDULED
-            )
-            self.db.add(fr_round)
-            rounds.append(fr_round)
-            
-            # Create SR Round with timezone-aware datetime
-            sr_datetime = house.get_local_datetime(target_date, house.sr_time)
-            # Convert to UTC for storage
-            sr_datetime_utc = sr_datetime.astimezone(pytz.UTC)
-            betting_closes_sr = house.get_betting_deadline(sr_datetime_utc)
-            
-            sr_round = Round(
-                house_id=house.id,
-                round_type=RoundType.SR,
-                scheduled_time=sr_datetime_utc,
-                betting_closes_at=betting_closes_sr,
-                status=RoundStatus.SCHEDULED
-            )
-            self.db.add(sr_round)
-            rounds.append(sr_round)
+            for slot in round_slots(house, target_date):
+                round_obj = Round(
+                    house_id=house.id,
+                    round_type=slot.round_type,
+                    scheduled_time=slot.scheduled_time,
+                    betting_closes_at=slot.betting_closes_at,
+                    local_date=target_date,
+                    status=RoundStatus.SCHEDULED
+                )
+                self.db.add(round_obj)
+                rounds.append(round_obj)
             
             return rounds
             
@@ -104,11 +83,10 @@ class TeerSchedulerService:
             self.db.rollback()
             raise Exception(f"Failed to create rounds for {house.name}: {str(e)}")
     
-    
     def schedule_daily_rounds(self, target_date: date = None) -> dict:
         """Schedule rounds for a specific date (default: tomorrow)"""
         if target_date is None:
-            target_date = date.today() + timedelta(days=1)
+            target_date = local_today() + timedelta(days=1)
         
         results = {
             'date': target_date,
@@ -120,7 +98,7 @@ class TeerSchedulerService:
         houses = self.get_houses_for_date(target_date)
         
         for house in houses:
-            if self.rounds_exist_for_date(house.id, target_date):
+            if self.rounds_exist_for_date(house, target_date):
                 results['houses_skipped'].append({
                     'house': house.name,
                     'reason': 'Rounds already exist'
@@ -130,6 +108,7 @@ class TeerSchedulerService:
             try:
                 created_rounds = self.create_rounds_for_date(house, target_date)
                 self.db.commit()
+                event_bus.publish(ROUNDS_CHANGED, house_id=house.id)
                 
                 results['houses_scheduled'].append({
                     'house': house.name,
@@ -151,7 +130,7 @@ class TeerSchedulerService:
     
     def auto_schedule_tomorrow_after_completion(self) -> dict:
         """Auto-schedule tomorrow's rounds - New improved logic"""
-        tomorrow = date.today() + timedelta(days=1)
+        tomorrow = local_today() + timedelta(days=1)
         
         # Get houses that should run tomorrow
         houses = self.get_houses_for_date(tomorrow)
@@ -164,7 +143,7 @@ class TeerSchedulerService:
         # Check if rounds already exist for tomorrow
         existing_rounds = False
         for house in houses:
-            if self.rounds_exist_for_date(house.id, tomorrow):
+            if self.rounds_exist_for_date(house, tomorrow):
                 existing_rounds = True
                 break
         
@@ -180,12 +159,18 @@ class TeerSchedulerService:
     
     def create_next_day_rounds_after_results(self, house_id: int) -> dict:
         """Create next day rounds only after BOTH FR and SR results are published"""
-        today = date.today()
+        house = self.db.query(House).filter(House.id == house_id).first()
+        if not house:
+            return {
+                'created': False,
+                'reason': 'House not found'
+            }
+        
+        today = local_today(house.timezone)
         tomorrow = today + timedelta(days=1)
         
         # Check if both FR and SR results are published for today
-        start_datetime = datetime.combine(today, time.min).replace(tzinfo=timezone.utc)
-        end_datetime = datetime.combine(today + timedelta(days=1), time.min).replace(tzinfo=timezone.utc)
+        start_datetime, end_datetime = local_day_bounds(house.timezone, today)
         
         today_rounds = self.db.query(Round).filter(
             Round.house_id == house_id,
@@ -207,15 +192,14 @@ class TeerSchedulerService:
             }
         
         # Check if house should run tomorrow
-        house = self.db.query(House).filter(House.id == house_id).first()
-        if not house or not self.should_house_run_today(house, tomorrow):
+        if not self.should_house_run_today(house, tomorrow):
             return {
                 'created': False,
                 'reason': 'House not configured to run tomorrow'
             }
         
         # Check if rounds already exist for tomorrow
-        if self.rounds_exist_for_date(house_id, tomorrow):
+        if self.rounds_exist_for_date(house, tomorrow):
             return {
                 'created': False,
                 'reason': 'Rounds already exist for tomorrow'
@@ -225,6 +209,7 @@ class TeerSchedulerService:
         try:
             rounds = self.create_rounds_for_date(house, tomorrow)
             self.db.commit()
+            event_bus.publish(ROUNDS_CHANGED, house_id=house.id)
             
             return {
                 'created': True,
@@ -241,11 +226,11 @@ class TeerSchedulerService:
     
     def get_forecast_rounds(self, house_id: int, target_date: date = None) -> dict:
         """Get FR and SR rounds for forecast betting"""
+        house_timezone = self.db.query(House.timezone).filter(House.id == house_id).scalar()
         if target_date is None:
-            target_date = date.today()
+            target_date = local_today(house_timezone)
         
-        start_datetime = datetime.combine(target_date, time.min).replace(tzinfo=timezone.utc)
-        end_datetime = datetime.combine(target_date + timedelta(days=1), time.min).replace(tzinfo=timezone.utc)
+        start_datetime, end_datetime = local_day_bounds(house_timezone, target_date)
         
         rounds = self.db.query(Round).filter(
             Round.house_id == house_id,
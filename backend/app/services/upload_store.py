@@ -0,0 +1,245 @@
+"""
+Content-addressed upload store
+
+Uploaded files are stored once, named by the SHA-256 of their content, so the
+same screenshot or QR code uploaded again costs no disk and no write. Rows in
+upload_references tie each file to the transactions, banners and payment
+methods whose URLs point at it. A periodic collection deletes files nothing
+references once UPLOAD_GC_GRACE_HOURS have passed since they were last
+uploaded; a fresh upload stays unreferenced until the record that uses it is
+saved.
+
+Private files (deposit proofs and other documents) are stored under the
+private/ prefix and only served through signed, expiring URLs; their plain
+URL is what records keep, and sign_private_urls turns it into a usable link
+when a record is shown. Public and private uploads of the same bytes are
+separate blobs, referenced and collected independently.
+
+The bytes live behind BlobBackend. LocalBlobBackend keeps them under
+uploads/blobs, where app/api/files serves them; an
+S3-compatible backend only has to implement the same five methods.
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import re
+import shutil
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Collection, Optional, Set, Tuple
+from uuid import uuid4
+
+from fastapi import UploadFile
+from sqlalchemy import and_, delete, exists, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import UploadBlob, UploadReference
+from app.models.upload import blob_key, variant_key
+from app.utils.signed_urls import sign_url
+from app.utils.upload_stream import digest_file, sniff_content_type, stream_to_disk
+
+logger = logging.getLogger(__name__)
+
+BLOB_URL = re.compile(r"/uploads/blobs/(private/)?[0-9a-f]{2}/([0-9a-f]{64})")
+PRIVATE_URL = re.compile(r"/uploads/blobs/private/[^\s?#\"']+(?:\?[^\s#\"']*)?")
+SAFE_EXTENSION = re.compile(r"\.[a-z0-9]{1,9}")
+
+# Files deleted per collection run
+GC_BATCH = 1_000
+
+
+class UnsupportedUpload(Exception):
+    def __init__(self, content_type: str):
+        super().__init__(f"Unsupported file type: {content_type}")
+        self.content_type = content_type
+
+
+class BlobBackend(ABC):
+    """Where stored file bytes live, by key"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def put(self, key: str, source: Path) -> None:
+        """Store the file at source under key; source is consumed"""
+
+    @abstractmethod
+    def fetch(self, key: str, destination: Path) -> None:
+        """Copy the stored file to a local path"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+
+class LocalBlobBackend(BlobBackend):
+    def __init__(self, root: Path, url_prefix: str):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def put(self, key: str, source: Path) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, path)
+
+    def fetch(self, key: str, destination: Path) -> None:
+        shutil.copyfile(self.root / key, destination)
+
+    def delete(self, key: str) -> None:
+        (self.root / key).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+
+def referenced_blobs(*values) -> Set[Tuple[str, bool]]:
+    """(sha256, private) of stored files whose URLs appear in values (strings, or dicts and lists of them)"""
+    hashes = set()
+    for value in values:
+        if isinstance(value, str):
+            hashes.update((sha256, bool(private)) for private, sha256 in BLOB_URL.findall(value))
+        elif isinstance(value, dict):
+            hashes |= referenced_blobs(*value.values())
+        elif isinstance(value, (list, tuple)):
+            hashes |= referenced_blobs(*value)
+    return hashes
+
+
+def sign_private_urls(value):
+    """Copy of value (a string, or dicts and lists of them) with private file URLs signed afresh"""
+    if isinstance(value, str):
+        return PRIVATE_URL.sub(lambda match: sign_url(match.group(0).split("?", 1)[0]), value)
+    if isinstance(value, dict):
+        return {key: sign_private_urls(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sign_private_urls(item) for item in value]
+    return value
+
+
+class UploadStore:
+    def __init__(self, backend: BlobBackend, staging_dir: Path):
+        self.backend = backend
+        self.staging_dir = staging_dir
+
+    def url(self, blob: UploadBlob) -> str:
+        return self.backend.url(blob.key)
+
+    async def save(
+        self, db: Session, file: UploadFile, max_size: int, accept: Optional[Collection[str]] = None,
+        private: bool = False, sanitize: Optional[Callable[[Path, str], Awaitable[bool]]] = None
+    ) -> Tuple[UploadBlob, bool]:
+        """Store an upload; True alongside the blob when the same content was already stored.
+
+        Raises UnsupportedUpload when accept is given and the sniffed content type isn't in it.
+        sanitize may rewrite the staged file (given its content type) before it is hashed and stored.
+        """
+        await asyncio.to_thread(self.staging_dir.mkdir, parents=True, exist_ok=True)
+        stored = await stream_to_disk(file, self.staging_dir / uuid4().hex, max_size)
+        try:
+            content_type = await asyncio.to_thread(sniff_content_type, stored.path)
+            if accept is not None and content_type not in accept:
+                raise UnsupportedUpload(content_type)
+            if sanitize is not None and await sanitize(stored.path, content_type):
+                stored = await asyncio.to_thread(digest_file, stored.path)
+
+            # Touching last_uploaded_at also keeps a pending collection away from this file
+            touched = db.execute(
+                update(UploadBlob).where(UploadBlob.sha256 == stored.sha256, UploadBlob.private == private)
+                .values(last_uploaded_at=datetime.now(timezone.utc))
+            ).rowcount
+            if not touched:
+                # Name by what the content is, not what the client called it
+                extension = mimetypes.guess_extension(content_type) or Path(file.filename or "").suffix.lower()
+                db.add(UploadBlob(
+                    sha256=stored.sha256, size=stored.size, content_type=content_type, private=private,
+                    extension=extension if SAFE_EXTENSION.fullmatch(extension) else ""
+                ))
+            try:
+                db.commit()
+            except IntegrityError:
+                # The same content arrived concurrently; theirs is the row
+                db.rollback()
+            blob = db.get(UploadBlob, (stored.sha256, private))
+
+            if await asyncio.to_thread(self.backend.exists, blob.key):
+                return blob, True
+            await asyncio.to_thread(self.backend.put, blob.key, stored.path)
+            return blob, False
+        finally:
+            await asyncio.to_thread(stored.path.unlink, missing_ok=True)
+
+    def link(self, db: Session, owner_type: str, owner_id: int, *values) -> None:
+        """Make owner reference exactly the stored files named in values (the caller commits)"""
+        blobs = referenced_blobs(*values)
+        owned = (UploadReference.owner_type == owner_type, UploadReference.owner_id == owner_id)
+        key = tuple_(UploadReference.sha256, UploadReference.private)
+        current = {tuple(row) for row in db.execute(select(UploadReference.sha256, UploadReference.private).where(*owned))}
+        if current - blobs:
+            db.execute(delete(UploadReference).where(*owned, key.in_(list(current - blobs))))
+        if blobs - current:
+            known = db.execute(
+                select(UploadBlob.sha256, UploadBlob.private)
+                .where(tuple_(UploadBlob.sha256, UploadBlob.private).in_(list(blobs - current)))
+            )
+            db.add_all(
+                UploadReference(sha256=sha256, private=private, owner_type=owner_type, owner_id=owner_id)
+                for sha256, private in known
+            )
+
+    def collect_garbage(self, db: Session, uploaded_before: datetime, limit: int = GC_BATCH) -> int:
+        """Delete up to limit unreferenced files last uploaded before the cutoff"""
+        collectable = (
+            UploadBlob.last_uploaded_at < uploaded_before,
+            ~exists().where(and_(UploadReference.sha256 == UploadBlob.sha256, UploadReference.private == UploadBlob.private)),
+        )
+        candidates = select(UploadBlob.sha256, UploadBlob.private).where(*collectable).limit(limit)
+        # The conditions are checked again as rows are deleted, so a file linked or re-uploaded meanwhile stays
+        deleted = db.execute(
+            delete(UploadBlob).where(tuple_(UploadBlob.sha256, UploadBlob.private).in_(candidates), *collectable)
+            .returning(UploadBlob.sha256, UploadBlob.extension, UploadBlob.private, UploadBlob.variants)
+        ).all()
+        db.commit()
+        for sha256, extension, private, variants in deleted:
+            self.backend.delete(blob_key(sha256, extension, private))
+            for name in variants or ():
+                self.backend.delete(variant_key(sha256, name, private))
+        return len(deleted)
+
+
+class UploadGarbageCollector:
+    """Deletion of stored files nothing references (a scheduled job, see app.services.scheduled_jobs)"""
+
+    def __init__(self, store: UploadStore, grace_hours: int = 24):
+        self.store = store
+        self.grace = timedelta(hours=grace_hours)
+
+    def run_once(self) -> int:
+        """Collect one batch (runs in a worker thread)"""
+        db = SessionLocal()
+        try:
+            collected = self.store.collect_garbage(db, datetime.now(timezone.utc) - self.grace)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if collected:
+            logger.info(f"Deleted {collected} unreferenced uploads")
+        return collected
+
+
+# Global upload store and its collector
+upload_store = UploadStore(LocalBlobBackend(Path("uploads/blobs"), "/uploads/blobs"), Path("uploads/.staging"))
+upload_gc = UploadGarbageCollector(upload_store, settings.UPLOAD_GC_GRACE_HOURS)
@@ -0,0 +1,163 @@
+"""
+Per-user wallet snapshots
+
+A snapshot holds everything the wallet read endpoints show: balance, pending
+deposit and withdrawal totals and the latest transactions. Every wallet
+mutation rebuilds the affected snapshots right after it commits
+(write-through). The rebuild takes a few grouped queries however many users
+changed, and the result goes to Redis. Each snapshot carries a content hash
+that the endpoints use as their ETag.
+
+A read that misses rebuilds the snapshot and stores it only if no writer got
+there first (SET NX). Two writers racing can still leave the older of two
+snapshots behind, for at most WALLET_SNAPSHOT_TTL seconds. Without Redis
+every read rebuilds from the database.
+"""
+
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Transaction, User
+from app.models.transaction import TransactionStatus, TransactionType
+from app.services.events import event_bus, WALLET_CHANGED
+from app.utils.fast_json import ORJSON_OPTIONS
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# TransactionResponse fields
+TRANSACTION_COLUMNS = (
+    Transaction.id, Transaction.user_id, Transaction.transaction_type, Transaction.amount, Transaction.status,
+    Transaction.description, Transaction.payment_proof_url, Transaction.payment_method_id,
+    Transaction.transaction_details, Transaction.deposit_method, Transaction.reference_number,
+    Transaction.deposit_bank, Transaction.deposit_upi_id, Transaction.admin_notes, Transaction.processed_by,
+    Transaction.processed_at, Transaction.balance_before, Transaction.balance_after, Transaction.created_at,
+)
+
+# Users per query when rebuilding many snapshots
+BUILD_CHUNK = 1_000
+
+
+class WalletSnapshots:
+    KEY_PREFIX = "teer:wallet:"
+
+    def __init__(self, transactions: int, ttl_seconds: int):
+        self.transactions = transactions
+        self.ttl = ttl_seconds
+
+    def build(self, db: Session, user_ids: Iterable[int]) -> Dict[int, dict]:
+        """Snapshots for users straight from the database"""
+        user_ids = sorted(set(user_ids))
+        snapshots = {}
+        for start in range(0, len(user_ids), BUILD_CHUNK):
+            snapshots.update(self._build_chunk(db, user_ids[start:start + BUILD_CHUNK]))
+        return snapshots
+
+    def _build_chunk(self, db: Session, user_ids: List[int]) -> Dict[int, dict]:
+        snapshots = {
+            user_id: {
+                "user_id": user_id, "username": username, "is_active": is_active,
+                "balance": float(balance or 0), "ledger_seq": ledger_seq,
+                "pending_deposits": 0.0, "pending_withdrawals": 0.0, "recent_transactions": [],
+            }
+            for user_id, username, is_active, balance, ledger_seq in db.execute(
+                select(User.id, User.username, User.is_active, User.wallet_balance, User.ledger_seq)
+                .where(User.id.in_(user_ids))
+            )
+        }
+
+        pending = db.execute(
+            select(Transaction.user_id, Transaction.transaction_type, func.sum(Transaction.amount))
+            .where(Transaction.user_id.in_(user_ids), Transaction.status == TransactionStatus.PENDING)
+            .group_by(Transaction.user_id, Transaction.transaction_type)
+        )
+        for user_id, transaction_type, amount in pending:
+            if transaction_type == TransactionType.DEPOSIT:
+                snapshots[user_id]["pending_deposits"] = float(amount)
+            elif transaction_type == TransactionType.WITHDRAWAL:
+                snapshots[user_id]["pending_withdrawals"] = float(amount)
+
+        # Latest N per user in one query
+        ranked = select(
+            *TRANSACTION_COLUMNS,
+            func.row_number().over(
+                partition_by=Transaction.user_id, order_by=(Transaction.created_at.desc(), Transaction.id.desc())
+            ).label("position"),
+        ).where(Transaction.user_id.in_(user_ids)).subquery()
+        recent = db.execute(
+            select(*(ranked.c[column.key] for column in TRANSACTION_COLUMNS))
+            .where(ranked.c.position <= self.transactions)
+            .order_by(ranked.c.user_id, ranked.c.created_at.desc(), ranked.c.id.desc())
+        )
+        for row in recent:
+            snapshots[row.user_id]["recent_transactions"].append(dict(row._mapping))
+
+        for snapshot in snapshots.values():
+            snapshot["version"] = hashlib.blake2b(orjson.dumps(snapshot, option=ORJSON_OPTIONS), digest_size=12).hexdigest()
+        return snapshots
+
+    def get(self, db: Session, user_id: int) -> Optional[dict]:
+        """A user's snapshot, from Redis when possible; None for unknown users"""
+        client = get_redis()
+        if client is not None:
+            try:
+                cached = client.get(self.KEY_PREFIX + str(user_id))
+                if cached is not None:
+                    CACHE_REQUESTS.labels("wallet_snapshot", "hit").inc()
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning(f"Wallet snapshot unavailable from Redis: {e}")
+                client = None
+        CACHE_REQUESTS.labels("wallet_snapshot", "miss").inc()
+
+        snapshot = self.build(db, [user_id]).get(user_id)
+        if snapshot is not None and client is not None:
+            try:
+                client.set(self.KEY_PREFIX + str(user_id), orjson.dumps(snapshot, option=ORJSON_OPTIONS),
+                           ex=self.ttl, nx=True)
+            except Exception as e:
+                logger.warning(f"Could not cache wallet snapshot for user {user_id}: {e}")
+        return snapshot
+
+    def committed(self, db: Session, user_ids: Iterable[int]) -> None:
+        """Write-through after a wallet mutation commits: rebuild, store and announce the new snapshots"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        try:
+            snapshots = self.build(db, user_ids)
+            client = get_redis()
+            if client is not None and snapshots:
+                pipe = client.pipeline(transaction=False)
+                for user_id, snapshot in snapshots.items():
+                    pipe.set(self.KEY_PREFIX + str(user_id), orjson.dumps(snapshot, option=ORJSON_OPTIONS), ex=self.ttl)
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"Could not refresh wallet snapshots: {e}")
+            db.rollback()
+            self.invalidate(user_ids)
+            return
+        for user_id, snapshot in snapshots.items():
+            event_bus.publish(WALLET_CHANGED, user_id=user_id, balance=snapshot["balance"])
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Drop cached snapshots so the next read rebuilds them"""
+        user_ids = list(user_ids)
+        client = get_redis()
+        if client is None or not user_ids:
+            return
+        try:
+            client.delete(*(self.KEY_PREFIX + str(user_id) for user_id in user_ids))
+        except Exception as e:
+            logger.error(f"Could not drop wallet snapshots: {e}")
+
+
+# Global wallet snapshot cache
+wallet_snapshots = WalletSnapshots(settings.WALLET_SNAPSHOT_TRANSACTIONS, settings.WALLET_SNAPSHOT_TTL)
@@ -1,11 +1,18 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_
 from typing import List, Optional, Tuple
 from datetime import datetime
 
-from app.models import User, Transaction, PaymentMethod
+from app.models import User, Transaction, PaymentMethod, Bet
 from app.models.transaction import TransactionType, TransactionStatus
+from app.models.ledger import LedgerEntryType
+from app.models.upload import TRANSACTION_OWNER
+from app.services.ledger_service import LedgerService, Posting
+from app.utils.keyset_cursor import decode_keyset_cursor, encode_keyset_cursor
 from app.schemas.wallet import TransactionResponse, WalletResponse, TransactionUpdate
 from app.schemas.payment import DepositRequest, WithdrawalRequest
+from app.services.wallet_cache import wallet_snapshots
+from app.services.upload_store import upload_store
 
 class WalletService:
     def __init__(self, db: Session):
@@ -47,8 +54,11 @@ class WalletService:
             )
             
             self.db.add(transaction)
+            self.db.flush()
+            upload_store.link(self.db, TRANSACTION_OWNER, transaction.id, deposit_data.transaction_details)
             self.db.commit()
             self.db.refresh(transaction)
+            wallet_snapshots.committed(self.db, [user_id])
             
             return TransactionResponse.from_orm(transaction), "Deposit request submitted successfully"
             
@@ -97,6 +107,7 @@ class WalletService:
             self.db.add(transaction)
             self.db.commit()
             self.db.refresh(transaction)
+            wallet_snapshots.committed(self.db, [user_id])
             
             return TransactionResponse.from_orm(transaction), "Withdrawal request submitted successfully"
             
@@ -147,16 +158,20 @@ class WalletService:
                 return False, "User not found"
             
             # Update user balance
-            user.wallet_balance += transaction.amount
+            posting, = LedgerService(self.db).post(
+                Posting(user.id, transaction.amount, LedgerEntryType.DEPOSIT, f"transaction:{transaction.id}")
+            )
             
             # Update transaction
             transaction.status = TransactionStatus.APPROVED
             transaction.processed_by = admin_id
             transaction.processed_at = datetime.utcnow()
             transaction.admin_notes = admin_notes
-            transaction.balance_after = user.wallet_balance
+            transaction.balance_before = posting.balance_before
+            transaction.balance_after = posting.balance_after
             
             self.db.commit()
+            wallet_snapshots.committed(self.db, [user.id])
             return True, "Deposit approved successfully"
             
         except Exception as e:
@@ -184,16 +199,20 @@ class WalletService:
                 return False, "User has insufficient balance"
             
             # Update user balance
-            user.wallet_balance -= transaction.amount
+            posting, = LedgerService(self.db).post(
+                Posting(user.id, -transaction.amount, LedgerEntryType.WITHDRAWAL, f"transaction:{transaction.id}")
+            )
             
             # Update transaction
             transaction.status = TransactionStatus.APPROVED
             transaction.processed_by = admin_id
             transaction.processed_at = datetime.utcnow()
             transaction.admin_notes = admin_notes
-            transaction.balance_after = user.wallet_balance
+            transaction.balance_before = posting.balance_before
+            transaction.balance_after = posting.balance_after
             
             self.db.commit()
+            wallet_snapshots.committed(self.db, [user.id])
             return True, "Withdrawal approved successfully"
             
         except Exception as e:
@@ -217,21 +236,122 @@ class WalletService:
             transaction.admin_notes = admin_notes
             
             self.db.commit()
+            wallet_snapshots.committed(self.db, [transaction.user_id])
             return True, "Transaction rejected successfully"
             
         except Exception as e:
             self.db.rollback()
             return False, f"Error rejecting transaction: {str(e)}"
     
-    def get_pending_transactions(self, transaction_type: Optional[TransactionType] = None) -> List[TransactionResponse]:
-        """Get all pending transactions for admin review"""
+    def process_transactions_batch(
+        self, transaction_ids: List[int], approve: bool, admin_id: int, admin_notes: Optional[str] = None
+    ) -> Tuple[List[dict], str]:
+        """Approve or reject many pending deposits/withdrawals in one transaction, with per-item outcomes"""
+        try:
+            transaction_ids = list(dict.fromkeys(transaction_ids))
+            transactions = self.db.query(Transaction).filter(
+                Transaction.id.in_(transaction_ids),
+                Transaction.status == TransactionStatus.PENDING,
+                Transaction.transaction_type.in_([TransactionType.DEPOSIT, TransactionType.WITHDRAWAL])
+            ).order_by(Transaction.id).with_for_update().all()
+            outcomes = {
+                transaction_id: {"transaction_id": transaction_id, "success": False,
+                                 "message": "Transaction not found or already processed"}
+                for transaction_id in transaction_ids
+            }
+            processed_at = datetime.utcnow()
+            
+            def finish(transaction, status, message, posting=None):
+                transaction.status = status
+                transaction.processed_by = admin_id
+                transaction.processed_at = processed_at
+                transaction.admin_notes = admin_notes
+                outcome = {"transaction_id": transaction.id, "success": True, "status": status.value, "message": message}
+                if posting is not None:
+                    transaction.balance_before = posting.balance_before
+                    transaction.balance_after = posting.balance_after
+                    outcome["balance"] = posting.balance_after
+                outcomes[transaction.id] = outcome
+            
+            if not approve:
+                for transaction in transactions:
+                    finish(transaction, TransactionStatus.REJECTED, "Transaction rejected")
+                self.db.commit()
+                wallet_snapshots.committed(self.db, {transaction.user_id for transaction in transactions})
+                rejected = len(transactions)
+                return list(outcomes.values()), f"{rejected} of {len(transaction_ids)} transactions rejected"
+            
+            # Lock the wallets in id order, then check withdrawals against a running balance
+            user_ids = sorted({transaction.user_id for transaction in transactions})
+            balances = dict(self.db.query(User.id, User.wallet_balance).filter(
+                User.id.in_(user_ids)
+            ).order_by(User.id).with_for_update().all())
+            accepted = []
+            for transaction in transactions:
+                if transaction.user_id not in balances:
+                    outcomes[transaction.id]["message"] = "User not found"
+                    continue
+                amount = transaction.amount if transaction.transaction_type == TransactionType.DEPOSIT else -transaction.amount
+                if (balances[transaction.user_id] or 0) + amount < 0:
+                    outcomes[transaction.id]["message"] = "User has insufficient balance"
+                    continue
+                balances[transaction.user_id] = (balances[transaction.user_id] or 0) + amount
+                accepted.append((transaction, amount))
+            
+            # All balance changes in one ledger batch
+            postings = LedgerService(self.db).post(*(
+                Posting(
+                    transaction.user_id, amount,
+                    LedgerEntryType.DEPOSIT if amount > 0 else LedgerEntryType.WITHDRAWAL,
+                    f"transaction:{transaction.id}"
+                )
+                for transaction, amount in accepted
+            ))
+            new_balances = {}
+            for (transaction, _), posting in zip(accepted, postings):
+                label = "Deposit" if transaction.transaction_type == TransactionType.DEPOSIT else "Withdrawal"
+                finish(transaction, TransactionStatus.APPROVED, f"{label} approved", posting)
+                new_balances[posting.user_id] = posting.balance_after
+            
+            self.db.commit()
+            wallet_snapshots.committed(self.db, new_balances)
+            return list(outcomes.values()), f"{len(accepted)} of {len(transaction_ids)} transactions approved"
+            
+        except Exception as e:
+            self.db.rollback()
+            return [], f"Error processing transactions: {str(e)}"
+    
+    def get_pending_transactions_page(
+        self,
+        transaction_type: Optional[TransactionType] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[TransactionResponse], Optional[str]]:
+        """One page of pending transactions, oldest first, plus the next cursor"""
         query = self.db.query(Transaction).filter(Transaction.status == TransactionStatus.PENDING)
-        
         if transaction_type:
             query = query.filter(Transaction.transaction_type == transaction_type)
+        if cursor:
+            created_at, transaction_id = decode_keyset_cursor(cursor)
+            query = query.filter(tuple_(Transaction.created_at, Transaction.id) > tuple_(created_at, transaction_id))
         
-        transactions = query.order_by(Transaction.created_at.asc()).all()
-        return [TransactionResponse.from_orm(t) for t in transactions]
+        # Fetch one extra row to learn whether another page follows
+        transactions = query.order_by(Transaction.created_at, Transaction.id).limit(limit + 1).all()
+        has_more = len(transactions) > limit
+        transactions = transactions[:limit]
+        next_cursor = encode_keyset_cursor(transactions[-1].created_at, transactions[-1].id) if has_more else None
+        return [TransactionResponse.from_orm(t) for t in transactions], next_cursor
+    
+    def count_pending_transactions(self) -> dict:
+        """Pending transaction counts and amounts by type"""
+        rows = self.db.query(
+            Transaction.transaction_type, func.count(Transaction.id), func.coalesce(func.sum(Transaction.amount), 0)
+        ).filter(Transaction.status == TransactionStatus.PENDING).group_by(Transaction.transaction_type).all()
+        by_type = {
+            transaction_type.value: {"count": count, "amount": float(amount)}
+            for transaction_type, count, amount in rows
+        }
+        return {"total": sum(item["count"] for item in by_type.values()), "by_type": by_type}
     
     def add_balance(self, user_id: int, amount: float, description: str) -> Tuple[bool, str]:
         """Add balance to user's wallet (for refunds, bonuses, etc.)"""
@@ -240,11 +360,8 @@ class WalletService:
             if not user:
                 return False, "User not found"
             
-            # Store balance before
-            balance_before = user.wallet_balance
-            
             # Add balance
-            user.wallet_balance += amount
+            posting, = LedgerService(self.db).post(Posting(user_id, amount, LedgerEntryType.ADJUSTMENT))
             
             # Create transaction record
             transaction = Transaction(
@@ -253,15 +370,34 @@ class WalletService:
                 amount=amount,
                 status=TransactionStatus.APPROVED,
                 description=description,
-                balance_before=balance_before,
-                balance_after=user.wallet_balance,
+                balance_before=posting.balance_before,
+                balance_after=posting.balance_after,
                 processed_at=datetime.utcnow()
             )
             
             self.db.add(transaction)
             self.db.commit()
+            wallet_snapshots.committed(self.db, [user_id])
             return True, "Balance added successfully"
             
         except Exception as e:
             self.db.rollback()
-            return False, f"Error adding balance: {str(e)}"
\ No newline at end of file
+            return False, f"Error adding balance: {str(e)}"
+    
+    def refund_bets(self, bets: List[Bet], description: str) -> List[Posting]:
+        """Refund cancelled bets to their wallets in one ledger batch (the caller commits)"""
+        postings = LedgerService(self.db).post(*(
+            Posting(bet.user_id, bet.bet_amount, LedgerEntryType.BET_REFUND, f"bet:{bet.id}") for bet in bets
+        ))
+        for posting in postings:
+            self.db.add(Transaction(
+                user_id=posting.user_id,
+                transaction_type=TransactionType.BET_REFUND,
+                amount=posting.amount,
+                status=TransactionStatus.COMPLETED,
+                description=description,
+                balance_before=posting.balance_before,
+                balance_after=posting.balance_after,
+                processed_at=datetime.utcnow()
+            ))
+        return postings
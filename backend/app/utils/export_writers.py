@@ -0,0 +1,104 @@
+"""
+Generator-based export encoders
+
+Each writer takes an iterator of row tuples and yields encoded chunks of
+roughly CHUNK_SIZE bytes, so an export of any length holds one chunk (CSV)
+or one row group (Parquet) in memory at a time.
+"""
+
+import csv
+import enum
+import io
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence, Tuple
+
+CHUNK_SIZE = 64 * 1024
+PARQUET_ROW_GROUP = 50_000
+
+# (name, kind) where kind is one of int, float, str, datetime
+ExportColumn = Tuple[str, str]
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def csv_chunks(columns: Sequence[ExportColumn], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """UTF-8 CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else _plain(value) for value in row
+        ])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are taken after every row group"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def parquet_chunks(columns: Sequence[ExportColumn], rows: Iterable[tuple],
+                   compression: str = "snappy") -> Iterator[bytes]:
+    """Parquet written one row group at a time (needs pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "datetime": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    drain = _Drain()
+    writer = pq.ParquetWriter(drain, schema, compression=compression)
+
+    def flush(batch):
+        writer.write_table(pa.Table.from_pylist(
+            [dict(zip(schema.names, map(_plain, row))) for row in batch], schema=schema
+        ))
+        return drain.take()
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= PARQUET_ROW_GROUP:
+            yield flush(batch)
+            batch = []
+    if batch:
+        yield flush(batch)
+    writer.close()
+    yield drain.take()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,27 @@
+"""
+Fast JSON path for hot list endpoints
+
+Routes that already hold plain rows (column-only queries, no ORM objects)
+return them through FastJSONResponse, which encodes straight to bytes with
+orjson and skips response_model validation. Output matches what the
+pydantic response models produce: enums by value, ISO 8601 datetimes with
+UTC as "Z".
+"""
+
+from typing import Any, Iterable, List
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import Row
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def rows_to_dicts(rows: Iterable[Row]) -> List[dict]:
+    """Plain dicts keyed by column label"""
+    return [dict(row._mapping) for row in rows]
@@ -0,0 +1,28 @@
+"""
+Opaque keyset cursors
+
+Paged lists and resumable exports walk rows in (created_at, key) order and
+hand back the position of the last row as a cursor. The next request filters
+on (created_at, key) > cursor, which stays an index range scan however deep
+the page, unlike OFFSET.
+"""
+
+import base64
+from datetime import datetime
+from typing import Callable, Tuple, TypeVar, Union
+
+Key = TypeVar("Key")
+
+
+def encode_keyset_cursor(created_at: datetime, key: Union[int, str]) -> str:
+    """Opaque (created_at, key) cursor for the row after which a walk resumes"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{key}".encode()).decode()
+
+
+def decode_keyset_cursor(cursor: str, key_type: Callable[[str], Key] = int) -> Tuple[datetime, Key]:
+    """Inverse of encode_keyset_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, key = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), key_type(key)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,175 @@
+"""
+Prometheus metrics
+
+Request latency/throughput per route template, DB queries per request,
+connection pool usage, betting and settlement counters, scheduler lag,
+cache hit ratios and event-loop lag. When PROMETHEUS_MULTIPROC_DIR is set
+(gunicorn.conf.py sets it), each worker writes its samples to files in that
+directory and /metrics aggregates every worker; otherwise /metrics reports
+this process only.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+                         buckets=LATENCY_BUCKETS)
+HTTP_DB_QUERIES = Histogram("http_request_db_queries", "Database queries per HTTP request", ["route"],
+                            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144))
+HTTP_DB_SECONDS = Histogram("http_request_db_seconds", "Database time per HTTP request", ["route"],
+                            buckets=LATENCY_BUCKETS)
+
+# Database pool
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out_connections", "Connections currently checked out",
+                            multiprocess_mode="livesum")
+DB_POOL_OPEN = Gauge("db_pool_open_connections", "Connections currently open", multiprocess_mode="livesum")
+
+# Betting
+TICKETS_PLACED = Counter("bet_tickets_placed_total", "Bet tickets placed", ["house", "round_type"])
+BETS_SETTLED = Counter("bets_settled_total", "Bets settled", ["kind", "outcome"])
+SETTLEMENT_DURATION = Histogram("settlement_duration_seconds", "Time to settle one result", ["kind"],
+                                buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+# Background work
+SCHEDULER_LAG = Histogram("scheduler_lag_seconds", "Delay between a job's due time and its execution", ["job"],
+                          buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+EVENT_LOOP_LAG = Histogram("event_loop_lag_seconds", "Event loop scheduling delay",
+                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+
+# Caches
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+
+# [query count, query seconds] of the request being served
+_request_db: ContextVar[Optional[List]] = ContextVar("request_db", default=None)
+
+# Called with (statement, seconds) after every statement, e.g. by the query profiler
+StatementObserver = Callable[[str, float], None]
+_statement_observers: List[StatementObserver] = []
+_timing_installed = False
+_timing_lock = threading.Lock()
+
+
+def begin_request_db_tracking():
+    """Start counting DB queries for the current request; returns a reset token"""
+    stats = [0, 0.0]
+    return stats, _request_db.set(stats)
+
+
+def end_request(method: str, route: str, status: int, seconds: float, db_stats: List, token):
+    """Record one finished HTTP request"""
+    _request_db.reset(token)
+    HTTP_REQUESTS.labels(method, route, str(status)).inc()
+    HTTP_LATENCY.labels(method, route).observe(seconds)
+    HTTP_DB_QUERIES.labels(route).observe(db_stats[0])
+    HTTP_DB_SECONDS.labels(route).observe(db_stats[1])
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return  # Timing was installed while this statement ran
+    seconds = time.perf_counter() - started.pop()
+    stats = _request_db.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+    for observer in _statement_observers:
+        observer(statement, seconds)
+
+
+def install_statement_timing():
+    """Time every statement on every engine, once per process (idempotent)"""
+    global _timing_installed
+    with _timing_lock:
+        if not _timing_installed:
+            event.listen(Engine, "before_cursor_execute", _before_execute)
+            event.listen(Engine, "after_cursor_execute", _after_execute)
+            _timing_installed = True
+
+
+def observe_statements(observer: StatementObserver):
+    """Also hand every timed statement to observer"""
+    install_statement_timing()
+    with _timing_lock:
+        if observer not in _statement_observers:
+            _statement_observers.append(observer)
+
+
+def instrument_engine(engine: Engine):
+    """Count statements per request and track pool usage"""
+    install_statement_timing()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_OPEN.inc()
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, connection_record):
+        DB_POOL_OPEN.dec()
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition payload and content type for /metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class EventLoopLagMonitor:
+    """Samples how late a short sleep wakes up on this worker's event loop"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - self.interval))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Global event loop monitor
+event_loop_monitor = EventLoopLagMonitor()
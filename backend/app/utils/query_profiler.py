@@ -0,0 +1,191 @@
+"""
+SQL query profiler and N+1 detector
+
+Opt-in (QUERY_PROFILING=true). The statement timing that app.utils.metrics
+already installs hands over every statement run while serving a request. Each statement is fingerprinted with literals and
+parameter lists collapsed, and a SELECT fingerprint repeated
+QUERY_PROFILING_REPEAT_THRESHOLD or more times in one request is flagged as
+an N+1 loop. Results surface in three places:
+  - X-DB-* response headers in debug mode
+  - a sampled log line in production (always logged when an N+1 is found)
+  - per-route aggregates behind the admin query-profile endpoint (per worker)
+
+Tests can use assert_query_budget() without enabling the middleware.
+"""
+
+import logging
+import random
+import re
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.metrics import observe_statements
+
+logger = logging.getLogger(__name__)
+
+_PARAM_LIST = re.compile(r"\(\s*(?:%\([^)]+\)s|\?|:\w+|\$\d+)(?:\s*,\s*(?:%\([^)]+\)s|\?|:\w+|\$\d+))*\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals and IN-lists collapsed"""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class QueryProfile:
+    """Statements executed while serving one request (or one test block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = None) -> Dict[str, int]:
+        """SELECT fingerprints run at least `threshold` times (likely N+1 loops)"""
+        threshold = threshold or settings.QUERY_PROFILING_REPEAT_THRESHOLD
+        return {
+            statement: count for statement, count in self.fingerprints.most_common()
+            if count >= threshold and statement.upper().startswith("SELECT")
+        }
+
+    def summary(self, limit: int = 5) -> str:
+        return "; ".join(f"{count}x {statement[:160]}" for statement, count in self.fingerprints.most_common(limit))
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+# Profiles that see every statement on any thread (test budgets)
+_global_profiles: List[QueryProfile] = []
+
+
+def install_query_listeners():
+    """Receive timed statements from the metrics hook (idempotent)"""
+    observe_statements(_record_statement)
+
+
+def _record_statement(statement: str, seconds: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+    for profile in _global_profiles:
+        profile.record(statement, seconds)
+
+
+class RouteQueryStats:
+    """Per-route aggregates of request profiles (this worker only)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, dict] = defaultdict(lambda: {
+            "requests": 0, "queries": 0, "max_queries": 0, "db_seconds": 0.0,
+            "n_plus_one_requests": 0, "repeated": Counter(),
+        })
+
+    def add(self, route: str, profile: QueryProfile, repeated: Dict[str, int]):
+        with self._lock:
+            stats = self._routes[route]
+            stats["requests"] += 1
+            stats["queries"] += profile.count
+            stats["max_queries"] = max(stats["max_queries"], profile.count)
+            stats["db_seconds"] += profile.seconds
+            if repeated:
+                stats["n_plus_one_requests"] += 1
+                stats["repeated"].update(repeated)
+
+    def worst(self, limit: int = 20) -> List[dict]:
+        """Routes ordered by average queries per request"""
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "requests": stats["requests"],
+                    "avg_queries": round(stats["queries"] / stats["requests"], 2),
+                    "max_queries": stats["max_queries"],
+                    "avg_db_ms": round(stats["db_seconds"] / stats["requests"] * 1000, 2),
+                    "n_plus_one_requests": stats["n_plus_one_requests"],
+                    "top_repeated": [
+                        {"statement": statement, "executions": count}
+                        for statement, count in stats["repeated"].most_common(3)
+                    ],
+                }
+                for route, stats in self._routes.items()
+            ]
+        rows.sort(key=lambda row: row["avg_queries"], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# Process-wide route statistics
+route_query_stats = RouteQueryStats()
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        install_query_listeners()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from app.middleware.request_context import route_template
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(profile.count)
+                headers["X-DB-Query-Time"] = f"{profile.seconds * 1000:.1f}ms"
+                headers["X-DB-N-Plus-One"] = str(len(profile.repeated()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _current_profile.reset(token)
+            route = f"{scope['method']} {route_template(scope)}"
+            repeated = profile.repeated()
+            route_query_stats.add(route, profile, repeated)
+            if repeated:
+                logger.warning(
+                    f"N+1 suspected on {route}: {profile.count} queries in {profile.seconds * 1000:.1f}ms; "
+                    + "; ".join(f"{count}x {statement[:160]}" for statement, count in repeated.items())
+                )
+            elif random.random() < settings.QUERY_PROFILING_SAMPLE_RATE:
+                logger.info(f"Query profile {route}: {profile.count} queries in {profile.seconds * 1000:.1f}ms; {profile.summary()}")
+
+
+@contextmanager
+def assert_query_budget(max_queries: int):
+    """Fail if the block runs more than `max_queries` statements, on any thread"""
+    install_query_listeners()
+    profile = QueryProfile()
+    _global_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        _global_profiles.remove(profile)
+    if profile.count > max_queries:
+        raise AssertionError(f"{profile.count} queries exceeds budget of {max_queries}: {profile.summary()}")
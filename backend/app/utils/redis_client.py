@@ -0,0 +1,71 @@
+"""
+Shared Redis connections
+
+Redis is optional: when REDIS_URL is not configured these helpers return
+None and callers fall back to in-process state.
+"""
+
+import logging
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_sync_client: Optional[redis.Redis] = None
+_fast_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+# Seconds a blocking call on the request path may wait for Redis
+REQUEST_PATH_TIMEOUT = 0.25
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Process-wide blocking Redis client, or None when Redis is not configured"""
+    global _sync_client
+    if not settings.REDIS_URL:
+        return None
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2, health_check_interval=30
+        )
+    return _sync_client
+
+
+def get_request_redis() -> Optional[redis.Redis]:
+    """Blocking client with a short timeout, for calls made while a request waits"""
+    global _fast_client
+    if not settings.REDIS_URL:
+        return None
+    if _fast_client is None:
+        _fast_client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=REQUEST_PATH_TIMEOUT, socket_connect_timeout=REQUEST_PATH_TIMEOUT
+        )
+    return _fast_client
+
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """Process-wide asyncio Redis client, or None when Redis is not configured"""
+    global _async_client
+    if not settings.REDIS_URL:
+        return None
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(
+            settings.REDIS_URL, socket_connect_timeout=2, health_check_interval=30
+        )
+    return _async_client
+
+
+async def close_redis():
+    """Close the shared clients (application shutdown)"""
+    global _sync_client, _fast_client, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    for client in (_sync_client, _fast_client):
+        if client is not None:
+            client.close()
+    _sync_client = _fast_client = None
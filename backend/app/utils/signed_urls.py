@@ -0,0 +1,33 @@
+"""
+Signed, expiring URLs
+
+A signed URL is a path plus an expiry timestamp and an HMAC-SHA256 of the two
+under SECRET_KEY. Expiries are rounded up to the next TTL boundary, so every
+link to a file issued within the same window is identical; browsers can
+cache it, and it stays valid for between one and two TTLs.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+from app.config import settings
+
+
+def _signature(path: str, expires: int) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{path}\n{expires}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_url(path: str, ttl_seconds: Optional[int] = None) -> str:
+    """path with expires and signature query parameters appended"""
+    ttl = ttl_seconds or settings.SIGNED_URL_TTL
+    expires = (int(time.time()) // ttl + 2) * ttl
+    return f"{path}?expires={expires}&signature={_signature(path, expires)}"
+
+
+def verify_signature(path: str, expires: int, signature: str) -> bool:
+    """True if signature matches path and expires, and expires hasn't passed"""
+    return expires >= time.time() and hmac.compare_digest(_signature(path, expires), signature)
@@ -0,0 +1,77 @@
+"""
+Startup-time profile
+
+create_app records how long each phase of building the application takes,
+logs the breakdown and keeps it on app.state.startup_profile. Running
+
+    python -m app.utils.startup_profile
+
+imports the app in a fresh interpreter with -X importtime and prints the
+slowest imports alongside the phases, which is where cold-start regressions
+show up first.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Wall-clock durations of named startup phases"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases)
+
+    def log(self, what: str):
+        logger.info(f"{what} in {self.total * 1000:.0f}ms ({self.summary()})")
+
+
+def slowest_imports(module: str = "app.main", limit: int = 20) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) of the slowest imports of module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if own.isdigit():
+            imports.append((name, int(own), int(cumulative)))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main():
+    started = time.perf_counter()
+    from app.main import app
+    print(f"import app.main: {(time.perf_counter() - started) * 1000:.0f}ms")
+    print(f"create_app: {app.state.startup_profile.summary()}")
+    print("slowest imports (self ms / cumulative ms):")
+    for name, own, cumulative in slowest_imports():
+        print(f"  {own / 1000:8.1f} {cumulative / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
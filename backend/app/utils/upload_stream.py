@@ -0,0 +1,86 @@
+"""
+Streaming upload writes
+
+Uploads are copied to disk a chunk at a time, so a request never holds the
+whole file in memory. The size limit is checked as bytes arrive and the
+SHA-256 is computed on the way through. File operations run in worker
+threads, not on the event loop. Data goes to a temporary file next to the
+destination, which is renamed into place only once complete; readers never
+see a partial file, and an aborted upload leaves nothing behind.
+
+The content type recorded for an upload is sniffed from its first bytes with
+libmagic; the client's Content-Type header is never trusted.
+"""
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import magic
+from fastapi import UploadFile
+
+CHUNK_SIZE = 256 * 1024
+
+# Enough of the file for libmagic to identify every format we accept
+SNIFF_BYTES = 2048
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_size: int):
+        super().__init__(f"Upload exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def _commit(handle, temp_path: Path, destination: Path):
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+    os.replace(temp_path, destination)
+
+
+async def stream_to_disk(file: UploadFile, destination: Path, max_size: int) -> StoredUpload:
+    """Copy an upload to destination; raises UploadTooLarge as soon as it passes max_size"""
+    temp_path = destination.with_name(f".{destination.name}.{uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    handle = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(max_size)
+            digest.update(chunk)
+            await asyncio.to_thread(handle.write, chunk)
+        await asyncio.to_thread(_commit, handle, temp_path, destination)
+    except BaseException:
+        handle.close()
+        await asyncio.to_thread(temp_path.unlink, missing_ok=True)
+        raise
+    return StoredUpload(destination, size, digest.hexdigest())
+
+
+def digest_file(path: Path) -> StoredUpload:
+    """Size and SHA-256 of a file already on disk (after it was rewritten in place)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            size += len(chunk)
+            digest.update(chunk)
+    return StoredUpload(path, size, digest.hexdigest())
+
+
+def sniff_content_type(path: Path) -> str:
+    """MIME type of a file judged by its content"""
+    with open(path, "rb") as handle:
+        return magic.from_buffer(handle.read(SNIFF_BYTES), mime=True)
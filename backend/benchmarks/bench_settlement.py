@@ -0,0 +1,117 @@
+"""
+Settlement and aggregation micro-benchmarks
+
+Needs pytest-benchmark. Run from backend/:
+    python -m pytest benchmarks/bench_settlement.py --bench-size 1k
+    python -m pytest benchmarks/bench_settlement.py --bench-size 100k --benchmark-autosave
+    python -m pytest benchmarks/bench_settlement.py --bench-size 100k --benchmark-compare
+
+--benchmark-autosave stores results under .benchmarks/ and --benchmark-compare
+checks a run against the latest one (add --benchmark-compare-fail=mean:10%
+to fail on regressions).
+"""
+
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Bet
+from app.models.bet import BetType
+from app.schemas.bet import TicketCreate
+from app.services.bet_service import EnhancedBetService
+from benchmarks.dataset import discard_placed_tickets, reset_settlement
+
+FR_RESULT = 42
+SR_RESULT = 17
+
+
+def settle_setup(engine, dataset, session_factory, sessions):
+    """pedantic() setup: unsettle the draw and hand a fresh service to the timed call"""
+    def setup():
+        reset_settlement(engine, dataset)
+        session = session_factory()
+        sessions.append(session)
+        return (EnhancedBetService(session),), {}
+    return setup
+
+
+@pytest.fixture
+def sessions():
+    opened = []
+    yield opened
+    for session in opened:
+        session.close()
+
+
+def test_check_bet_winner(benchmark, dataset, session_factory):
+    session = session_factory()
+    bets = session.scalars(
+        select(Bet).where(Bet.round_id == dataset.fr_round_id, Bet.bet_type != BetType.FORECAST).limit(10_000)
+    ).all()
+    service = EnhancedBetService(session)
+
+    winners = benchmark(lambda: sum(service._check_bet_winner(bet, FR_RESULT) for bet in bets))
+    assert 0 < winners < len(bets)
+    session.close()
+
+
+def test_process_round_results(benchmark, engine, dataset, session_factory, sessions, rounds):
+    benchmark.pedantic(
+        lambda service: service.process_round_results(dataset.fr_round_id, FR_RESULT),
+        setup=settle_setup(engine, dataset, session_factory, sessions), rounds=rounds,
+    )
+
+
+def test_process_forecast_bets(benchmark, engine, dataset, session_factory, sessions, rounds):
+    result = benchmark.pedantic(
+        lambda service: service.process_forecast_bets(dataset.draw_house_id, f"{FR_RESULT:02d}", f"{SR_RESULT:02d}"),
+        setup=settle_setup(engine, dataset, session_factory, sessions), rounds=rounds,
+    )
+    assert result["house_id"] == dataset.draw_house_id
+
+
+def test_get_round_bet_statistics(benchmark, dataset, session_factory, sessions, rounds):
+    def setup():
+        session = session_factory()
+        sessions.append(session)
+        return (EnhancedBetService(session),), {}
+
+    stats = benchmark.pedantic(
+        lambda service: service.get_round_bet_statistics(dataset.fr_round_id), setup=setup, rounds=rounds,
+    )
+    assert stats["total_bets"] > 0
+
+
+def test_get_round_winner_statistics(benchmark, dataset, session_factory, sessions, rounds):
+    def setup():
+        session = session_factory()
+        sessions.append(session)
+        return (EnhancedBetService(session),), {}
+
+    stats = benchmark.pedantic(
+        lambda service: service.get_round_winner_statistics(dataset.fr_round_id, FR_RESULT), setup=setup, rounds=rounds,
+    )
+    assert stats["total_winners"] > 0
+
+
+def test_place_bet_ticket(benchmark, engine, dataset, session_factory):
+    session = session_factory()
+    service = EnhancedBetService(session)
+    rng = random.Random(7)
+
+    def place():
+        ticket = TicketCreate(
+            house_id=dataset.open_house_id,
+            fr_direct={f"{rng.randrange(100):02d}": 10},
+            sr_house={str(rng.randrange(10)): 10},
+            sr_ending={str(rng.randrange(10)): 10},
+        )
+        return service.place_bet_ticket(rng.choice(dataset.user_ids), ticket)
+
+    try:
+        response, message = benchmark(place)
+        assert response is not None, message
+    finally:
+        session.close()
+        discard_placed_tickets(engine, dataset)
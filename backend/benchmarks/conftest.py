@@ -0,0 +1,61 @@
+"""
+Fixtures for the settlement micro-benchmarks (pytest-benchmark)
+
+Datasets are generated once per size and kept under benchmarks/.data, so
+every run measures the same rows.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.dataset import DATASET_VERSION, generate_dataset, load_dataset
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-size", choices=SIZES, default="1k", help="bets in the benchmark dataset")
+    parser.addoption("--bench-database-url", help="dedicated database for the dataset, wiped between benchmarks (default: a cached SQLite file)")
+
+
+@pytest.fixture(scope="session")
+def bench_size(request) -> int:
+    return SIZES[request.config.getoption("--bench-size")]
+
+
+@pytest.fixture(scope="session")
+def engine(request, bench_size):
+    url = request.config.getoption("--bench-database-url")
+    if url is None:
+        DATA_DIR.mkdir(exist_ok=True)
+        size = request.config.getoption("--bench-size")
+        url = f"sqlite:///{DATA_DIR / f'bets-{size}-v{DATASET_VERSION}.db'}"
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def dataset(engine, bench_size):
+    from app.models import House
+
+    if inspect(engine).has_table("houses"):
+        with engine.connect() as conn:
+            if conn.execute(select(House.id).where(House.name == "Bench Draw")).first():
+                return load_dataset(engine, bench_size)
+    return generate_dataset(engine, bench_size)
+
+
+@pytest.fixture(scope="session")
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def rounds(bench_size) -> int:
+    """Timed repetitions for slow benchmarks, fewer as the dataset grows"""
+    return {1_000: 10, 100_000: 3}.get(bench_size, 1)
@@ -0,0 +1,199 @@
+"""
+Synthetic betting dataset for the settlement micro-benchmarks
+
+One settled-draw house whose FR and SR rounds hold every generated bet
+(40% FR, 40% SR, 20% forecast picks), plus one open house for ticket
+placement. Bets are grouped four to a ticket, and number popularity is
+Zipf-skewed like real play, so a few "lucky" numbers draw most of the
+money. Rows go in through datagen's bulk loader (COPY on Postgres), and a
+fixed seed makes every dataset of a given size identical between runs.
+
+Round times are relative to now, so a cached dataset is re-timed each time it
+is loaded: the open house stays open for betting however old the file is.
+The reset helpers delete rows wholesale, so they, like generation, refuse a
+database holding anything but benchmark users.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, time as dt_time
+from typing import Iterator, List
+
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import Bet, BetTicket, House, Round, Transaction, User
+from app.models.bet import BetStatus, BetType, UserBetStats
+from app.models.ledger import ADJUSTMENTS_ACCOUNT, WALLET_ACCOUNT, LedgerEntry, LedgerEntryType
+from app.models.round import RoundStatus, RoundType
+from datagen import BulkLoader, zipf_picker
+
+# Bump when the generated shape changes so cached databases are rebuilt
+DATASET_VERSION = 2
+BETS_PER_TICKET = 4
+OPENING_BALANCE = 10_000.0
+USERNAME_PREFIX = "bench"
+
+# Betting close of each round relative to now: the draw house's are past, the open house's ahead
+ROUND_CLOSES = {
+    ("Bench Draw", RoundType.FR): timedelta(hours=-2),
+    ("Bench Draw", RoundType.SR): timedelta(hours=-1),
+    ("Bench Open", RoundType.FR): timedelta(days=1),
+    ("Bench Open", RoundType.SR): timedelta(days=1, hours=1),
+}
+
+
+class NotABenchmarkDatabase(RuntimeError):
+    pass
+
+
+@dataclass
+class Dataset:
+    bets: int
+    draw_house_id: int
+    fr_round_id: int
+    sr_round_id: int
+    open_house_id: int
+    user_ids: List[int]
+
+
+def ensure_benchmark_database(conn):
+    """Raise unless every user in the database was generated here"""
+    if conn.execute(select(exists().where(~User.username.startswith(USERNAME_PREFIX)))).scalar():
+        raise NotABenchmarkDatabase(f"{conn.engine.url!r} holds users the benchmarks did not create; refusing to touch it")
+
+
+def round_times(closes_at: datetime) -> dict:
+    return {
+        "betting_closes_at": closes_at, "scheduled_time": closes_at + timedelta(minutes=15),
+        "local_date": closes_at.date(),
+    }
+
+
+def generate_dataset(engine: Engine, bets: int, seed: int = 42) -> Dataset:
+    """Create the schema and fill it with `bets` pending bets"""
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        ensure_benchmark_database(conn)
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    users = max(100, bets // 20)
+    direct = zipf_picker(rng, [f"{n:02d}" for n in range(100)])
+    digit = zipf_picker(rng, [str(n) for n in range(10)])
+
+    with engine.begin() as conn:
+        draw_house_id, open_house_id = (
+            conn.execute(insert(House).returning(House.id), {"name": name, "fr_time": dt_time(15, 30), "sr_time": dt_time(17, 0)}).scalar_one()
+            for name in ("Bench Draw", "Bench Open")
+        )
+
+        def add_round(house_id: int, house: str, round_type: RoundType) -> int:
+            return conn.execute(insert(Round).returning(Round.id), {
+                "house_id": house_id, "round_type": round_type, "status": RoundStatus.SCHEDULED,
+                **round_times(now + ROUND_CLOSES[house, round_type]),
+            }).scalar_one()
+
+        fr_round_id = add_round(draw_house_id, "Bench Draw", RoundType.FR)
+        sr_round_id = add_round(draw_house_id, "Bench Draw", RoundType.SR)
+        add_round(open_house_id, "Bench Open", RoundType.FR)
+        add_round(open_house_id, "Bench Open", RoundType.SR)
+
+        loader = BulkLoader(conn)
+        first_user_id = loader.next_id(User)
+        user_ids = list(range(first_user_id, first_user_id + users))
+        user_sink = loader.sink(User)
+        ledger_sink = loader.sink(LedgerEntry)
+        for i, user_id in enumerate(user_ids):
+            user_sink.add({
+                "id": user_id, "username": f"{USERNAME_PREFIX}{i}", "phone": f"9{i:09d}", "password_hash": "x",
+                "wallet_balance": OPENING_BALANCE, "ledger_seq": 1,
+            })
+            opening = {"journal_id": f"opening{user_id}", "entry_type": LedgerEntryType.OPENING_BALANCE, "reference": None}
+            ledger_sink.add({**opening, "account": WALLET_ACCOUNT, "user_id": user_id, "seq": 1, "amount": OPENING_BALANCE, "balance_after": OPENING_BALANCE})
+            ledger_sink.add({**opening, "account": ADJUSTMENTS_ACCOUNT, "user_id": None, "seq": None, "amount": -OPENING_BALANCE, "balance_after": None})
+
+        def bet_rows() -> Iterator[dict]:
+            for n in range(bets):
+                ticket = n // BETS_PER_TICKET
+                user_id = user_ids[ticket % len(user_ids)]
+                amount = float(rng.choice((10, 20, 50, 100)))
+                row = {
+                    "user_id": user_id, "ticket_id": f"B{ticket:08d}", "bet_amount": amount, "status": BetStatus.PENDING,
+                    "fr_round_id": None, "sr_round_id": None, "house_name": None,
+                }
+                roll = rng.random()
+                if roll < 0.8:
+                    round_type = rng.choice((BetType.DIRECT, BetType.HOUSE, BetType.ENDING))
+                    row.update(
+                        round_id=fr_round_id if roll < 0.4 else sr_round_id,
+                        bet_type=round_type,
+                        bet_value=direct() if round_type == BetType.DIRECT else digit(),
+                        potential_payout=amount * (70 if round_type == BetType.DIRECT else 7),
+                    )
+                else:
+                    row.update(
+                        round_id=fr_round_id, fr_round_id=fr_round_id, sr_round_id=sr_round_id,
+                        bet_type=BetType.FORECAST, bet_value=f"direct:{direct()}-{direct()}",
+                        potential_payout=amount * 4000, house_name="Bench Draw",
+                    )
+                yield row
+
+        bet_sink = loader.sink(Bet)
+        for row in bet_rows():
+            bet_sink.add(row)
+
+        ticket_sink = loader.sink(BetTicket)
+        for t in range((bets + BETS_PER_TICKET - 1) // BETS_PER_TICKET):
+            ticket_sink.add({
+                "ticket_id": f"B{t:08d}", "user_id": user_ids[t % len(user_ids)], "house_id": draw_house_id,
+                "total_amount": 0.0, "total_potential_payout": 0.0, "status": BetStatus.PENDING, "bets_summary": {},
+            })
+        loader.finish()
+
+    return Dataset(bets, draw_house_id, fr_round_id, sr_round_id, open_house_id, user_ids)
+
+
+def load_dataset(engine: Engine, bets: int) -> Dataset:
+    """Describe a dataset generated earlier into the same database, with its rounds re-timed to now"""
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        ensure_benchmark_database(conn)
+        houses = dict(conn.execute(select(House.name, House.id)).all())
+        for (house, round_type), closes in ROUND_CLOSES.items():
+            conn.execute(
+                update(Round).where(Round.house_id == houses[house], Round.round_type == round_type)
+                .values(**round_times(now + closes))
+            )
+        rounds = dict(conn.execute(
+            select(Round.round_type, Round.id).where(Round.house_id == houses["Bench Draw"])
+        ).all())
+        user_ids = list(conn.execute(select(User.id).order_by(User.id)).scalars())
+    return Dataset(bets, houses["Bench Draw"], rounds[RoundType.FR], rounds[RoundType.SR], houses["Bench Open"], user_ids)
+
+
+def reset_wallets(conn):
+    """Drop every ledger entry after the opening balances and restore the wallets"""
+    ensure_benchmark_database(conn)
+    conn.execute(delete(LedgerEntry).where(LedgerEntry.entry_type != LedgerEntryType.OPENING_BALANCE))
+    conn.execute(update(User).values(wallet_balance=OPENING_BALANCE, ledger_seq=1))
+
+
+def reset_settlement(engine: Engine, dataset: Dataset):
+    """Put the draw back to unsettled so a settlement benchmark can repeat"""
+    with engine.begin() as conn:
+        reset_wallets(conn)
+        conn.execute(update(Bet).values(status=BetStatus.PENDING, actual_payout=0.0))
+        conn.execute(update(BetTicket).values(status=BetStatus.PENDING))
+        conn.execute(update(Round).where(Round.id.in_((dataset.fr_round_id, dataset.sr_round_id))).values(result=None))
+        conn.execute(delete(Transaction))
+        conn.execute(delete(UserBetStats))
+
+
+def discard_placed_tickets(engine: Engine, dataset: Dataset):
+    """Remove tickets placed on the open house by the placement benchmark"""
+    with engine.begin() as conn:
+        ticket_ids = select(BetTicket.ticket_id).where(BetTicket.house_id == dataset.open_house_id)
+        conn.execute(delete(Bet).where(Bet.ticket_id.in_(ticket_ids)))
+        conn.execute(delete(BetTicket).where(BetTicket.house_id == dataset.open_house_id))
+        reset_wallets(conn)
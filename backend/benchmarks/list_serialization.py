@@ -0,0 +1,119 @@
+"""
+List endpoint serialization: ORM + response_model vs column rows + orjson
+
+The legacy path loads Round objects, reads round.house.name (one lazy load per
+house), builds a RoundResponse for each row, then validates and encodes the
+list again the way FastAPI does for a response_model. The fast path selects
+only the response columns with the house name joined in and encodes the rows
+with orjson. Both run on an in-memory SQLite database, and their JSON output is
+compared before timing.
+
+Usage:
+    python benchmarks/list_serialization.py --rows 2000 --repeat 20
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import House, Round  # noqa: E402
+from app.models.round import RoundStatus, RoundType  # noqa: E402
+from app.schemas.round import RoundResponse  # noqa: E402
+from app.services.round_service import RoundService  # noqa: E402
+from app.utils.fast_json import FastJSONResponse  # noqa: E402
+
+HOUSES = 20
+
+
+def seed(db, rows: int):
+    houses = [House(name=f"House {i}", fr_time=dtime(15, 30), sr_time=dtime(17, 0)) for i in range(HOUSES)]
+    db.add_all(houses)
+    db.flush()
+    start = datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+    db.add_all([
+        Round(
+            house_id=houses[i % HOUSES].id, round_type=RoundType.FR if i % 2 else RoundType.SR,
+            status=RoundStatus.COMPLETED, result=i % 100,
+            scheduled_time=start + timedelta(minutes=i), betting_closes_at=start + timedelta(minutes=i - 15),
+            actual_time=start + timedelta(minutes=i + 1), created_at=start,
+        )
+        for i in range(rows)
+    ])
+    db.commit()
+
+
+def legacy_path(db, limit: int, adapter: TypeAdapter) -> bytes:
+    rounds = db.query(Round).join(House).filter(
+        Round.status == RoundStatus.COMPLETED, Round.result.isnot(None)
+    ).order_by(Round.actual_time.desc()).limit(limit).all()
+    responses = [RoundResponse(
+        id=r.id, house_id=r.house_id, house_name=r.house.name, round_type=r.round_type, status=r.status,
+        scheduled_time=r.scheduled_time, betting_closes_at=r.betting_closes_at, actual_time=r.actual_time,
+        result=r.result, created_at=r.created_at,
+    ) for r in rounds]
+    # What FastAPI does with a response_model: validate, dump to JSON-able data, json.dumps
+    content = adapter.dump_python(adapter.validate_python(responses), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(db, limit: int) -> bytes:
+    return FastJSONResponse(RoundService(db).get_results_rows(None, limit)).body
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        seed(db, args.rows)
+
+    adapter = TypeAdapter(List[RoundResponse])
+
+    def run_legacy():
+        # Fresh session per request, as in production
+        with Session() as db:
+            return legacy_path(db, args.rows, adapter)
+
+    def run_fast():
+        with Session() as db:
+            return fast_path(db, args.rows)
+
+    if json.loads(run_legacy()) != json.loads(run_fast()):
+        print("FAIL: fast path output differs from the response_model path")
+        sys.exit(1)
+
+    legacy = measure(run_legacy, args.repeat)
+    fast = measure(run_fast, args.repeat)
+    print(f"rows:                 {args.rows}")
+    print(f"legacy (ORM+model):   {legacy * 1000:8.2f} ms  {legacy / args.rows * 1e6:6.2f} us/row")
+    print(f"fast (columns+orjson):{fast * 1000:8.2f} ms  {fast / args.rows * 1e6:6.2f} us/row")
+    print(f"speedup:              {legacy / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
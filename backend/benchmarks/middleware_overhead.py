@@ -0,0 +1,107 @@
+"""
+Per-request middleware overhead: BaseHTTPMiddleware vs raw ASGI
+
+Drives a trivial FastAPI route in-process, with no network, through:
+  - no middleware (baseline)
+  - the previous TimingMiddleware + RequestIDMiddleware (BaseHTTPMiddleware)
+  - RequestContextMiddleware (raw ASGI, also records Prometheus request metrics)
+and reports the mean time per request and the overhead over the baseline.
+
+Usage:
+    python benchmarks/middleware_overhead.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.request_context import RequestContextMiddleware  # noqa: E402
+
+
+# The middlewares previously defined in app/main.py, kept here for comparison
+class TimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Response-Time"] = str(process_time)
+        return response
+
+
+class RequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        import uuid
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{item_id}")
+    async def ping(item_id: int):
+        return {"item_id": item_id}
+
+    if variant == "legacy":
+        app.add_middleware(TimingMiddleware)
+        app.add_middleware(RequestIDMiddleware)
+    elif variant == "asgi":
+        app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping/7", "raw_path": b"/ping/7", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    never = asyncio.Event()
+
+    def make_receive():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await never.wait()  # the client never disconnects
+
+        return receive
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(scope), make_receive(), send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {variant: asyncio.run(drive(build_app(variant), args.requests)) for variant in ("none", "legacy", "asgi")}
+    baseline = results["none"]
+    for variant, label in (("none", "no middleware"), ("legacy", "BaseHTTPMiddleware x2"), ("asgi", "RequestContextMiddleware")):
+        print(f"{label:26s} {results[variant] * 1e6:8.1f} us/request  overhead {(results[variant] - baseline) * 1e6:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
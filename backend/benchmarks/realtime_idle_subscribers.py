@@ -0,0 +1,105 @@
+"""
+Realtime push load test: idle subscribers per worker
+
+In-process mode (default) attaches N idle subscribers to the broadcaster,
+measures the Python heap they hold with tracemalloc, and then floods them
+with more messages than a queue can hold. This shows that memory per
+subscriber stays bounded, and it measures how long one broadcast takes to
+reach everyone.
+
+Socket mode (--url) opens N real WebSocket connections against a running
+worker, e.g. ws://localhost:8000/api/v1/realtime/ws, and holds them open.
+Watch the worker's RSS while it runs (raise `ulimit -n` first).
+
+Usage:
+    python benchmarks/realtime_idle_subscribers.py --subscribers 10000
+    python benchmarks/realtime_idle_subscribers.py --url ws://localhost:8000/api/v1/realtime/ws --subscribers 10000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.realtime import RealtimeBroadcaster, PUBLIC_CHANNEL, user_channel  # noqa: E402
+
+
+async def run_in_process(subscriber_count: int, flood: int, max_bytes_per_subscriber: int) -> int:
+    broadcaster = RealtimeBroadcaster()
+    await broadcaster.start()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    subscribers = [
+        broadcaster.subscribe([PUBLIC_CHANNEL, user_channel(i)]) for i in range(subscriber_count)
+    ]
+    idle, _ = tracemalloc.get_traced_memory()
+    idle_per_subscriber = (idle - baseline) / subscriber_count
+
+    # One broadcast reaching every subscriber
+    started = time.perf_counter()
+    broadcaster.publish(PUBLIC_CHANNEL, "result.published", {"round_id": 1, "result": 42})
+    while not all(sub.queue.qsize() for sub in subscribers):
+        await asyncio.sleep(0)
+    fanout_ms = (time.perf_counter() - started) * 1000
+
+    # Nobody reads: queues must cap out instead of growing
+    for i in range(flood):
+        broadcaster.publish(PUBLIC_CHANNEL, "rounds.changed", {"seq": i})
+    await asyncio.sleep(0.1)
+    flooded, peak = tracemalloc.get_traced_memory()
+    flooded_per_subscriber = (flooded - baseline) / subscriber_count
+    tracemalloc.stop()
+
+    await broadcaster.stop()
+
+    print(f"subscribers:                 {subscriber_count}")
+    print(f"idle heap / subscriber:      {idle_per_subscriber:,.0f} B")
+    print(f"flooded heap / subscriber:   {flooded_per_subscriber:,.0f} B  (after {flood} messages, queue cap {broadcaster.max_queue})")
+    print(f"total heap (flooded / peak): {flooded / 1e6:,.1f} MB / {peak / 1e6:,.1f} MB")
+    print(f"broadcast fan-out:           {fanout_ms:,.1f} ms")
+    print(f"dropped per subscriber:      {subscribers[0].dropped}")
+
+    if flooded_per_subscriber > max_bytes_per_subscriber:
+        print(f"FAIL: exceeds budget of {max_bytes_per_subscriber} B per subscriber")
+        return 1
+    print("OK")
+    return 0
+
+
+async def run_sockets(url: str, subscriber_count: int, hold_seconds: int) -> int:
+    import websockets
+
+    connections = []
+    started = time.perf_counter()
+    for _ in range(subscriber_count):
+        connections.append(await websockets.connect(url, ping_interval=None, max_queue=4))
+    print(f"opened {len(connections)} connections in {time.perf_counter() - started:,.1f}s; holding {hold_seconds}s")
+
+    await asyncio.sleep(hold_seconds)
+    alive = sum(1 for ws in connections if ws.state.name == "OPEN")
+    await asyncio.gather(*(ws.close() for ws in connections), return_exceptions=True)
+    print(f"still open after hold: {alive}/{subscriber_count}")
+    return 0 if alive == subscriber_count else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--flood", type=int, default=200, help="messages published with no reader")
+    parser.add_argument("--max-bytes", type=int, default=16_384, help="heap budget per flooded subscriber")
+    parser.add_argument("--url", help="WebSocket URL of a running worker (socket mode)")
+    parser.add_argument("--hold", type=int, default=60, help="seconds to hold sockets open (socket mode)")
+    args = parser.parse_args()
+
+    if args.url:
+        sys.exit(asyncio.run(run_sockets(args.url, args.subscribers, args.hold)))
+    sys.exit(asyncio.run(run_in_process(args.subscribers, args.flood, args.max_bytes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Synthetic production-scale data generator
+
+Deterministic (seeded) datasets of houses, years of daily rounds, skewed bets
+and tickets, referral trees and wallet histories, bulk-loaded with COPY on
+Postgres. See __main__.py for the CLI.
+"""
+
+from datagen.generator import SCALES, DatasetGenerator, Scale, zipf_picker
+from datagen.loader import BulkLoader
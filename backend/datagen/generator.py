@@ -0,0 +1,387 @@
+"""
+Deterministic dataset generation
+
+Everything is drawn from one seeded Random in a fixed order, so a seed and a
+scale always produce the same rows. The shape follows production:
+  - houses run Monday to Saturday, with FR and SR draws at house-local times
+  - a few popular houses and heavy players take most of the bets
+  - numbers are Zipf-skewed, and tickets cluster in the hours before betting closes
+  - past draws have results and settled bets; today's and later draws stay pending
+  - forecast picks pair each house's FR and SR draws
+  - about a third of players were referred, so agents head multi-level trees
+    and earn commission on their downline's bets
+  - deposit and withdrawal histories carry running balances
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, List, Optional
+
+from app.models import Bet, BetTicket, House, Round, Transaction, User
+from app.models.ledger import ADJUSTMENTS_ACCOUNT, WALLET_ACCOUNT, LedgerEntry, LedgerEntryType
+from app.models.bet import BetStatus, BetType, UserBetStats
+from app.models.referral import CommissionLevel, CommissionStatus, ReferralCommission, UserRole
+from app.models.round import RoundStatus, RoundType
+from app.models.transaction import TransactionStatus, TransactionType
+from app.services.schedule_calculator import PLATFORM_TIMEZONE, draw_instant
+from app.utils.password import hash_password
+
+from datagen.loader import BulkLoader
+
+# Every generated account logs in with this password
+PASSWORD = "password"
+
+COMMISSION_RATES = (0.05, 0.02, 0.01)
+COMMISSION_LEVELS = (CommissionLevel.LEVEL_1, CommissionLevel.LEVEL_2, CommissionLevel.LEVEL_3)
+PAYOUT_RATES = {
+    RoundType.FR: {BetType.DIRECT: 70.0, BetType.HOUSE: 7.0, BetType.ENDING: 7.0},
+    RoundType.SR: {BetType.DIRECT: 60.0, BetType.HOUSE: 6.0, BetType.ENDING: 6.0},
+}
+FORECAST_RATES = {"direct": 400.0, "house": 40.0, "ending": 40.0}
+BET_AMOUNTS = (10, 20, 50, 100, 200, 500)
+BET_AMOUNT_WEIGHTS = (30, 25, 20, 15, 7, 3)
+
+
+@dataclass(frozen=True)
+class Scale:
+    houses: int
+    days: int
+    users: int
+    bets_per_round: int
+    deposits_per_user: int = 4
+
+
+SCALES = {
+    "tiny": Scale(houses=3, days=14, users=500, bets_per_round=20),
+    "small": Scale(houses=20, days=180, users=20_000, bets_per_round=40),
+    "medium": Scale(houses=300, days=365, users=200_000, bets_per_round=25),
+    "large": Scale(houses=2_000, days=730, users=1_000_000, bets_per_round=10),
+}
+
+
+def zipf_picker(rng: random.Random, values: List[str], exponent: float = 1.1) -> Callable[[], str]:
+    """Draw values with Zipf-skewed popularity in a shuffled rank order"""
+    ranked = values[:]
+    rng.shuffle(ranked)
+    cumulative = list(accumulate(1 / (rank + 1) ** exponent for rank in range(len(ranked))))
+    return lambda: rng.choices(ranked, cum_weights=cumulative)[0]
+
+
+def bet_wins(bet_type: BetType, value: str, result: int) -> bool:
+    """Same rule as settlement: direct matches both digits, house the first, ending the last"""
+    if bet_type == BetType.DIRECT:
+        return int(value) == result
+    if bet_type == BetType.HOUSE:
+        return int(value) == result // 10
+    return int(value) == result % 10
+
+
+def forecast_wins(kind: str, fr_pick: int, sr_pick: int, fr_result: int, sr_result: int) -> bool:
+    if kind == "direct":
+        return fr_pick == fr_result and sr_pick == sr_result
+    if kind == "house":
+        return fr_pick == fr_result // 10 and sr_pick == sr_result // 10
+    return fr_pick == fr_result % 10 and sr_pick == sr_result % 10
+
+
+class DatasetGenerator:
+    def __init__(self, loader: BulkLoader, scale: Scale, seed: int = 42, end_date: Optional[date] = None):
+        self.loader = loader
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.prefix = f"g{seed}"
+        self.now = datetime.now(timezone.utc)
+        # History runs up to yesterday; today and the next two days are open draws
+        self.end_date = end_date or self.now.date() + timedelta(days=2)
+        self.start_date = self.end_date - timedelta(days=scale.days - 1)
+
+        self.direct_pick = zipf_picker(self.rng, [f"{n:02d}" for n in range(100)])
+        self.digit_pick = zipf_picker(self.rng, [str(n) for n in range(10)])
+
+        # Per-user state, indexed from 0
+        self.user_ids: List[int] = []
+        self.referrer: List[int] = []
+        self.openings: List[tuple] = []
+        self.stats = None
+        self.next_bet_id = 0
+        self.next_ticket = 0
+
+    def run(self):
+        """Generate everything and return rows loaded per table"""
+        self._users()
+        self._houses()
+        self._rounds_and_bets()
+        self._wallet_history()
+        self._bet_stats()
+        self._ledger_openings()
+        return self.loader.finish()
+
+    # Users and referral trees
+    def _users(self):
+        rng, sink = self.rng, self.loader.sink(User)
+        first_id = self.loader.next_id(User)
+        password_hash = hash_password(PASSWORD)
+        agents: List[int] = []
+        for i in range(self.scale.users):
+            roll = rng.random()
+            role = UserRole.SUPER_AGENT if roll < 0.001 else UserRole.AGENT if roll < 0.01 else UserRole.PLAYER
+            referrer = -1
+            if i and rng.random() < 0.35:
+                # Agents recruit most players; the rest are referred by earlier (mostly older) players
+                referrer = rng.choice(agents) if agents and rng.random() < 0.6 else int(i * rng.random() ** 3)
+            self.referrer.append(referrer)
+            if role != UserRole.PLAYER:
+                agents.append(i)
+            created_at = datetime.combine(self.start_date, time(), tzinfo=timezone.utc) + timedelta(
+                seconds=rng.randrange(self.scale.days * 86_400) * (i / self.scale.users)
+            )
+            balance = float(rng.randrange(0, 5_000))
+            if balance:
+                self.openings.append((first_id + i, balance, created_at))
+            sink.add({
+                "id": first_id + i,
+                "username": f"{self.prefix}u{i}",
+                "phone": f"{self.prefix}{i:09d}",
+                "password_hash": password_hash,
+                "is_active": rng.random() > 0.02,
+                "is_admin": False,
+                "wallet_balance": balance,
+                "ledger_seq": 1 if balance else 0,
+                "role": role,
+                "referral_code": f"{self.prefix}r{i}",
+                "referred_by": first_id + referrer if referrer >= 0 else None,
+                "is_agent_approved": role != UserRole.PLAYER,
+                "agent_commission_rate": COMMISSION_RATES[0] if role != UserRole.PLAYER else 0.0,
+                "created_at": created_at,
+            })
+            self.user_ids.append(first_id + i)
+
+        n = self.scale.users
+        self.stats = {
+            "total_tickets": [0] * n, "total_bets": [0] * n, "total_amount": [0.0] * n,
+            "pending_bets": [0] * n, "won_bets": [0] * n, "lost_bets": [0] * n, "total_winnings": [0.0] * n,
+        }
+
+    def _pick_user(self) -> int:
+        """Heavy players bet far more often than the long tail"""
+        return int(self.scale.users * self.rng.random() ** 2)
+
+    # Houses
+    def _houses(self):
+        rng, sink = self.rng, self.loader.sink(House)
+        first_id = self.loader.next_id(House)
+        self.houses = []
+        weights = [1 / (h + 1) ** 0.8 for h in range(self.scale.houses)]
+        mean_weight = sum(weights) / len(weights)
+        for h in range(self.scale.houses):
+            fr_time = time(15, rng.choice((0, 15, 30, 45)))
+            sr_time = time(fr_time.hour + 1, fr_time.minute)
+            sink.add({
+                "id": first_id + h,
+                "name": f"{self.prefix} House {h}",
+                "location": f"District {h % 40}",
+                "timezone": PLATFORM_TIMEZONE,
+                "fr_time": fr_time,
+                "sr_time": sr_time,
+            })
+            self.houses.append({
+                "id": first_id + h,
+                "name": f"{self.prefix} House {h}",
+                "fr_time": fr_time,
+                "sr_time": sr_time,
+                # Popular houses draw more bets per round
+                "bets_per_round": self.scale.bets_per_round * weights[h] / mean_weight,
+            })
+
+    # Rounds, tickets, bets and commissions
+    def _rounds_and_bets(self):
+        rounds = self.loader.sink(Round)
+        self.tickets = self.loader.sink(BetTicket)
+        self.bets = self.loader.sink(Bet)
+        self.commissions = self.loader.sink(ReferralCommission)
+        next_round_id = self.loader.next_id(Round)
+        self.next_bet_id = self.loader.next_id(Bet)
+        self.next_commission_id = self.loader.next_id(ReferralCommission)
+
+        day = self.start_date
+        while day <= self.end_date:
+            if day.weekday() != 6:  # No draws on Sunday
+                for house in self.houses:
+                    draws = {}
+                    for round_type, draw_time in ((RoundType.FR, house["fr_time"]), (RoundType.SR, house["sr_time"])):
+                        scheduled = draw_instant(PLATFORM_TIMEZONE, day, draw_time)
+                        completed = scheduled < self.now
+                        draw = {
+                            "id": next_round_id, "type": round_type, "closes_at": scheduled - timedelta(minutes=15),
+                            "result": self.rng.randrange(100) if completed else None,
+                        }
+                        next_round_id += 1
+                        rounds.add({
+                            "id": draw["id"], "house_id": house["id"], "round_type": round_type,
+                            "status": RoundStatus.COMPLETED if completed else RoundStatus.SCHEDULED,
+                            "scheduled_time": scheduled, "betting_closes_at": draw["closes_at"],
+                            "actual_time": scheduled if completed else None, "local_date": day,
+                            "result": draw["result"],
+                        })
+                        draws[round_type] = draw
+                        self._round_bets(house, draw)
+                    self._forecast_bets(house, draws[RoundType.FR], draws[RoundType.SR])
+            day += timedelta(days=1)
+
+    def _placed_at(self, closes_at: datetime) -> datetime:
+        """Ticket time, clustered in the last hours before betting closes"""
+        return closes_at - timedelta(seconds=int(4 * 3600 * self.rng.random() ** 3) + 1)
+
+    def _round_bets(self, house: dict, draw: dict):
+        rng = self.rng
+        target = rng.randint(0, int(2 * house["bets_per_round"]))
+        placed = 0
+        prefix = draw["type"].value.lower()
+        while placed < target:
+            user = self._pick_user()
+            summary = {}
+            bets = []
+            for _ in range(rng.choice((1, 1, 2, 3, 4))):
+                bet_type = rng.choices((BetType.DIRECT, BetType.HOUSE, BetType.ENDING), weights=(50, 25, 25))[0]
+                value = self.direct_pick() if bet_type == BetType.DIRECT else self.digit_pick()
+                amount = float(rng.choices(BET_AMOUNTS, weights=BET_AMOUNT_WEIGHTS)[0])
+                won = None if draw["result"] is None else bet_wins(bet_type, value, draw["result"])
+                bets.append((bet_type, value, amount, amount * PAYOUT_RATES[draw["type"]][bet_type], won))
+                summary.setdefault(f"{prefix}_{bet_type.value.lower()}", {})[value] = amount
+            placed += len(bets)
+            self._ticket(user, house["id"], draw["id"], None, self._placed_at(draw["closes_at"]), summary, bets)
+
+    def _forecast_bets(self, house: dict, fr: dict, sr: dict):
+        rng = self.rng
+        for _ in range(rng.randint(0, int(house["bets_per_round"] / 5))):
+            kind = rng.choices(("direct", "house", "ending"), weights=(60, 20, 20))[0]
+            if kind == "direct":
+                fr_pick, sr_pick = int(self.direct_pick()), int(self.direct_pick())
+            else:
+                fr_pick, sr_pick = int(self.digit_pick()), int(self.digit_pick())
+            amount = float(rng.choices(BET_AMOUNTS, weights=BET_AMOUNT_WEIGHTS)[0])
+            won = None
+            if fr["result"] is not None and sr["result"] is not None:
+                won = forecast_wins(kind, fr_pick, sr_pick, fr["result"], sr["result"])
+            value = f"{kind}:{fr_pick:02d}-{sr_pick:02d}" if kind == "direct" else f"{kind}:{fr_pick}-{sr_pick}"
+            summary = {"forecast": [{"type": kind, "fr": fr_pick, "sr": sr_pick, "amount": amount}]}
+            self._ticket(
+                self._pick_user(), house["id"], fr["id"], (fr["id"], sr["id"], house["name"]),
+                self._placed_at(fr["closes_at"]), summary,
+                [(BetType.FORECAST, value, amount, amount * FORECAST_RATES[kind], won)],
+            )
+
+    def _ticket(self, user: int, house_id: int, round_id: int, forecast: Optional[tuple], placed_at: datetime,
+                summary: dict, bets: List[tuple]):
+        ticket_id = f"{self.prefix}T{self.next_ticket:010d}"
+        self.next_ticket += 1
+        user_id = self.user_ids[user]
+        outcomes = [won for *_, won in bets]
+        if None in outcomes:
+            status = BetStatus.PENDING
+        elif any(outcomes):
+            status = BetStatus.WON
+        else:
+            status = BetStatus.LOST
+        self.tickets.add({
+            "ticket_id": ticket_id, "user_id": user_id, "house_id": house_id,
+            "total_amount": sum(amount for _, _, amount, _, _ in bets),
+            "total_potential_payout": max(payout for _, _, _, payout, _ in bets),
+            "status": status, "bets_summary": summary, "created_at": placed_at,
+        })
+
+        stats = self.stats
+        stats["total_tickets"][user] += 1
+        fr_round_id, sr_round_id, house_name = forecast or (None, None, None)
+        for bet_type, value, amount, payout, won in bets:
+            bet_status = BetStatus.PENDING if won is None else BetStatus.WON if won else BetStatus.LOST
+            bet_id = self.next_bet_id
+            self.next_bet_id += 1
+            self.bets.add({
+                "id": bet_id, "user_id": user_id, "round_id": round_id, "bet_type": bet_type,
+                "bet_value": value, "bet_amount": amount, "status": bet_status, "potential_payout": payout,
+                "actual_payout": payout if won else 0.0, "ticket_id": ticket_id,
+                "fr_round_id": fr_round_id, "sr_round_id": sr_round_id, "house_name": house_name,
+                "created_at": placed_at,
+            })
+            stats["total_bets"][user] += 1
+            stats["total_amount"][user] += amount
+            if won is None:
+                stats["pending_bets"][user] += 1
+            elif won:
+                stats["won_bets"][user] += 1
+                stats["total_winnings"][user] += payout
+            else:
+                stats["lost_bets"][user] += 1
+            self._commissions(user, bet_id, amount, won, placed_at)
+
+    def _commissions(self, user: int, bet_id: int, amount: float, won: Optional[bool], placed_at: datetime):
+        referrer = self.referrer[user]
+        for level, rate in zip(COMMISSION_LEVELS, COMMISSION_RATES):
+            if referrer < 0:
+                return
+            status = CommissionStatus.PENDING if won is None else CommissionStatus.APPROVED if won else CommissionStatus.REJECTED
+            self.commissions.add({
+                "id": self.next_commission_id, "referrer_id": self.user_ids[referrer],
+                "referred_user_id": self.user_ids[user], "bet_id": bet_id, "level": level,
+                "amount": round(amount * rate, 2), "bet_amount": amount, "commission_rate": rate,
+                "status": status, "rejection_reason": "Bet lost" if won is False else None,
+                "created_at": placed_at, "processed_at": None if won is None else placed_at + timedelta(hours=1),
+            })
+            self.next_commission_id += 1
+            referrer = self.referrer[referrer]
+
+    # Deposits and withdrawals
+    def _wallet_history(self):
+        rng, sink = self.rng, self.loader.sink(Transaction)
+        next_id = self.loader.next_id(Transaction)
+        span = self.scale.days * 86_400
+        start = datetime.combine(self.start_date, time(), tzinfo=timezone.utc)
+        for user, user_id in enumerate(self.user_ids):
+            deposits = rng.randint(0, 2 * self.scale.deposits_per_user)
+            events = sorted(
+                [(rng.randrange(span), TransactionType.DEPOSIT) for _ in range(deposits)]
+                + [(rng.randrange(span), TransactionType.WITHDRAWAL) for _ in range(deposits // 3)]
+            )
+            balance = 0.0
+            for offset, kind in events:
+                amount = float(rng.choice((100, 200, 500, 1_000, 2_000, 5_000)))
+                roll = rng.random()
+                status = TransactionStatus.PENDING if roll < 0.03 else TransactionStatus.REJECTED if roll < 0.1 else TransactionStatus.APPROVED
+                if kind == TransactionType.WITHDRAWAL and amount > balance:
+                    status = TransactionStatus.REJECTED
+                after = balance
+                if status == TransactionStatus.APPROVED:
+                    after = balance + amount if kind == TransactionType.DEPOSIT else balance - amount
+                created_at = start + timedelta(seconds=offset)
+                sink.add({
+                    "id": next_id, "user_id": user_id, "transaction_type": kind, "amount": amount, "status": status,
+                    "description": f"{kind.value.title()} via UPI",
+                    "reference_number": f"{self.prefix}X{next_id}", "deposit_method": "UPI",
+                    "balance_before": balance, "balance_after": after, "created_at": created_at,
+                    "processed_at": None if status == TransactionStatus.PENDING else created_at + timedelta(minutes=30),
+                })
+                next_id += 1
+                balance = after
+
+    # Running totals read by /bet/summary
+    def _bet_stats(self):
+        sink = self.loader.sink(UserBetStats)
+        stats = self.stats
+        for user, user_id in enumerate(self.user_ids):
+            if stats["total_tickets"][user]:
+                sink.add({"user_id": user_id, **{column: values[user] for column, values in stats.items()}})
+
+    # Opening ledger journals explaining each wallet balance
+    def _ledger_openings(self):
+        sink = self.loader.sink(LedgerEntry)
+        for user_id, balance, created_at in self.openings:
+            common = {
+                "journal_id": f"opening{user_id}", "entry_type": LedgerEntryType.OPENING_BALANCE,
+                "reference": f"user:{user_id}", "created_at": created_at,
+            }
+            sink.add({**common, "account": WALLET_ACCOUNT, "user_id": user_id, "seq": 1, "amount": balance, "balance_after": balance})
+            sink.add({**common, "account": ADJUSTMENTS_ACCOUNT, "user_id": None, "seq": None, "amount": -balance, "balance_after": None})
@@ -0,0 +1,142 @@
+"""
+Bulk loading for generated rows
+
+Postgres rows are spooled to CSV temp files and loaded with COPY, one table
+at a time in dependency order. Other databases (SQLite) get chunked
+executemany inserts; a full chunk first flushes the tables opened before its
+own, so rows still land in dependency order. Explicit IDs are allocated by the caller, so Postgres
+sequences are moved past them once loading finishes.
+"""
+
+import csv
+import enum
+import json
+import tempfile
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection
+
+INSERT_CHUNK = 20_000
+
+
+def scalar_defaults(table) -> Dict[str, object]:
+    """Python-side scalar column defaults, which COPY and Core inserts would otherwise skip"""
+    return {
+        column.name: column.default.arg
+        for column in table.columns
+        if column.default is not None and column.default.is_scalar
+    }
+
+
+def _csv_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+class TableSink:
+    """Rows for one table; every row is normalized to the same column list"""
+
+    def __init__(self, conn: Connection, model):
+        self.conn = conn
+        self.table = model.__table__
+        self.defaults = scalar_defaults(self.table)
+        self.columns: Optional[List[str]] = None
+        self.rows = 0
+
+    def add(self, row: dict):
+        if self.columns is None:
+            self.columns = list(dict.fromkeys([*self.defaults, *row]))
+        self.rows += 1
+        self._write({column: row[column] if column in row else self.defaults.get(column) for column in self.columns})
+
+    def _write(self, row: dict):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class InsertSink(TableSink):
+    def __init__(self, conn: Connection, model, opened_before: List["InsertSink"] = ()):
+        super().__init__(conn, model)
+        self.buffer: List[dict] = []
+        self.opened_before = list(opened_before)
+
+    def _write(self, row: dict):
+        self.buffer.append(row)
+        if len(self.buffer) >= INSERT_CHUNK:
+            # Rows referenced by this chunk may still be buffered upstream
+            for sink in self.opened_before:
+                sink.finish()
+            self.finish()
+
+    def finish(self):
+        if self.buffer:
+            self.conn.execute(insert(self.table), self.buffer)
+            self.buffer = []
+
+
+class CopySink(TableSink):
+    def __init__(self, conn: Connection, model):
+        super().__init__(conn, model)
+        self.spool = tempfile.TemporaryFile(mode="w+", newline="")
+        self.writer = csv.writer(self.spool)
+
+    def _write(self, row: dict):
+        self.writer.writerow([_csv_value(row[column]) for column in self.columns])
+
+    def finish(self):
+        if self.columns:
+            self.spool.seek(0)
+            columns = ", ".join(f'"{column}"' for column in self.columns)
+            cursor = self.conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(f'COPY "{self.table.name}" ({columns}) FROM STDIN WITH (FORMAT csv)', self.spool)
+            finally:
+                cursor.close()
+        self.spool.close()
+
+
+class BulkLoader:
+    """Hands out per-table sinks and loads them in the order they were opened"""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.use_copy = conn.dialect.name == "postgresql"
+        self.sinks: Dict[str, TableSink] = {}
+
+    def sink(self, model) -> TableSink:
+        name = model.__tablename__
+        if name not in self.sinks:
+            if self.use_copy:
+                self.sinks[name] = CopySink(self.conn, model)
+            else:
+                self.sinks[name] = InsertSink(self.conn, model, list(self.sinks.values()))
+        return self.sinks[name]
+
+    def next_id(self, model) -> int:
+        """First free primary key, so generated rows can reference each other"""
+        return (self.conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def finish(self) -> Dict[str, int]:
+        """Load everything still spooled; returns rows per table"""
+        for sink in self.sinks.values():
+            sink.finish()
+        if self.use_copy:
+            for name, sink in self.sinks.items():
+                if "id" in sink.table.columns and sink.table.columns["id"].autoincrement is not False:
+                    self.conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM \"{name}\"))"
+                    ))
+        return {name: sink.rows for name, sink in self.sinks.items()}
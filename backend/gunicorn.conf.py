@@ -0,0 +1,33 @@
+"""
+Gunicorn settings shared by every production entrypoint
+
+Gunicorn loads ./gunicorn.conf.py automatically. Command-line flags still
+win, so start.sh and the Dockerfiles keep their worker counts and timeouts.
+This file prepares the Prometheus multiprocess directory, which must exist
+before any worker imports prometheus_client.
+
+The app is preloaded: the master imports app.main once and workers fork from
+it, sharing that memory and booting without repeating the imports. Anything
+tied to a process (database connections, background tasks) is set up in the
+app's startup event, which runs in each worker.
+"""
+
+import os
+import shutil
+
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/teer-metrics")
+
+
+def on_starting(server):
+    # Start every deployment with empty metric files
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
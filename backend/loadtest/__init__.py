@@ -0,0 +1,6 @@
+"""
+Draw-deadline load test suite
+
+Replays the traffic shape around a Teer draw against the API and reports
+throughput and p50/p95/p99 latency per scenario. See __main__.py for usage.
+"""
@@ -0,0 +1,121 @@
+"""
+Draw-deadline traffic scenarios
+
+Phases run in the order they happen around a draw:
+  login_storm          every player logs in at once
+  lobby_polling        players poll houses-with-rounds while deciding
+  ticket_surge         the last-15-minutes rush of ticket placements (lobby polls mixed in)
+  result_publish       betting closes, the admin publishes FR then SR and bets settle
+  post_result_refresh  players reload results, their tickets and their balance
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.seed import PASSWORD, SeededRun, close_betting
+from loadtest.stats import ScenarioStats
+
+API = "/api/v1"
+
+
+class LoadRunner:
+    def __init__(self, client: httpx.AsyncClient, run: SeededRun, concurrency: int, think_seconds: float, seed: int = 42):
+        self.client = client
+        self.rng = random.Random(seed)  # Same picks and pauses on every run, so runs compare
+        self.run = run
+        self.concurrency = concurrency
+        self.think_seconds = think_seconds
+        self.tokens: Dict[str, str] = {}
+        self.admin_token: Optional[str] = None
+        self.stats: Dict[str, ScenarioStats] = {}
+
+    async def request(self, scenario: str, method: str, url: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            response, status_code = None, 599
+        self.stats[scenario].record(time.perf_counter() - started, status_code)
+        return response
+
+    async def think(self):
+        if self.think_seconds:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think_seconds))
+
+    async def phase(self, scenario: str, per_user, users: List[str]):
+        """Run `per_user(username)` for every user, at most `concurrency` at a time"""
+        self.stats[scenario] = ScenarioStats()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(username: str):
+            async with semaphore:
+                await per_user(username)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded(username) for username in users))
+        self.stats[scenario].elapsed = time.perf_counter() - started
+
+    # Scenarios
+    async def login_storm(self):
+        async def login(username: str):
+            response = await self.request(
+                "login_storm", "POST", f"{API}/auth/login", json={"username": username, "password": PASSWORD}
+            )
+            if response is not None and response.status_code == 200:
+                self.tokens[username] = response.json()["access_token"]
+
+        await self.phase("login_storm", login, self.run.usernames + [self.run.admin_username])
+        self.admin_token = self.tokens.pop(self.run.admin_username, None)
+
+    async def lobby_polling(self, seconds: float):
+        deadline = time.perf_counter() + seconds
+
+        async def poll(username: str):
+            while time.perf_counter() < deadline:
+                await self.request("lobby_polling", "GET", f"{API}/bet/houses-with-rounds", self.tokens.get(username))
+                await self.think()
+
+        await self.phase("lobby_polling", poll, self.run.usernames)
+
+    async def ticket_surge(self, tickets_per_user: int):
+        async def place(username: str):
+            token = self.tokens.get(username)
+            for _ in range(tickets_per_user):
+                await self.request("ticket_surge", "GET", f"{API}/bet/houses-with-rounds", token)
+                ticket = {
+                    "house_id": self.rng.choice(self.run.house_ids),
+                    "fr_direct": {f"{self.rng.randrange(100):02d}": 10},
+                    "sr_house": {str(self.rng.randrange(10)): 20},
+                    "sr_ending": {str(self.rng.randrange(10)): 20},
+                }
+                await self.request("ticket_surge", "POST", f"{API}/bet/ticket", token, json=ticket)
+                await self.think()
+
+        await self.phase("ticket_surge", place, self.run.usernames)
+
+    async def result_publish(self):
+        close_betting(self.run)
+        self.stats["result_publish"] = ScenarioStats()
+        started = time.perf_counter()
+        # One admin publishes draws one after another, as in production
+        for round_id in self.run.round_ids:
+            await self.request(
+                "result_publish", "POST", f"{API}/admin/rounds/{round_id}/result", self.admin_token,
+                params={"result": self.rng.randrange(100)},
+            )
+        self.stats["result_publish"].elapsed = time.perf_counter() - started
+
+    async def post_result_refresh(self):
+        async def refresh(username: str):
+            token = self.tokens.get(username)
+            await self.request("post_result_refresh", "GET", f"{API}/rounds/results", token)
+            await self.request("post_result_refresh", "GET", f"{API}/bet/my-tickets", token)
+            await self.request("post_result_refresh", "GET", f"{API}/wallet/balance", token)
+
+        await self.phase("post_result_refresh", refresh, self.run.usernames)
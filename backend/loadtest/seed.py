@@ -0,0 +1,99 @@
+"""
+Seed data for one load-test run
+
+Every run uses its own prefix for usernames and house names, so runs can repeat
+against the same database without colliding.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, time as dt_time
+from typing import List
+
+from sqlalchemy import update
+
+from app.api.auth import get_password_hash
+from app.database import Base, SessionLocal, engine
+from app.models import House, Round, User
+from app.models.ledger import LedgerEntryType
+from app.models.round import RoundStatus, RoundType
+from app.services.ledger_service import LedgerService, Posting
+from app.services.schedule_calculator import local_today
+
+PASSWORD = "loadtest-password"
+
+
+@dataclass
+class SeededRun:
+    prefix: str
+    usernames: List[str]
+    admin_username: str
+    house_ids: List[int]
+    # Draw order: every FR round, then every SR round
+    round_ids: List[int] = field(default_factory=list)
+
+
+def seed_run(users: int, houses: int, closes_in_minutes: int = 15, balance: float = 1_000_000) -> SeededRun:
+    """Create players, an admin, houses and today's open FR/SR rounds"""
+    Base.metadata.create_all(bind=engine)
+    prefix = f"lt{int(time.time())}"
+    # One bcrypt hash for everyone: seeding cost should not scale with users
+    password_hash = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+
+    db = SessionLocal()
+    try:
+        usernames = [f"{prefix}_p{i}" for i in range(users)]
+        players = [
+            User(username=name, phone=f"{prefix}{i:06d}", password_hash=password_hash)
+            for i, name in enumerate(usernames)
+        ]
+        db.add_all(players)
+        db.flush()
+        LedgerService(db).post(*(Posting(player.id, balance, LedgerEntryType.OPENING_BALANCE) for player in players))
+        admin_username = f"{prefix}_admin"
+        db.add(User(username=admin_username, phone=f"{prefix}admin", password_hash=password_hash, is_admin=True))
+
+        house_rows = [
+            House(name=f"{prefix} House {h}", fr_time=dt_time(15, 30), sr_time=dt_time(17, 0))
+            for h in range(houses)
+        ]
+        db.add_all(house_rows)
+        db.flush()
+
+        rounds = {RoundType.FR: [], RoundType.SR: []}
+        for house in house_rows:
+            for offset, round_type in ((0, RoundType.FR), (15, RoundType.SR)):
+                closes_at = now + timedelta(minutes=closes_in_minutes + offset)
+                round_ = Round(
+                    house_id=house.id, round_type=round_type, status=RoundStatus.SCHEDULED,
+                    scheduled_time=closes_at + timedelta(minutes=house.betting_window_minutes or 15),
+                    betting_closes_at=closes_at, local_date=local_today(house.timezone, now),
+                )
+                db.add(round_)
+                rounds[round_type].append(round_)
+        db.commit()
+
+        return SeededRun(
+            prefix=prefix,
+            usernames=usernames,
+            admin_username=admin_username,
+            house_ids=[house.id for house in house_rows],
+            round_ids=[round_.id for round_ in rounds[RoundType.FR] + rounds[RoundType.SR]],
+        )
+    finally:
+        db.close()
+
+
+def close_betting(run: SeededRun):
+    """Fast-forward to the draw: close betting on the run's rounds now instead of waiting"""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Round)
+            .where(Round.id.in_(run.round_ids))
+            .values(betting_closes_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
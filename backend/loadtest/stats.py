@@ -0,0 +1,80 @@
+"""
+Latency recording, reporting and baseline comparison
+"""
+
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class ScenarioStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_codes: Dict[int, int] = defaultdict(int)
+        self.elapsed = 0.0
+
+    def record(self, seconds: float, status_code: int):
+        self.latencies.append(seconds)
+        self.status_codes[status_code] += 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        values = sorted(self.latencies)
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "rps": round(len(values) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+        }
+
+
+def format_report(results: Dict[str, dict]) -> str:
+    lines = [f"{'scenario':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for name, row in results.items():
+        lines.append(
+            f"{name:<20}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, profile: str, results: Dict[str, dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"profile": profile, "scenarios": results}, indent=2) + "\n")
+
+
+def compare_to_baseline(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Regressions against a stored baseline: slower p95, lower throughput or new errors"""
+    regressions = []
+    for name, row in results.items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {row['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if base["rps"] and row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {row['rps']} req/s vs baseline {base['rps']} req/s")
+        if row["errors"] > base["errors"]:
+            regressions.append(f"{name}: {row['errors']} errors vs baseline {base['errors']}")
+    return regressions
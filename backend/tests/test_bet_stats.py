@@ -0,0 +1,77 @@
+"""
+Test per-user running bet totals
+"""
+from datetime import datetime, time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Bet, BetTicket, House, Round, User, UserBetStats
+from app.models.bet import BetStatus, BetType
+from app.models.round import RoundType
+from app.services.bet_stats_service import BetStatsService, STAT_COLUMNS, accumulate
+
+
+def test_running_totals_match_history():
+    """Backfill on first write, then deltas keep the row equal to a full recount"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    house = House(name="Shillong", fr_time=time(15, 30), sr_time=time(17, 0))
+    user = User(username="player", phone="9000000000", password_hash="x")
+    db.add_all([house, user])
+    db.flush()
+    round_ = Round(house_id=house.id, round_type=RoundType.FR,
+                   scheduled_time=datetime(2026, 1, 1, 10), betting_closes_at=datetime(2026, 1, 1, 9, 45))
+    db.add(round_)
+    db.flush()
+
+    def place(value):
+        bet = Bet(user_id=user.id, round_id=round_.id, bet_type=BetType.DIRECT, bet_value=value,
+                  bet_amount=10, potential_payout=800, ticket_id=f"T{value}")
+        db.add_all([bet, BetTicket(ticket_id=f"T{value}", user_id=user.id, house_id=house.id, total_amount=10,
+                                   total_potential_payout=800, bets_summary={})])
+        BetStatsService(db).apply({user.id: {"total_tickets": 1, "total_bets": 1, "total_amount": 10, "pending_bets": 1}})
+        return bet
+
+    first = place("01")
+    db.commit()
+    second = place("02")
+    third = place("03")
+    db.commit()
+
+    deltas = {}
+    first.status, first.actual_payout = BetStatus.WON, 800
+    accumulate(deltas, user.id, pending_bets=-1, won_bets=1, total_winnings=800)
+    second.status = BetStatus.LOST
+    accumulate(deltas, user.id, pending_bets=-1, lost_bets=1)
+    BetStatsService(db).apply(deltas)
+    db.commit()
+
+    service = BetStatsService(db)
+    stats = db.get(UserBetStats, user.id)
+    assert {column: getattr(stats, column) for column in STAT_COLUMNS} == service.history_totals([user.id])[user.id]
+    summary = service.get_summary(user.id)
+    assert (summary.total_tickets, summary.pending_bets, summary.won_bets, summary.total_winnings) == (3, 1, 1, 800)
+    assert third.status == BetStatus.PENDING
+    db.close()
+
+
+def test_row_at_a_time_fallback_skips_existing_rows():
+    """Dialects without ON CONFLICT insert per savepoint and report only the new rows"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    users = [User(username=f"player{i}", phone=f"900000000{i}", password_hash="x") for i in range(2)]
+    db.add_all(users)
+    db.flush()
+    db.add(UserBetStats(user_id=users[0].id, **dict.fromkeys(STAT_COLUMNS, 0)))
+    db.flush()
+
+    rows = [{"user_id": user.id, **dict.fromkeys(STAT_COLUMNS, 0)} for user in users]
+    assert BetStatsService(db)._insert_one_by_one(rows) == {users[1].id}
+    db.commit()
+    assert db.query(UserBetStats).count() == 2
+    db.close()
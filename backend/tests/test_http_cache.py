@@ -0,0 +1,76 @@
+"""
+Test ETag / 304 handling of the HTTP cache middleware
+"""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.http_cache import CachePolicy, HTTPCacheMiddleware
+from app.services import cache_versions
+from app.services.cache_versions import ResourceVersions
+
+
+def test_conditional_requests_skip_the_route_until_version_bumps():
+    """A matching If-None-Match is answered with 304 without calling the route"""
+    calls = []
+    versions = ResourceVersions()
+    app = FastAPI()
+    app.add_middleware(HTTPCacheMiddleware, policies={"/banners/active": CachePolicy(("banners",), max_age=60)},
+                       versions=versions)
+
+    @app.get("/banners/active")
+    def active_banners():
+        calls.append(1)
+        return [{"id": 1}]
+
+    client = TestClient(app)
+    first = client.get("/banners/active")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=60"
+
+    cached = client.get("/banners/active", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert len(calls) == 1
+
+    versions.bump("banners")
+    fresh = client.get("/banners/active", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert len(calls) == 2
+
+
+def test_failed_shared_bump_is_retried_before_the_next_read(monkeypatch):
+    """A bump Redis timed out on still reaches the shared counter, without blocking later bumps"""
+    counters = {}
+
+    class TimingOut:
+        def pipeline(self, transaction):
+            raise TimeoutError("redis timed out")
+
+    class Pipeline:
+        def __init__(self):
+            self.keys = []
+
+        def incr(self, key):
+            self.keys.append(key)
+
+        async def execute(self):
+            for key in self.keys:
+                counters[key] = counters.get(key, 0) + 1
+
+    class Shared:
+        def pipeline(self, transaction):
+            return Pipeline()
+
+        async def mget(self, keys):
+            return [str(counters[key]).encode() if key in counters else None for key in keys]
+
+    monkeypatch.setattr(cache_versions, "get_request_redis", TimingOut)
+    monkeypatch.setattr(cache_versions, "get_async_redis", Shared)
+    versions = ResourceVersions()
+    versions.bump("banners")
+    versions.bump("banners", "houses")  # Queued behind the failure rather than waiting on Redis again
+    assert asyncio.run(versions.tokens(["banners", "houses"])) == ("1", "1")
+    assert asyncio.run(versions.tokens(["banners"])) == ("1",)
@@ -0,0 +1,114 @@
+"""
+Test the append-only wallet ledger
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import LedgerEntry, User
+from app.models.ledger import CASH_ACCOUNT, HOUSE_ACCOUNT, LedgerEntryType
+from app.services.ledger_service import LedgerService, Posting
+
+
+def test_postings_derive_balances_and_reconcile():
+    """Wallet legs carry sequence and running balance; reconcile flags wallets changed behind the ledger"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    alice = User(username="alice", phone="9000000001", password_hash="x")
+    bob = User(username="bob", phone="9000000002", password_hash="x")
+    db.add_all([alice, bob])
+    db.flush()
+
+    service = LedgerService(db)
+    service.post(Posting(alice.id, 500, LedgerEntryType.DEPOSIT), Posting(bob.id, 200, LedgerEntryType.DEPOSIT))
+    db.commit()
+    stake, win = service.post(
+        Posting(alice.id, -120, LedgerEntryType.BET_STAKE, "ticket:T1"),
+        Posting(alice.id, 840, LedgerEntryType.BET_WIN, "bet:1"),
+    )
+    db.commit()
+    # Deposits before, betting after
+    between = datetime.now(timezone.utc)
+    db.execute(update(LedgerEntry).where(LedgerEntry.reference.is_(None)).values(created_at=between - timedelta(hours=1)))
+    db.execute(update(LedgerEntry).where(LedgerEntry.reference.isnot(None)).values(created_at=between + timedelta(hours=1)))
+
+    assert (stake.seq, stake.balance_before, stake.balance_after) == (2, 500, 380)
+    assert (win.seq, win.balance_after) == (3, 1220)
+    assert alice.wallet_balance == 1220 and alice.ledger_seq == 3
+    assert service.balance_at(alice.id, between) == 500
+
+    statement = service.statement(alice.id, between, between + timedelta(days=1), limit=1)
+    assert statement["opening_balance"] == 500 and statement["closing_balance"] == 380
+    assert statement["next_cursor"] == 2
+    page = service.statement(alice.id, between, between + timedelta(days=1), after_seq=statement["next_cursor"])
+    assert [entry["entry_type"] for entry in page["entries"]] == [LedgerEntryType.BET_WIN]
+
+    service.take_snapshots()
+    db.commit()
+    service.post(Posting(bob.id, -50, LedgerEntryType.WITHDRAWAL))
+    assert service.account_balance(CASH_ACCOUNT) == -650
+    assert service.account_balance(HOUSE_ACCOUNT) == -720
+
+    assert service.reconcile() == {"mismatched_wallets": 0, "wallets": [], "unbalanced_journals": []}
+    db.execute(update(User).where(User.id == bob.id).values(wallet_balance=999))
+    report = service.reconcile()
+    assert report["mismatched_wallets"] == 1
+    assert report["wallets"][0]["user_id"] == bob.id and report["wallets"][0]["ledger_balance"] == 150
+    db.close()
+
+
+def test_statements_follow_sequence_when_timestamps_disagree():
+    """created_at is the transaction start, so a later seq can carry an earlier timestamp"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    carol = User(username="carol", phone="9000000003", password_hash="x")
+    db.add(carol)
+    db.flush()
+
+    service = LedgerService(db)
+    service.post(Posting(carol.id, 100, LedgerEntryType.DEPOSIT))
+    service.post(Posting(carol.id, 50, LedgerEntryType.DEPOSIT))
+    db.commit()
+    now = datetime.now(timezone.utc)
+    db.execute(update(LedgerEntry).where(LedgerEntry.seq == 1).values(created_at=now - timedelta(minutes=1)))
+    db.execute(update(LedgerEntry).where(LedgerEntry.seq == 2).values(created_at=now - timedelta(minutes=2)))
+
+    start, end = now - timedelta(hours=1), now + timedelta(hours=1)
+    first = service.statement(carol.id, start, end, limit=1)
+    rest = service.statement(carol.id, start, end, after_seq=first["next_cursor"])
+    assert [entry["seq"] for entry in first["entries"] + rest["entries"]] == [1, 2]
+    assert first["opening_balance"] == 0 and rest["closing_balance"] == 150
+    assert service.balance_at(carol.id, now) == 150
+
+
+def test_snapshots_wait_for_entries_committed_out_of_order():
+    """An entry that commits after a higher id is still counted once it shows up"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = LedgerService(db)
+    now = datetime.now(timezone.utc)
+
+    def cash(entry_id, amount, created_at):
+        db.add(LedgerEntry(
+            id=entry_id, journal_id=f"J{entry_id}", account=CASH_ACCOUNT,
+            entry_type=LedgerEntryType.DEPOSIT, amount=amount, created_at=created_at,
+        ))
+        db.commit()
+
+    cash(1, -100, now - timedelta(hours=1))
+    cash(3, -30, now)  # Committed while id 2 is still in flight
+    assert [s.last_entry_id for s in service.take_snapshots(now)] == [1]
+    db.commit()
+
+    cash(2, -20, now - timedelta(seconds=5))
+    assert service.account_balance(CASH_ACCOUNT) == -150
+    snapshot, = service.take_snapshots(now + timedelta(hours=1))
+    db.commit()
+    assert (snapshot.last_entry_id, snapshot.entries, snapshot.balance) == (3, 3, -150)
+    assert service.account_balance(CASH_ACCOUNT) == -150
@@ -0,0 +1,60 @@
+"""
+Test Prometheus metric registration and the /metrics endpoint
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.main import app
+from app.utils import metrics
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_request_counters_and_histograms_are_registered():
+    """A finished request lands in the counter and both histograms, with its DB statements"""
+    labels = {"method": "GET", "route": "/metrics-test"}
+    engine = create_engine("sqlite://")
+    metrics.install_statement_timing()
+
+    stats, token = metrics.begin_request_db_tracking()
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text("SELECT :i"), {"i": i})
+    metrics.end_request("GET", "/metrics-test", 200, 0.02, stats, token)
+
+    assert REGISTRY.get_sample_value("http_requests_total", {**labels, "status": "200"}) == 1
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) == 1
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_bucket", {**labels, "le": "0.025"}) == 1
+    assert REGISTRY.get_sample_value("http_request_db_queries_sum", {"route": "/metrics-test"}) == 3
+
+
+def test_metrics_endpoint_in_single_process_mode():
+    """Without PROMETHEUS_MULTIPROC_DIR, /metrics reports this process's registry"""
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+    metrics.TICKETS_PLACED.labels("Shillong", "FR").inc()
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'bet_tickets_placed_total{house="Shillong",round_type="FR"}' in response.text
+
+
+def test_metrics_aggregate_every_worker_in_multiprocess_mode(tmp_path):
+    """Each worker writes its own samples; rendering in any process sums them"""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def worker(code: str) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", f"from app.utils import metrics\n{code}"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+
+    for _ in range(2):
+        worker('metrics.TICKETS_PLACED.labels("Jowai", "SR").inc()')
+    payload = worker("print(metrics.render_latest()[0].decode())")
+    assert 'bet_tickets_placed_total{house="Jowai",round_type="SR"} 2.0' in payload
@@ -0,0 +1,30 @@
+"""
+Test SQL fingerprinting, N+1 detection and query budgets
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.utils.query_profiler import QueryProfile, assert_query_budget, fingerprint
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM bets WHERE id IN (?, ?, ?) AND amount > 10") == \
+        fingerprint("SELECT *  FROM bets WHERE id IN (?)\n AND amount > 250")
+    assert fingerprint("SELECT name FROM users WHERE username = 'bob'") == "SELECT name FROM users WHERE username = ?"
+
+
+def test_repeated_select_flagged_and_budget_enforced():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        with assert_query_budget(10) as profile:
+            for i in range(6):
+                conn.execute(text("SELECT :i"), {"i": i})
+        assert profile.count == 6
+        assert list(profile.repeated(threshold=5).values()) == [6]
+
+        with pytest.raises(AssertionError, match="exceeds budget of 2"):
+            with assert_query_budget(2):
+                for i in range(3):
+                    conn.execute(text("SELECT :i"), {"i": i})
+
+    assert QueryProfile().repeated(threshold=5) == {}
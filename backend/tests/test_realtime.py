@@ -0,0 +1,103 @@
+"""
+Test the realtime broadcaster fan-out
+"""
+import asyncio
+import time
+
+from app.services.realtime import RealtimeBroadcaster, PUBLIC_CHANNEL, user_channel
+
+
+def test_messages_reach_only_their_channel():
+    """User events go to that user's subscribers; public events go to everyone"""
+    async def scenario():
+        broadcaster = RealtimeBroadcaster()
+        await broadcaster.start()
+        alice = broadcaster.subscribe([PUBLIC_CHANNEL, user_channel(1)])
+        bob = broadcaster.subscribe([PUBLIC_CHANNEL, user_channel(2)])
+
+        broadcaster.publish(user_channel(1), "wallet.updated", {"balance": 50})
+        broadcaster.publish(PUBLIC_CHANNEL, "result.published", {"result": 7})
+        await asyncio.sleep(0)
+        await broadcaster.stop()
+        return alice.queue.qsize(), bob.queue.qsize()
+
+    assert asyncio.run(scenario()) == (2, 1)
+
+
+def test_slow_subscriber_queue_is_bounded():
+    """A subscriber that never reads keeps only the newest messages"""
+    async def scenario():
+        broadcaster = RealtimeBroadcaster(max_queue=4)
+        await broadcaster.start()
+        subscriber = broadcaster.subscribe([PUBLIC_CHANNEL])
+        for seq in range(10):
+            broadcaster.publish(PUBLIC_CHANNEL, "rounds.changed", {"seq": seq})
+        await asyncio.sleep(0)
+        await broadcaster.stop()
+        return subscriber
+
+    subscriber = asyncio.run(scenario())
+    assert subscriber.queue.qsize() == 4
+    assert subscriber.dropped == 6
+    assert '"seq": 9' in list(subscriber.queue._queue)[-1]
+
+
+def test_websocket_authenticates_without_the_url_and_unsubscribes_on_close():
+    """The JWT comes in a subprotocol or the first message; closing removes the subscriber"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import realtime
+    from app.services.realtime import realtime_broadcaster
+    from app.utils.jwt import create_user_token
+
+    app = FastAPI()
+    app.include_router(realtime.router)
+    client = TestClient(app)
+
+    def wait_for_channel(channel):
+        for _ in range(100):
+            if realtime_broadcaster._channels.get(channel):
+                return True
+            time.sleep(0.01)
+        return False
+
+    with client.websocket_connect("/ws", subprotocols=["bearer", create_user_token(41, "ann")]) as ws:
+        assert ws.accepted_subprotocol == "bearer"
+        assert wait_for_channel(user_channel(41))
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text('{"token": "%s"}' % create_user_token(42, "ben"))
+        assert wait_for_channel(user_channel(42))
+    for _ in range(100):
+        if not realtime_broadcaster.subscriber_count:
+            break
+        time.sleep(0.01)
+    assert realtime_broadcaster.subscriber_count == 0
+
+
+def test_stream_tickets_are_single_use():
+    """SSE clients swap their JWT for a ticket that works once and only for that user"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import realtime
+    from app.services.realtime import StreamTickets, stream_tickets
+    from app.utils.jwt import create_user_token
+
+    app = FastAPI()
+    app.include_router(realtime.router)
+    client = TestClient(app)
+    assert client.post("/stream-ticket").status_code in (401, 403)
+    response = client.post("/stream-ticket", headers={"Authorization": f"Bearer {create_user_token(43, 'cal')}"})
+    ticket = response.json()["ticket"]
+
+    async def redeem_twice():
+        return await stream_tickets.redeem(ticket), await stream_tickets.redeem(ticket)
+
+    assert asyncio.run(redeem_twice()) == (43, None)
+
+    async def expired():
+        tickets = StreamTickets(ttl=0)
+        return await tickets.redeem(await tickets.issue(44))
+
+    assert asyncio.run(expired()) is None
@@ -0,0 +1,32 @@
+"""
+Test the round lifecycle scheduler timer heap
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.services.round_lifecycle import (
+    RoundLifecycleScheduler, BETTING_CLOSES, DRAW_DUE
+)
+
+
+def test_pop_due_returns_timers_in_order():
+    """Only timers at or before now are popped, earliest first"""
+    scheduler = RoundLifecycleScheduler()
+    now = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    scheduler.push(now + timedelta(minutes=5), 3, DRAW_DUE)
+    scheduler.push(now - timedelta(minutes=1), 2, BETTING_CLOSES)
+    scheduler.push(now - timedelta(minutes=10), 1, BETTING_CLOSES)
+
+    due = scheduler.pop_due(now)
+    assert [entry[2] for entry in due] == [1, 2]
+    assert scheduler.next_fire_at() == now + timedelta(minutes=5)
+
+
+def test_push_ignores_duplicate_timers():
+    """The same round/kind/instant is only scheduled once"""
+    scheduler = RoundLifecycleScheduler()
+    fire_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    assert scheduler.push(fire_at, 1, BETTING_CLOSES)
+    assert not scheduler.push(fire_at, 1, BETTING_CLOSES)
+    assert len(scheduler.pop_due(fire_at)) == 1
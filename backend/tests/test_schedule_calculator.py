@@ -0,0 +1,40 @@
+"""
+Test local-day and draw instant calculations
+"""
+from datetime import date, datetime, time, timezone
+from types import SimpleNamespace
+
+from app.models.round import RoundType
+from app.services.schedule_calculator import (
+    draw_instant, local_day_bounds, local_today, round_slots
+)
+
+
+def test_local_day_bounds_follow_house_timezone():
+    """An IST day starts at 18:30 UTC the previous evening"""
+    start, end = local_day_bounds("Asia/Kolkata", date(2024, 3, 5))
+    assert start == datetime(2024, 3, 4, 18, 30, tzinfo=timezone.utc)
+    assert end == datetime(2024, 3, 5, 18, 30, tzinfo=timezone.utc)
+
+
+def test_local_today_crosses_utc_midnight():
+    """20:00 UTC is already the next day in IST"""
+    now = datetime(2024, 3, 4, 20, 0, tzinfo=timezone.utc)
+    assert local_today("Asia/Kolkata", now) == date(2024, 3, 5)
+
+
+def test_invalid_timezone_falls_back_to_utc():
+    """Unknown zones are treated as UTC"""
+    assert draw_instant("Not/AZone", date(2024, 3, 5), time(15, 30)) == datetime(2024, 3, 5, 15, 30, tzinfo=timezone.utc)
+
+
+def test_round_slots_forecast_closes_with_fr():
+    """Forecast is drawn with SR and closes with FR"""
+    house = SimpleNamespace(
+        timezone="Asia/Kolkata", fr_time=time(15, 30), sr_time=time(17, 0), betting_window_minutes=15
+    )
+    slots = {slot.round_type: slot for slot in round_slots(house, date(2024, 3, 5))}
+
+    assert slots[RoundType.FR].scheduled_time == datetime(2024, 3, 5, 10, 0, tzinfo=timezone.utc)
+    assert slots[RoundType.FORECAST].scheduled_time == slots[RoundType.SR].scheduled_time
+    assert slots[RoundType.FORECAST].betting_closes_at == slots[RoundType.FR].betting_closes_at
@@ -0,0 +1,92 @@
+"""
+Test the background scheduler: cron timing, leader-only jobs, run history and failover
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.scheduler import JOB_FAILED, JOB_SUCCEEDED, JobRun
+from app.services.scheduler import Cron, Every, SchedulerRuntime
+
+
+def test_cron_next_after():
+    """Minute, hour, step, weekday and day-of-month fields follow cron semantics in UTC"""
+    at = datetime(2026, 10, 19, 0, 30, tzinfo=timezone.utc)  # A Monday
+    assert Cron("30 0 * * *").next_after(at) == datetime(2026, 10, 20, 0, 30, tzinfo=timezone.utc)
+    assert Cron("*/15 * * * *").next_after(at) == datetime(2026, 10, 19, 0, 45, tzinfo=timezone.utc)
+    assert Cron("0 9 * * 0").next_after(at) == datetime(2026, 10, 25, 9, 0, tzinfo=timezone.utc)
+    # Day of month and weekday both restricted: either one matches
+    assert Cron("0 0 1 * 3").next_after(at) == datetime(2026, 10, 21, 0, 0, tzinfo=timezone.utc)
+    assert Cron("0 0 29 2 *").next_after(at) == datetime(2028, 2, 29, 0, 0, tzinfo=timezone.utc)
+
+
+class SharedLock:
+    """Stands in for the advisory lock: one holder at a time across runtimes"""
+    owner = None
+
+    def __init__(self):
+        self.held = False
+
+    def try_acquire(self):
+        if SharedLock.owner is None:
+            SharedLock.owner = self
+        self.held = SharedLock.owner is self
+        return self.held
+
+    def heartbeat(self):
+        return SharedLock.owner is self
+
+    def release(self):
+        if SharedLock.owner is self:
+            SharedLock.owner = None
+        self.held = False
+
+
+def test_only_the_leader_runs_jobs_and_a_follower_takes_over(tmp_path):
+    """Jobs run once per schedule on the leader, runs are recorded, and leadership fails over"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'scheduler.db'}")
+    Base.metadata.create_all(engine, tables=[JobRun.__table__])
+    sessions = sessionmaker(bind=engine)
+    calls, services = [], []
+
+    def failing():
+        raise RuntimeError("boom")
+
+    async def service():
+        services.append("started")
+        await asyncio.Event().wait()
+
+    def build():
+        runtime = SchedulerRuntime(SharedLock(), heartbeat_seconds=0.05, session_factory=sessions)
+        runtime.register("count", lambda: calls.append(runtime) or len(calls), Every(3600), run_at_start=True)
+        runtime.register("fail", failing, Every(3600), run_at_start=True)
+        runtime.register_service("loop", service, lambda: services.append("stopped"))
+        return runtime
+
+    async def scenario():
+        first, second = build(), build()
+        first.start()
+        second.start()
+        await asyncio.sleep(0.3)
+        assert (first.is_leader, second.is_leader) == (True, False)
+        assert calls == [first] and services == ["started"]
+
+        await first.stop()
+        await asyncio.sleep(0.3)
+        assert second.is_leader and calls == [first, second]
+        assert services == ["started", "stopped", "started"]
+        await second.stop()
+
+    asyncio.run(scenario())
+
+    db = sessions()
+    runs = db.query(JobRun).order_by(JobRun.id).all()
+    assert sorted((run.job_name, run.status) for run in runs) == [
+        ("count", JOB_SUCCEEDED), ("count", JOB_SUCCEEDED), ("fail", JOB_FAILED), ("fail", JOB_FAILED)
+    ]
+    assert {run.result["value"] for run in runs if run.job_name == "count"} == {1, 2}
+    assert all("boom" in run.error for run in runs if run.job_name == "fail")
+    db.close()
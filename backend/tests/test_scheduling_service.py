@@ -0,0 +1,115 @@
+"""
+Test bulk round generation in the scheduling service
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import House, Round
+from app.models.round import RoundStatus, RoundType
+from app.schemas.round import RoundCreate
+from app.services.round_service import RoundService
+from app.services.schedule_calculator import as_utc, local_today, round_slots
+from app.services.scheduling_service import SchedulingService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_generate_rounds_is_idempotent(db):
+    """A second run over an overlapping window only adds the new days"""
+    house = House(
+        name="Shillong", timezone="Asia/Kolkata",
+        fr_time=time(15, 30), sr_time=time(17, 0), betting_window_minutes=15,
+        runs_sunday=True
+    )
+    db.add(house)
+    db.commit()
+
+    service = SchedulingService(db)
+    first = service.generate_rounds(days_ahead=5)
+    second = service.generate_rounds(days_ahead=6)
+
+    assert second == 3
+    assert db.query(Round).count() == first + second
+    # Every local day has one round of each type
+    assert {r.round_type for r in db.query(Round).all()} == {RoundType.FR, RoundType.SR, RoundType.FORECAST}
+
+
+def test_rounds_are_inserted_one_by_one_where_on_conflict_is_missing(db):
+    """The fallback skips slots that already exist and never creates closed ones"""
+    house = House(name="Khanapara", timezone="Asia/Kolkata", fr_time=time(15, 30), sr_time=time(17, 0), runs_sunday=True)
+    db.add(house)
+    db.commit()
+    service = SchedulingService(db)
+    day = date(2031, 3, 4)
+
+    rows = service._round_rows_for_day(house, day, datetime(2031, 3, 4, 10, 5, tzinfo=timezone.utc))
+    assert [row["round_type"] for row in rows] == [RoundType.SR]  # FR (and its forecast) closed at 09:45 UTC
+    rows = service._round_rows_for_day(house, day, datetime(2031, 3, 4, 0, 0, tzinfo=timezone.utc))
+    assert service._insert_one_by_one(rows[:1]) == 1
+    assert service._insert_one_by_one(rows) == len(rows) - 1
+    assert db.query(Round).count() == len(rows)
+
+
+def test_schedule_change_moves_only_future_scheduled_rounds(db):
+    """New draw times apply to upcoming scheduled rounds; past and settled ones keep theirs"""
+    house = House(name="Jowai", timezone="Asia/Kolkata", fr_time=time(15, 30), sr_time=time(17, 0), betting_window_minutes=15)
+    db.add(house)
+    db.commit()
+    today = local_today(house.timezone)
+
+    def fr_round(local_date, status=RoundStatus.SCHEDULED):
+        slot = round_slots(house, local_date)[0]
+        round_ = Round(house_id=house.id, round_type=RoundType.FR, status=status, local_date=local_date,
+                       scheduled_time=slot.scheduled_time, betting_closes_at=slot.betting_closes_at)
+        db.add(round_)
+        return round_
+
+    past = fr_round(today - timedelta(days=2))
+    settled = fr_round(today + timedelta(days=3), RoundStatus.COMPLETED)
+    upcoming = fr_round(today + timedelta(days=4))
+    db.commit()
+    before = {round_.id: as_utc(round_.scheduled_time) for round_ in (past, settled, upcoming)}
+
+    house.fr_time = time(14, 0)
+    db.commit()
+    assert SchedulingService(db).reschedule_future_rounds(house) == 1
+
+    moved = round_slots(house, upcoming.local_date)[0]
+    db.expire_all()
+    assert (as_utc(upcoming.scheduled_time), as_utc(upcoming.betting_closes_at)) == (moved.scheduled_time, moved.betting_closes_at)
+    assert as_utc(upcoming.scheduled_time) == before[upcoming.id] - timedelta(minutes=90)
+    assert as_utc(past.scheduled_time) == before[past.id]
+    assert as_utc(settled.scheduled_time) == before[settled.id]
+
+
+def test_manual_round_keeps_the_scheduler_off_its_slot(db):
+    """A round created by an admin counts as its day's slot for generation and for a second manual round"""
+    house = House(name="Nongpoh", timezone="Asia/Kolkata", fr_time=time(15, 30), sr_time=time(17, 0),
+                  betting_window_minutes=15, runs_sunday=True)
+    db.add(house)
+    db.commit()
+    slot = round_slots(house, local_today(house.timezone) + timedelta(days=1))[0]
+    manual = RoundCreate(house_id=house.id, round_type=RoundType.FR,
+                         scheduled_time=slot.scheduled_time, betting_closes_at=slot.betting_closes_at)
+
+    created, _ = RoundService(db).create_round(manual)
+    assert created is not None
+    SchedulingService(db).generate_rounds(days_ahead=3)
+    tomorrow_fr = db.query(Round).filter(Round.round_type == RoundType.FR, Round.scheduled_time == slot.scheduled_time)
+    assert [round_.id for round_ in tomorrow_fr] == [created.id]
+
+    db.query(Round).filter(Round.id != created.id).delete()
+    db.commit()
+    duplicate, message = RoundService(db).create_round(manual)
+    assert duplicate is None and "already exists" in message
@@ -0,0 +1,43 @@
+"""
+Test application startup: cold-start budget and legacy path aliases
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Importing app.main in a fresh interpreter (imports plus building every route) took
+# about 2.3s here after routers stopped being registered twice, down from 3.4s
+COLD_START_BUDGET = float(os.environ.get("COLD_START_BUDGET", "4.0"))
+
+
+def test_cold_start_within_budget():
+    """A fresh interpreter builds the app within budget and without loading image libraries"""
+    script = (
+        "import sys, time; started = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - started, 'PIL' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    seconds, pil_loaded = result.stdout.split()[-2:]
+    assert float(seconds) < COLD_START_BUDGET, f"cold start took {float(seconds):.2f}s"
+    assert pil_loaded == "False"
+
+
+def test_legacy_prefix_reuses_v1_routes():
+    """/api/<section> paths reach the /api/v1 routes without a second copy of them"""
+    paths = [getattr(route, "path", "") for route in app.routes]
+    assert not [path for path in paths if path.startswith("/api/") and not path.startswith("/api/v1/")]
+
+    client = TestClient(app)
+    legacy = client.post("/api/auth/login", json={})
+    assert legacy.status_code == client.post("/api/v1/auth/login", json={}).status_code == 422
+    assert client.get("/api/banners/").status_code == 404
@@ -0,0 +1,65 @@
+"""
+Test keyset-paginated ticket history
+"""
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Bet, BetTicket, House, Round, User
+from app.models.bet import BetStatus, BetType
+from app.models.round import RoundType
+from app.services.bet_service import EnhancedBetService
+from app.utils.query_profiler import assert_query_budget
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_ticket_pages_cover_history_in_two_queries_each(engine, db):
+    """Pages walk every ticket once, newest first, without per-ticket queries"""
+    house = House(name="Shillong", fr_time=time(15, 30), sr_time=time(17, 0))
+    user = User(username="player", phone="9000000000", password_hash="x")
+    db.add_all([house, user])
+    db.flush()
+    round_ = Round(house_id=house.id, round_type=RoundType.FR,
+                   scheduled_time=datetime(2026, 1, 1, 10), betting_closes_at=datetime(2026, 1, 1, 9, 45))
+    db.add(round_)
+    db.flush()
+
+    base = datetime(2026, 1, 1, 8)
+    # Two tickets share a timestamp so the ticket_id tie-break matters
+    created = [base, base + timedelta(minutes=1), base + timedelta(minutes=1), base + timedelta(minutes=2), base + timedelta(minutes=3)]
+    for i, created_at in enumerate(created):
+        ticket_id = f"T{i}"
+        db.add(BetTicket(ticket_id=ticket_id, user_id=user.id, house_id=house.id, total_amount=10,
+                         total_potential_payout=800, status=BetStatus.PENDING, bets_summary={}, created_at=created_at))
+        db.add(Bet(user_id=user.id, round_id=round_.id, bet_type=BetType.DIRECT, bet_value=f"{i:02d}",
+                   bet_amount=10, potential_payout=800, ticket_id=ticket_id))
+    db.commit()
+    user_id = user.id
+
+    service = EnhancedBetService(db)
+    seen, cursor = [], None
+    while True:
+        with assert_query_budget(2):
+            page, cursor = service.get_user_tickets_page(user_id, limit=2, cursor=cursor)
+        assert all(ticket["house_name"] == "Shillong" and len(ticket["bets"]) == 1 for ticket in page)
+        seen.extend(ticket["ticket_id"] for ticket in page)
+        if cursor is None:
+            break
+
+    assert seen == ["T4", "T3", "T2", "T1", "T0"]
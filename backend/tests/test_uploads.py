@@ -0,0 +1,193 @@
+"""
+Test streaming uploads, the upload body limit, the content-addressed store and upload serving
+"""
+import asyncio
+import hashlib
+import io
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import files
+from app.database import Base
+from app.middleware.upload_limit import MULTIPART_OVERHEAD, UploadLimitMiddleware
+from app.models.upload import BANNER_OWNER, TRANSACTION_OWNER
+from app.services.image_pipeline import IMAGE_TYPES, render_variants, strip_metadata
+from app.services.upload_store import LocalBlobBackend, UnsupportedUpload, UploadStore
+from app.utils.signed_urls import sign_url
+from app.utils.upload_stream import UploadTooLarge, stream_to_disk
+
+
+def test_stream_to_disk_hashes_and_aborts_cleanly(tmp_path):
+    """A complete upload lands atomically with its hash; an oversized one leaves no file behind"""
+    data = b"x" * 600_000
+    stored = asyncio.run(stream_to_disk(UploadFile(io.BytesIO(data), filename="a.png"), tmp_path / "a.png", len(data)))
+    assert (stored.size, stored.sha256) == (len(data), hashlib.sha256(data).hexdigest())
+    assert (tmp_path / "a.png").read_bytes() == data
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(stream_to_disk(UploadFile(io.BytesIO(data), filename="b.png"), tmp_path / "b.png", 500_000))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.png"]
+
+
+def test_upload_limit_rejects_oversized_bodies():
+    """Declared and streamed bodies over the limit get 413 without reaching the route"""
+    calls = []
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, path_prefixes=["/uploads"], max_file_size=1_000)
+
+    @app.post("/uploads/image")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/uploads/image", files={"file": ("a.png", b"x" * 100)}).status_code == 200
+    assert client.post("/uploads/image", files={"file": ("b.png", b"x" * (MULTIPART_OVERHEAD + 2_000))}).status_code == 413
+
+    def chunked():
+        for _ in range(20):
+            yield b"x" * 8_192
+
+    streamed = client.post("/uploads/image", content=chunked(), headers={"content-type": "multipart/form-data; boundary=b"})
+    assert streamed.status_code == 413
+    assert calls == ["a.png"]
+
+
+def test_duplicate_uploads_share_one_file_until_unreferenced(tmp_path):
+    """Same bytes store once; the file is collected only when no record references it"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    backend = LocalBlobBackend(tmp_path / "blobs", "/uploads/blobs")
+    store = UploadStore(backend, tmp_path / "staging")
+
+    screenshot = io.BytesIO()
+    Image.new("RGB", (4, 4), "red").save(screenshot, "PNG")
+
+    def upload(name):
+        return asyncio.run(store.save(db, UploadFile(io.BytesIO(screenshot.getvalue()), filename=name), 10_000))
+
+    first, deduplicated = upload("proof.jpeg")
+    again, duplicate = upload("proof-copy.gif")
+    assert (deduplicated, duplicate) == (False, True)
+    assert store.url(again) == store.url(first) == f"/uploads/blobs/{first.sha256[:2]}/{first.sha256}.png"
+    assert len(list((tmp_path / "blobs").rglob("*.png"))) == 1
+    with pytest.raises(UnsupportedUpload):
+        asyncio.run(store.save(db, UploadFile(io.BytesIO(b"<html>"), filename="x.png"), 1_000, accept=IMAGE_TYPES))
+    key = first.key
+
+    store.link(db, BANNER_OWNER, 7, {"qr_code_url": f"https://cdn.example{store.url(first)}"})
+    db.commit()
+    later = datetime.now(timezone.utc) + timedelta(days=1)
+    assert store.collect_garbage(db, later) == 0
+
+    store.link(db, BANNER_OWNER, 7, None)
+    db.commit()
+    assert store.collect_garbage(db, later) == 1
+    assert not backend.exists(key)
+    db.close()
+
+
+def test_private_and_public_uploads_of_the_same_bytes_stay_separate(tmp_path):
+    """A public re-upload never exposes or moves the private copy that records point at"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    backend = LocalBlobBackend(tmp_path / "blobs", "/uploads/blobs")
+    store = UploadStore(backend, tmp_path / "staging")
+    proof = b"%PDF-1.4 deposit proof"
+
+    def upload(private):
+        return asyncio.run(store.save(db, UploadFile(io.BytesIO(proof), filename="proof.pdf"), 10_000, private=private))
+
+    private, _ = upload(True)
+    private_url, private_key = store.url(private), private.key
+    store.link(db, TRANSACTION_OWNER, 1, {"payment_proof": private_url})
+    db.commit()
+
+    public, deduplicated = upload(False)
+    assert not deduplicated and public.key != private_key
+    assert "/private/" in private_url and "/private/" not in store.url(public)
+    assert backend.exists(private_key) and backend.exists(public.key)
+
+    # Only the unreferenced public copy is collected
+    assert store.collect_garbage(db, datetime.now(timezone.utc) + timedelta(days=1)) == 1
+    assert backend.exists(private_key)
+    db.close()
+
+
+def test_render_variants_resizes_rotates_and_strips_exif(tmp_path):
+    """WebP variants bounded by width, upright per EXIF orientation, without EXIF"""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+    exif[0x010F] = "PhoneMaker"
+    Image.new("RGB", (2000, 1200), "blue").save(tmp_path / "photo.jpg", "JPEG", exif=exif)
+
+    variants = render_variants(str(tmp_path / "photo.jpg"), str(tmp_path), "abc")
+    assert variants == {
+        "thumb": {"width": 320, "height": 533},
+        "medium": {"width": 1024, "height": 1707},
+        "full": {"width": 1200, "height": 2000},
+    }
+    with Image.open(tmp_path / "abc-thumb.webp") as thumb:
+        assert thumb.format == "WEBP" and not thumb.getexif()
+
+
+def test_served_original_has_no_exif(tmp_path, monkeypatch):
+    """The stored original is rewritten upright without EXIF before it is hashed and served"""
+    monkeypatch.setattr(files, "UPLOAD_DIR", tmp_path)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    store = UploadStore(LocalBlobBackend(tmp_path / "blobs", "/uploads/blobs"), tmp_path / "staging")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+    exif[0x8825] = {2: (26.0, 10.0, 0.0)}  # GPS latitude
+    photo = io.BytesIO()
+    Image.new("RGB", (40, 20), "blue").save(photo, "JPEG", exif=exif)
+
+    async def sanitize(path, content_type):
+        return strip_metadata(str(path))
+
+    blob, _ = asyncio.run(store.save(db, UploadFile(io.BytesIO(photo.getvalue()), filename="me.jpg"), 100_000, sanitize=sanitize))
+    assert blob.sha256 != hashlib.sha256(photo.getvalue()).hexdigest()
+
+    app = FastAPI()
+    app.include_router(files.router, prefix="/uploads")
+    served = TestClient(app).get(store.url(blob))
+    assert served.status_code == 200 and hashlib.sha256(served.content).hexdigest() == blob.sha256
+    with Image.open(io.BytesIO(served.content)) as image:
+        assert image.size == (20, 40) and not image.getexif() and "exif" not in image.info
+    db.close()
+
+
+def test_serving_caches_ranges_and_guards_private_files(tmp_path, monkeypatch):
+    """Public blobs are immutable with validators and ranges; private ones need a signed link"""
+    monkeypatch.setattr(files, "UPLOAD_DIR", tmp_path)
+    (tmp_path / "blobs/ab").mkdir(parents=True)
+    (tmp_path / "blobs/private/cd").mkdir(parents=True)
+    (tmp_path / "blobs/ab/ab12.png").write_bytes(b"0123456789")
+    (tmp_path / "blobs/private/cd/cd34.pdf").write_bytes(b"%PDF-secret")
+    app = FastAPI()
+    app.include_router(files.router, prefix="/uploads")
+    client = TestClient(app)
+
+    public = client.get("/uploads/blobs/ab/ab12.png")
+    assert public.status_code == 200 and public.headers["cache-control"] == files.IMMUTABLE
+    assert client.get("/uploads/blobs/ab/ab12.png", headers={"if-none-match": public.headers["etag"]}).status_code == 304
+    partial = client.get("/uploads/blobs/ab/ab12.png", headers={"range": "bytes=2-4"})
+    assert (partial.status_code, partial.content, partial.headers["content-range"]) == (206, b"234", "bytes 2-4/10")
+    assert client.get("/uploads/blobs/ab/ab12.png", headers={"range": "bytes=20-"}).status_code == 416
+    assert client.get("/uploads/blobs/ab/..%2F..%2Fsecret").status_code == 404
+
+    assert client.get("/uploads/blobs/private/cd/cd34.pdf").status_code == 403
+    signed = client.get(sign_url("/uploads/blobs/private/cd/cd34.pdf"))
+    assert signed.status_code == 200 and signed.content == b"%PDF-secret"
+    assert signed.headers["cache-control"].startswith("private, max-age=")
+    assert client.get(sign_url("/uploads/blobs/private/cd/cd34.pdf") + "0").status_code == 403
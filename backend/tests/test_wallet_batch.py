@@ -0,0 +1,61 @@
+"""
+Test batch approval of pending deposits and withdrawals
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Transaction, User
+from app.models.transaction import TransactionStatus, TransactionType
+from app.services.ledger_service import LedgerService
+from app.services.wallet_service import WalletService
+
+
+def test_batch_approval_applies_in_order_with_per_item_outcomes():
+    """A deposit funds a later withdrawal in the same batch; an overdraft and unknown IDs fail alone"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    alice = User(username="alice", phone="9000000001", password_hash="x")
+    bob = User(username="bob", phone="9000000002", password_hash="x")
+    admin = User(username="admin", phone="9000000003", password_hash="x", is_admin=True)
+    db.add_all([alice, bob, admin])
+    db.flush()
+
+    start = datetime(2026, 3, 1, 12)
+
+    def pending(user, kind, amount, minutes):
+        transaction = Transaction(user_id=user.id, transaction_type=kind, amount=amount, balance_before=0,
+                                  balance_after=0, created_at=start + timedelta(minutes=minutes))
+        db.add(transaction)
+        return transaction
+
+    deposit = pending(alice, TransactionType.DEPOSIT, 500, 0)
+    withdrawal = pending(alice, TransactionType.WITHDRAWAL, 300, 1)
+    overdraft = pending(bob, TransactionType.WITHDRAWAL, 50, 2)
+    bob_deposit = pending(bob, TransactionType.DEPOSIT, 20, 3)
+    db.commit()
+
+    service = WalletService(db)
+    page, cursor = service.get_pending_transactions_page(limit=3)
+    assert [t.id for t in page] == [deposit.id, withdrawal.id, overdraft.id]
+    assert [t.id for t in service.get_pending_transactions_page(cursor=cursor)[0]] == [bob_deposit.id]
+    assert service.count_pending_transactions()["by_type"]["WITHDRAWAL"] == {"count": 2, "amount": 350.0}
+
+    results, message = service.process_transactions_batch(
+        [deposit.id, withdrawal.id, overdraft.id, bob_deposit.id, 999], True, admin.id
+    )
+    outcomes = {result["transaction_id"]: result for result in results}
+    assert message == "3 of 5 transactions approved"
+    assert outcomes[withdrawal.id]["balance"] == 200
+    assert not outcomes[overdraft.id]["success"] and not outcomes[999]["success"]
+    assert (withdrawal.balance_before, withdrawal.balance_after) == (500, 200)
+    assert (alice.wallet_balance, bob.wallet_balance) == (200, 20)
+    assert service.count_pending_transactions()["total"] == 1
+    assert LedgerService(db).reconcile()["mismatched_wallets"] == 0
+
+    results, message = service.process_transactions_batch([overdraft.id], False, admin.id, "Insufficient funds")
+    assert results[0]["status"] == "REJECTED" and overdraft.status == TransactionStatus.REJECTED
+    db.close()
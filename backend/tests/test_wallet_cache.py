@@ -0,0 +1,46 @@
+"""
+Test wallet snapshots behind the balance endpoints
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Transaction, User
+from app.models.transaction import TransactionType
+from app.services.wallet_cache import WalletSnapshots
+from app.services.wallet_service import WalletService
+
+
+def test_snapshot_tracks_wallet_changes():
+    """Balance, pending totals and latest transactions; the version moves only when they change"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    alice = User(username="alice", phone="9000000001", password_hash="x")
+    bob = User(username="bob", phone="9000000002", password_hash="x")
+    db.add_all([alice, bob])
+    db.flush()
+    start = datetime(2026, 3, 1, 12)
+    deposits = [
+        Transaction(user_id=alice.id, transaction_type=TransactionType.DEPOSIT, amount=100 * (i + 1),
+                    balance_before=0, balance_after=0, created_at=start + timedelta(minutes=i))
+        for i in range(3)
+    ]
+    db.add_all(deposits)
+    db.commit()
+
+    snapshots = WalletSnapshots(transactions=2, ttl_seconds=60)
+    before = snapshots.build(db, [alice.id, bob.id])
+    assert before[alice.id]["pending_deposits"] == 600
+    assert [t["id"] for t in before[alice.id]["recent_transactions"]] == [deposits[2].id, deposits[1].id]
+    assert before[bob.id]["recent_transactions"] == []
+    assert snapshots.build(db, [alice.id])[alice.id]["version"] == before[alice.id]["version"]
+
+    WalletService(db).approve_deposit(deposits[0].id, bob.id)
+    after = snapshots.build(db, [alice.id, bob.id])
+    assert (after[alice.id]["balance"], after[alice.id]["pending_deposits"]) == (100, 500)
+    assert after[alice.id]["version"] != before[alice.id]["version"]
+    assert after[bob.id]["version"] == before[bob.id]["version"]
+    db.close()
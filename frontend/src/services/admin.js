@@ -82,8 +82,19 @@ export const adminService = {
     return api.get('/admin/stats');
   },
   // Transactions
-  getPendingTransactions: () => {
-    return api.get('/admin/transactions/pending');
+  // The endpoint returns one page per request; follow X-Next-Cursor until every pending transaction is loaded
+  getPendingTransactions: async (transactionType = null) => {
+    const transactions = [];
+    let cursor = null;
+    do {
+      const params = { limit: 500 };
+      if (transactionType) params.transaction_type = transactionType;
+      if (cursor) params.cursor = cursor;
+      const response = await api.get('/admin/transactions/pending', { params });
+      transactions.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return { data: transactions };
   },
   getDetailedTransactions: (status = null, transactionType = null, limit = 50) => {
     const params = new URLSearchParams();
@@ -127,7 +138,7 @@ export const adminService = {
     return api.get('/admin/transactions/detailed');
   },
   getPendingWalletTransactions: () => {
-    return api.get('/admin/transactions/pending');
+    return adminService.getPendingTransactions();
   }
 };
 export default adminService;
\ No newline at end of file